@@ -0,0 +1,201 @@
+# Headless collector: python -m app.daemon
+#
+# Runs the metric, alert and dataset polling of the GUI without Qt, writing
+# samples to the metrics store and events to logs/daemon.log, and optionally
+# serving the latest values at /metrics.
+
+import argparse
+import logging
+import random
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.utils.api import fetch_alert_changes, fetch_datasets, fetch_smart_data
+from app.utils.alert_cursor import DAEMON_ALERT_CURSOR
+from app.utils.app_logging import configure_logging
+from app.utils.datasets import dataset_filters, is_locked
+from app.utils.disks import DISK_FIELDS
+from app.utils.metrics_collector import MetricsCollector
+from app.utils.metrics_exporter import METRICS_SNAPSHOT, start_exporter
+from app.utils.metrics_store import MetricsStore
+
+# Fields needed to report dataset lock state changes
+DAEMON_DATASET_FIELDS = ["id", "name", "locked", "keystatus"]
+DAEMON_DATASET_QUERY_EXTRA = {"flat": True, "retrieve_children": False, "properties": ["keystatus"]}
+
+
+class HeadlessScheduler:
+    """
+    Runs periodic jobs on a small thread pool, like PollScheduler without Qt.
+
+    Each job has at most one call in flight. A job whose call fails (raises or
+    returns None) is retried with exponential backoff and jitter, so an
+    unreachable host is polled ever more rarely until it answers again.
+    """
+
+    def __init__(self, max_workers=4, max_backoff=300):
+        """
+        Initializes the scheduler.
+
+        Args:
+            max_workers (int): Threads shared by all jobs.
+            max_backoff (float): Upper bound of the retry delay in seconds.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="daemon")
+        self.max_backoff = max_backoff
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+
+    def add_job(self, name, function, interval):
+        """Registers a job that runs every interval seconds, first right away."""
+        self.jobs[name] = {
+            "function": function, "interval": interval,
+            "due": time.monotonic(), "busy": False, "failures": 0,
+        }
+
+    def run(self, stop_event):
+        """Dispatches due jobs until stop_event is set."""
+        while not stop_event.is_set():
+            now = time.monotonic()
+            with self.lock:
+                for name, job in self.jobs.items():
+                    if not job["busy"] and job["due"] <= now:
+                        job["busy"] = True
+                        self.executor.submit(self._run, name, job)
+                pending = [job["due"] for job in self.jobs.values() if not job["busy"]]
+            timeout = max(0.0, min(pending) - now) if pending else None
+            self.wakeup.wait(timeout)
+            self.wakeup.clear()
+
+    def stop(self):
+        """Wakes the dispatcher and waits for running jobs to finish."""
+        self.wakeup.set()
+        self.executor.shutdown(wait=True, cancel_futures=True)  # cancel_futures needs Python 3.9, the minimum in README.md
+
+    def _run(self, name, job):
+        """Runs one job call and schedules the next one."""
+        try:
+            ok = job["function"]() is not None
+        except Exception as e:
+            logging.error(f"Daemon job {name} failed: {e}")
+            ok = False
+
+        with self.lock:
+            if ok:
+                job["failures"] = 0
+                delay = job["interval"]
+            else:
+                job["failures"] += 1
+                delay = min(job["interval"] * 2 ** job["failures"], self.max_backoff) * random.uniform(0.8, 1.2)
+                logging.warning(f"Daemon job {name} failed {job['failures']} time(s); retrying in {delay:.0f} s")
+            job["due"] = time.monotonic() + delay
+            job["busy"] = False
+        self.wakeup.set()
+
+
+class DatasetWatcher:
+    """Logs datasets being locked, unlocked, created or removed."""
+
+    def __init__(self):
+        self.states = None  # dataset name -> True if locked
+
+    def poll(self):
+        """Fetches the encrypted datasets and logs what changed since the previous poll."""
+        datasets = fetch_datasets(dataset_filters(), DAEMON_DATASET_FIELDS, DAEMON_DATASET_QUERY_EXTRA)
+        if datasets is None:
+            return None
+
+        METRICS_SNAPSHOT.update_datasets(datasets)
+        states = {d.get("name"): is_locked(d) for d in datasets}
+        if self.states is not None:
+            for name, locked in states.items():
+                state = "locked" if locked else "unlocked"
+                if name not in self.states:
+                    logging.info(f"Dataset {name} appeared ({state})")
+                elif locked != self.states[name]:
+                    logging.info(f"Dataset {name} {state}")
+            for name in self.states.keys() - states.keys():
+                logging.info(f"Dataset {name} disappeared")
+        else:
+            locked = sum(1 for locked in states.values() if locked)
+            logging.info(f"Watching {len(states)} encrypted datasets, {locked} locked")
+        self.states = states
+        return states
+
+
+def poll_alerts():
+    """Fetches alert changes and logs them."""
+    changes = fetch_alert_changes(DAEMON_ALERT_CURSOR)
+    if changes is None:
+        return None
+    for alert in changes["added"] + changes["changed"]:
+        logging.warning(f"Alert [{(alert.get('level') or '').upper()}] {alert.get('formatted')}")
+    for alert in changes["dismissed"]:
+        logging.info(f"Alert dismissed: {alert.get('formatted')}")
+    for uuid in changes["removed"]:
+        logging.info(f"Alert cleared: {uuid}")
+    return changes
+
+
+def poll_disks():
+    """Fetches disk health and temperatures for the /metrics endpoint."""
+    disks = fetch_smart_data([["expiretime", "=", None]], DISK_FIELDS)
+    if disks is not None:
+        METRICS_SNAPSHOT.update_disks(disks)
+    return disks
+
+
+def parse_args(argv=None):
+    """Parses the command line."""
+    parser = argparse.ArgumentParser(prog="python -m app.daemon", description="Headless TrueNAS metric and alert collector.")
+    parser.add_argument("--metrics-interval", type=float, default=10, help="Seconds between metric samples (default: 10)")
+    parser.add_argument("--alerts-interval", type=float, default=30, help="Seconds between alert checks (default: 30)")
+    parser.add_argument("--datasets-interval", type=float, default=60, help="Seconds between dataset checks (default: 60)")
+    parser.add_argument("--disks-interval", type=float, default=300, help="Seconds between disk checks while /metrics is served (default: 300)")
+    parser.add_argument("--metrics-port", type=int, help="Serve /metrics on this port (default: \"metrics_port\" from config.json, else off)")
+    parser.add_argument("--store", default="metrics.db", help="Metrics database file (default: metrics.db)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Runs the collector until SIGINT or SIGTERM."""
+    args = parse_args(argv)
+    configure_logging("daemon.log", filemode="a")
+    logging.info("Daemon starting")
+
+    collector = MetricsCollector(MetricsStore(args.store), METRICS_SNAPSHOT)
+    watcher = DatasetWatcher()
+    scheduler = HeadlessScheduler()
+    scheduler.add_job("metrics", collector.collect, args.metrics_interval)
+    scheduler.add_job("alerts", poll_alerts, args.alerts_interval)
+    scheduler.add_job("datasets", watcher.poll, args.datasets_interval)
+
+    exporter = start_exporter(args.metrics_port)
+    if exporter:
+        scheduler.add_job("disks", poll_disks, args.disks_interval)
+
+    stop_event = threading.Event()
+
+    def request_stop(signum, frame):
+        logging.info(f"Daemon stopping on signal {signum}")
+        stop_event.set()
+        scheduler.wakeup.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    try:
+        scheduler.run(stop_event)
+    finally:
+        scheduler.stop()
+        if exporter:
+            exporter.stop()
+        collector.close()
+        DAEMON_ALERT_CURSOR.flush()
+        logging.info("Daemon stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,22 @@
 # Main application entry
+import logging
 import sys
 import os 
 
 # Add the project root to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# --profile-startup reports where startup time goes; it must be set up before the imports below
+PROFILE_STARTUP = "--profile-startup" in sys.argv
+if PROFILE_STARTUP:
+    sys.argv.remove("--profile-startup")
+    from app.utils.startup_profile import STARTUP_PROFILE
+    STARTUP_PROFILE.start()
+
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
 from app.utils.config import load_config
 from app.ui.main_window import TrueNASManager
-from app.ui.dialogs.setup_dialog import SetupDialog
 from app.utils.app_logging import configure_logging
 
 
@@ -27,21 +35,36 @@ def initialize_app():
         app = QApplication(sys.argv)
         from PyQt5.QtWidgets import QMessageBox
 
+        from app.ui.dialogs.setup_dialog import SetupDialog
+
         QMessageBox.warning(None, "Configuration Missing", f"Error: {str(e)}\nThe setup dialog will now be launched.")
         setup_dialog = SetupDialog()
         if not setup_dialog.exec_():  # If setup is canceled
             sys.exit("Setup canceled by the user. Exiting.")
 
+def report_startup_profile():
+    """Prints and logs the --profile-startup report once the event loop runs."""
+    STARTUP_PROFILE.milestone("event loop running")
+    STARTUP_PROFILE.stop()
+    report = STARTUP_PROFILE.report()
+    print(report)
+    logging.info(report)
+
 def main():
     """
     Starts the TrueNAS Manager application.
     """
+    if PROFILE_STARTUP:
+        STARTUP_PROFILE.milestone("modules imported")
     configure_logging()  # Set up logging
     initialize_app()     # Ensure valid configuration
 
     app = QApplication(sys.argv)
     main_window = TrueNASManager()
     main_window.show()
+    if PROFILE_STARTUP:
+        STARTUP_PROFILE.milestone("main window shown")
+        QTimer.singleShot(0, report_startup_profile)
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
@@ -1,6 +1,44 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame
-from PyQt5.QtCore import Qt
-from app.utils.api import fetch_datasets
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import (
+    QVBoxLayout, QHBoxLayout, QPushButton, QFrame, QTableView, QHeaderView, QAbstractItemView,
+    QInputDialog, QLineEdit, QMessageBox
+)
+from app.utils.api import fetch_datasets, fetch_datasets_by_name, lock_datasets, unlock_datasets
+from app.utils.config import get_dataset_passwords, decrypt_password
+from app.utils.datasets import DATASET_FIELDS, DATASET_QUERY_EXTRA, dataset_filters, is_locked
+from app.utils.metrics_exporter import METRICS_SNAPSHOT
+from app.ui.dataset_table import DatasetTableModel, ButtonDelegate
+
+
+def perform_dataset_action(action, names, passwords=None):
+    """
+    Locks or unlocks datasets concurrently; safe to run off the GUI thread.
+
+    Unlock passphrases come from `passwords` ({name: plain passphrase}) or
+    else from the encrypted passwords stored in config["datasets"].
+
+    Returns:
+        tuple: (action, {name: {"ok": bool, "result" or "error": ...}})
+    """
+    if action == "lock":
+        return action, lock_datasets(names)
+
+    passwords = passwords or {}
+    stored = get_dataset_passwords()
+    results = {}
+    credentials = []
+    for name in names:
+        if name in passwords:
+            credentials.append((name, passwords[name]))
+        elif name in stored:
+            try:
+                credentials.append((name, decrypt_password(stored[name])))
+            except Exception:
+                results[name] = {"ok": False, "error": "stored password cannot be decrypted"}
+        else:
+            results[name] = {"ok": False, "error": "no stored password"}
+    results.update(unlock_datasets(credentials))
+    return action, results
 
 
 class DatasetManager:
@@ -9,6 +47,15 @@ class DatasetManager:
         self.datasets = []  # To store dataset data
         self.outer_frame = None  # To hold the main widget for the tab
         self.layout = None  # To hold the layout
+        self.model = DatasetTableModel()  # Rows keyed by dataset id
+        self.table = None
+
+        # Lock/unlock jobs report back through the job tracker
+        self.pending_refresh = set()  # Datasets to refetch once their jobs are done
+        self.job_failures = {}        # Dataset name -> error from a finished job
+        self.flush_scheduled = False
+        self.parent.job_tracker.progress.connect(self.show_job_progress)
+        self.parent.job_tracker.finished.connect(self.on_job_finished)
 
     def get_widget(self):
         """Creates and returns the datasets tab widget with a refresh button and dynamic content."""
@@ -24,97 +71,201 @@ class DatasetManager:
 
         # Layout for the outer frame
         self.layout = QVBoxLayout(self.outer_frame)
-        self.layout.setAlignment(Qt.AlignTop)  # Align items to the top
         self.layout.setSpacing(5)  # Add spacing between rows
 
-        # Add refresh button
+        # Refresh and bulk action buttons
+        buttons_layout = QHBoxLayout()
         self.refresh_button = QPushButton("Refresh Datasets")
-        self.refresh_button.clicked.connect(self.refresh_data)
-        self.layout.addWidget(self.refresh_button)
+        self.refresh_button.clicked.connect(self.refresh_now)
+        buttons_layout.addWidget(self.refresh_button)
+        self.unlock_selected_button = QPushButton("Unlock Selected")
+        self.unlock_selected_button.clicked.connect(self.unlock_selected)
+        buttons_layout.addWidget(self.unlock_selected_button)
+        self.lock_selected_button = QPushButton("Lock Selected")
+        self.lock_selected_button.clicked.connect(self.lock_selected)
+        buttons_layout.addWidget(self.lock_selected_button)
+        self.layout.addLayout(buttons_layout)
 
-        # Populate the layout with datasets
-        self.refresh_data()
+        # Dataset table; lock buttons are painted by a delegate, not per-row widgets
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(32)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.button_delegate = ButtonDelegate(self.table)
+        self.button_delegate.clicked.connect(lambda row: self.toggle_state(self.model.dataset_at(row)))
+        self.table.setItemDelegateForColumn(DatasetTableModel.ACTION_COLUMN, self.button_delegate)
+        self.layout.addWidget(self.table)
 
         return self.outer_frame
 
-    def refresh_data(self):
-        """Fetches and updates dataset information."""
+    def refresh_data(self, force=False):
+        """Fetches dataset information in the background and updates the layout."""
+        self.parent.refresh_pipeline.submit(
+            "datasets", self.fetch_data, self.apply_data, self.show_refresh_error, force=force
+        )
+
+    def refresh_now(self):
+        """Refreshes on user request and polls faster for a while."""
+        self.parent.scheduler.boost()
+        self.refresh_data(force=True)
+
+    def fetch_data(self):
+        """Fetches the datasets shown in the table; safe to run off the GUI thread."""
+        return fetch_datasets(dataset_filters(), DATASET_FIELDS, DATASET_QUERY_EXTRA)
+
+    def apply_data(self, datasets):
+        """Stores fetched dataset data and updates the layout (GUI thread only)."""
         try:
-            datasets = fetch_datasets()  # Replace with actual API fetch logic
-            self.datasets = datasets
+            self.datasets = datasets or []
+            METRICS_SNAPSHOT.update_datasets(self.datasets)
             self.update_layout()
         except Exception as e:
-            self.parent.statusBar.showMessage(f"Error refreshing datasets: {str(e)}", 5000)
+            self.show_refresh_error(str(e))
+
+    def show_refresh_error(self, message):
+        """Reports a failed refresh in the status bar."""
+        self.parent.statusBar.showMessage(f"Error refreshing datasets: {message}", 5000)
 
     def update_layout(self):
-        """Updates the layout with dataset information."""
-        # Clear existing rows while preserving the refresh button
-        for i in reversed(range(1, self.layout.count())):  # Start at index 1 to skip the refresh button
-            widget = self.layout.takeAt(i).widget()
-            if widget:
-                widget.deleteLater()
-
-        # Add header row
-        self.layout.addWidget(self.create_header_row())
-
-        # Add rows for each dataset
-        for dataset in self.datasets:
-            self.layout.addWidget(self.create_dataset_row(dataset))
-
-    def create_header_row(self):
-        """Creates a header row for the dataset columns."""
-        header = QWidget()
-        header_layout = QHBoxLayout(header)
-
-        # Add header labels
-        header_layout.addWidget(QLabel("Name"), alignment=Qt.AlignLeft)
-        header_layout.addWidget(QLabel("State"), alignment=Qt.AlignCenter)
-        header_layout.addWidget(QLabel("Usage"), alignment=Qt.AlignCenter)
-        header_layout.addWidget(QLabel("Action"), alignment=Qt.AlignRight)
-
-        # Ensure alignment and style
-        header.setStyleSheet("font-weight: bold;")
-        header_layout.setSpacing(15)
-
-        return header
-
-    def create_dataset_row(self, dataset):
-        """Creates a single row for a dataset."""
-        row = QWidget()
-        row_layout = QHBoxLayout(row)
-
-        # Dataset attributes
-        name_label = QLabel(dataset.get("name", "Unknown"))
-        state_label = QLabel("Locked 🔒" if dataset.get("keystatus") == "unavailable" else "Unlocked 🔓")
-        usage_label = QLabel(f"{dataset.get('used_percent', 'N/A')}%")
-
-        # Action button
-        toggle_button = QPushButton("Un-/Lock")
-        toggle_button.clicked.connect(lambda: self.toggle_state(dataset))
-
-        # Add elements to the row layout
-        row_layout.addWidget(name_label, alignment=Qt.AlignLeft)
-        row_layout.addWidget(state_label, alignment=Qt.AlignCenter)
-        row_layout.addWidget(usage_label, alignment=Qt.AlignCenter)
-        row_layout.addWidget(toggle_button, alignment=Qt.AlignRight)
-
-        # Set spacing and margins
-        row_layout.setSpacing(15)
-        row_layout.setContentsMargins(5, 5, 5, 5)
-
-        return row
+        """Updates the table, touching only rows whose dataset changed."""
+        self.model.update_datasets(self.datasets)
+
+    def selected_datasets(self):
+        """Returns the datasets of the selected table rows."""
+        rows = sorted({index.row() for index in self.table.selectionModel().selectedRows()})
+        return [self.model.dataset_at(row) for row in rows]
+
+    def unlock_selected(self):
+        """Unlocks every selected locked dataset with its stored password."""
+        names = [d["name"] for d in self.selected_datasets() if is_locked(d)]
+        self.run_action("unlock", names)
+
+    def lock_selected(self):
+        """Locks every selected unlocked dataset."""
+        names = [d["name"] for d in self.selected_datasets() if not is_locked(d)]
+        self.run_action("lock", names)
+
+    def run_action(self, action, names, passwords=None):
+        """Runs a lock/unlock batch in the background."""
+        if not names:
+            self.parent.statusBar.showMessage(f"No selected datasets to {action}.", 5000)
+            return
+        if self.parent.refresh_pipeline.is_busy("dataset_actions"):
+            self.parent.statusBar.showMessage("Another lock/unlock operation is still running.", 5000)
+            return
+
+        self.parent.scheduler.boost()
+        self.set_actions_enabled(False)
+        verb = "Unlocking" if action == "unlock" else "Locking"
+        self.parent.statusBar.showMessage(f"{verb} {len(names)} dataset(s)...")
+        self.parent.refresh_pipeline.submit(
+            "dataset_actions",
+            lambda: perform_dataset_action(action, names, passwords),
+            self.apply_action_results,
+            self.show_action_error,
+        )
+
+    def set_actions_enabled(self, enabled):
+        """Enables or disables the lock/unlock controls while a batch runs."""
+        self.unlock_selected_button.setEnabled(enabled)
+        self.lock_selected_button.setEnabled(enabled)
+
+    def apply_action_results(self, outcome):
+        """Registers the jobs started by a lock/unlock batch and reports failed submissions (GUI thread only)."""
+        action, results = outcome
+        self.set_actions_enabled(True)
+        started = failed = 0
+        for name, result in results.items():
+            if not result["ok"]:
+                self.job_failures[name] = result["error"]
+                failed += 1
+                continue
+            job_id = result["result"]
+            if isinstance(job_id, int) and not isinstance(job_id, bool):
+                self.parent.job_tracker.register(job_id, (action, name))
+                started += 1
+            else:  # Finished synchronously
+                self.pending_refresh.add(name)
+
+        verb = "Unlocking" if action == "unlock" else "Locking"
+        self.parent.statusBar.showMessage(f"{verb}: {started} job(s) started, {failed} failed.", 10000)
+        self.schedule_job_updates()
+
+    def show_job_progress(self, job_id, percent, description):
+        """Shows the progress of a running lock/unlock job."""
+        if percent is not None:
+            self.parent.statusBar.showMessage(f"Job {job_id}: {percent:.0f}% {description}", 5000)
+
+    def on_job_finished(self, job_id, state, job, context):
+        """Collects the outcome of a finished lock/unlock job."""
+        action, name = context
+        if state in ("FAILED", "ABORTED"):
+            self.job_failures[name] = job.get("error") or state.lower()
+        elif isinstance(job.get("result"), dict) and name in (job["result"].get("failed") or {}):
+            failure = job["result"]["failed"][name]
+            self.job_failures[name] = failure.get("error") if isinstance(failure, dict) else str(failure)
+        self.pending_refresh.add(name)
+        self.schedule_job_updates()
+
+    def schedule_job_updates(self):
+        """Coalesces job results that arrive together into one refresh and one report."""
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            QTimer.singleShot(0, self.flush_job_updates)
+
+    def flush_job_updates(self):
+        """Refetches only the datasets whose jobs finished and reports failures."""
+        self.flush_scheduled = False
+        if self.job_failures:
+            failures, self.job_failures = self.job_failures, {}
+            QMessageBox.warning(
+                self.parent,
+                "Lock/Unlock Failed",
+                "\n".join(f"{name}: {error}" for name, error in sorted(failures.items())),
+            )
+        # One refetch at a time; datasets finishing meanwhile wait for the next one
+        if self.pending_refresh and not self.parent.refresh_pipeline.is_busy("dataset_rows"):
+            names, self.pending_refresh = sorted(self.pending_refresh), set()
+            self.parent.refresh_pipeline.submit(
+                "dataset_rows", lambda: fetch_datasets_by_name(names, DATASET_FIELDS, DATASET_QUERY_EXTRA), self.apply_rows,
+                self.show_rows_error,
+            )
+
+    def apply_rows(self, datasets):
+        """Updates the rows of refetched datasets and starts the next queued refetch (GUI thread only)."""
+        self.model.patch_datasets(datasets or [])
+        self.datasets = [self.model.datasets[dataset_id] for dataset_id in self.model.ids]
+        METRICS_SNAPSHOT.update_datasets(self.datasets)
+        if self.pending_refresh:
+            self.schedule_job_updates()
+
+    def show_rows_error(self, message):
+        """Reports a failed row refetch and starts the next queued one."""
+        self.show_refresh_error(message)
+        if self.pending_refresh:
+            self.schedule_job_updates()
+
+    def show_action_error(self, message):
+        """Reports a lock/unlock batch that failed as a whole."""
+        self.set_actions_enabled(True)
+        self.parent.statusBar.showMessage(f"Error changing dataset state: {message}", 5000)
 
     def toggle_state(self, dataset):
         """Toggles the encryption state of a dataset."""
-        from app.utils.api import lock_dataset, unlock_dataset
-        try:
-            if dataset.get("keystatus") == "unavailable":  # Locked, needs to be unlocked
-                password, ok = self.parent.get_password(f"Unlock {dataset['name']}")
-                if ok:
-                    unlock_dataset(dataset["name"], password)
-            else:  # Unlocked, needs to be locked
-                lock_dataset(dataset["name"])
-
-            self.refresh_data()
-        except Exception as e:
-            self.parent.statusBar.showMessage(f"Error toggling state for {dataset['name']}: {str(e)}", 5000)
+        name = dataset["name"]
+        if is_locked(dataset):  # Locked, needs to be unlocked
+            passwords = None
+            if name not in get_dataset_passwords():
+                password, ok = QInputDialog.getText(
+                    self.parent, f"Unlock {name}", "Passphrase:", QLineEdit.Password
+                )
+                if not ok:
+                    return
+                passwords = {name: password}
+            self.run_action("unlock", [name], passwords)
+        else:  # Unlocked, needs to be locked
+            self.run_action("lock", [name])
@@ -1,6 +1,12 @@
-from PyQt5.QtWidgets import QWidget, QMessageBox, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame
 from PyQt5.QtCore import Qt
 from app.utils.api import fetch_smart_data
+from app.utils.cache import TTLCache
+from app.utils.config import load_config
+from app.utils.disks import DISK_FIELDS
+from app.utils.metrics_exporter import METRICS_SNAPSHOT
+from app.utils import ssh_commandsdel
+from app.ui.disk_details import DiskDetailPanel
 
 
 class DiskManager:
@@ -9,6 +15,11 @@ class DiskManager:
         self.disks = []  # To store disk data
         self.outer_frame = None  # To hold the main widget for the tab
         self.layout = None  # To hold the layout
+        self.rows_layout = None  # Holds the header and disk rows
+        self.details_panel = None
+        self.selected_disk = None
+        # SMART details per disk serial; entries older than half the TTL are refreshed in the background
+        self.details_cache = TTLCache(maxsize=128, ttl=300)
 
     def get_widget(self):
         """Creates and returns the disks tab widget with a refresh button and dynamic content."""
@@ -29,37 +40,76 @@ class DiskManager:
 
         # Add refresh button
         self.refresh_button = QPushButton("Refresh Disks")
-        self.refresh_button.clicked.connect(self.refresh_data)
+        self.refresh_button.clicked.connect(self.refresh_now)
         self.layout.addWidget(self.refresh_button)
 
-        # Populate the layout with disks
-        self.refresh_data()
+        # Disk rows on the left, details of the selected disk on the right
+        content_layout = QHBoxLayout()
+        rows_widget = QWidget()
+        self.rows_layout = QVBoxLayout(rows_widget)
+        self.rows_layout.setAlignment(Qt.AlignTop)
+        self.rows_layout.setContentsMargins(0, 0, 0, 0)
+        content_layout.addWidget(rows_widget, 1)
+        self.details_panel = DiskDetailPanel()
+        content_layout.addWidget(self.details_panel, 1)
+        self.layout.addLayout(content_layout)
 
         return self.outer_frame
 
-    def refresh_data(self):
-        """Fetches and updates disk information."""
+    def refresh_data(self, force=False):
+        """Fetches disk information in the background and updates the layout."""
+        self.parent.refresh_pipeline.submit(
+            "disks", self.fetch_disks, self.apply_data, self.show_refresh_error, force=force
+        )
+
+    def refresh_now(self):
+        """Refreshes on user request and polls faster for a while."""
+        self.parent.scheduler.boost()
+        self.refresh_data(force=True)
+
+    def fetch_disks(self):
+        """Fetches disk records; safe to run off the GUI thread."""
+        # With SSH credentials configured, one batched smartctl run yields
+        # temperature and health for every drive in a single round trip.
+        if load_config().get("password"):
+            return ssh_commandsdel.fetch_smart_data()
+        return fetch_smart_data([["expiretime", "=", None]], DISK_FIELDS)
+
+    def apply_data(self, disks):
+        """Stores fetched disk data and updates the layout (GUI thread only)."""
         try:
-            disks = fetch_smart_data()  # Replace with actual API fetch logic
-            self.disks = disks
+            self.disks = disks or []
+            METRICS_SNAPSHOT.update_disks(self.disks)
+            # The batched SSH collector already returns full SMART records
+            for disk in self.disks:
+                if "attributes" in disk:
+                    self.details_cache.put(self.disk_key(disk), disk)
             self.update_layout()
+            if self.selected_disk:
+                key = self.disk_key(self.selected_disk)
+                selected = [disk for disk in self.disks if self.disk_key(disk) == key]
+                self.show_disk_details(selected[0] if selected else self.selected_disk)
         except Exception as e:
-            self.parent.statusBar.showMessage(f"Error refreshing disks: {str(e)}", 5000)
+            self.show_refresh_error(str(e))
+
+    def show_refresh_error(self, message):
+        """Reports a failed refresh in the status bar."""
+        self.parent.statusBar.showMessage(f"Error refreshing disks: {message}", 5000)
 
     def update_layout(self):
         """Updates the layout with disk information."""
-        # Clear existing rows while preserving the refresh button
-        for i in reversed(range(1, self.layout.count())):  # Start at index 1 to skip the refresh button
-            widget = self.layout.takeAt(i).widget()
+        # Clear existing rows
+        for i in reversed(range(self.rows_layout.count())):
+            widget = self.rows_layout.takeAt(i).widget()
             if widget:
                 widget.deleteLater()
 
         # Add header row
-        self.layout.addWidget(self.create_header_row())
+        self.rows_layout.addWidget(self.create_header_row())
 
         # Add rows for each disk
         for disk in self.disks:
-            self.layout.addWidget(self.create_disk_row(disk))
+            self.rows_layout.addWidget(self.create_disk_row(disk))
 
     def create_header_row(self):
         """Creates a header row for the disk columns."""
@@ -104,6 +154,48 @@ class DiskManager:
 
         return row
 
+    @staticmethod
+    def disk_key(disk):
+        """Returns the cache key for a disk: its serial, or its name if unknown."""
+        return disk.get("serial") or disk.get("name")
+
+    @staticmethod
+    def disk_device(disk):
+        """Returns the device path of a disk (the REST API reports bare names like 'sda')."""
+        name = disk.get("name", "")
+        return name if name.startswith("/dev/") else f"/dev/{name}"
+
     def show_disk_details(self, disk):
-        """Displays additional details about the selected disk."""
-        QMessageBox.information(self.parent, "Disk Details", f"Details for disk: {disk.get('name')}")
+        """Shows SMART details for a disk, from cache when possible."""
+        self.selected_disk = disk
+        key = self.disk_key(disk)
+        entry = self.details_cache.get_entry(key)
+
+        if entry:
+            details, age = entry
+            self.details_panel.show_details(details)
+            if age < self.details_cache.ttl / 2:
+                return
+        else:
+            self.details_panel.show_loading(disk.get("name", "Unknown"))
+
+        # Cold or ageing entry: fetch in the background
+        device = self.disk_device(disk)
+        self.parent.refresh_pipeline.submit(
+            "disk_details",
+            lambda: ssh_commandsdel.fetch_smart_details(device),
+            lambda details: self.apply_disk_details(key, details),
+            lambda message: self.show_details_error(key, disk, message),
+            force=True,
+        )
+
+    def apply_disk_details(self, key, details):
+        """Caches fetched details and shows them if the disk is still selected."""
+        self.details_cache.put(key, details)
+        if self.selected_disk and self.disk_key(self.selected_disk) == key:
+            self.details_panel.show_details(details)
+
+    def show_details_error(self, key, disk, message):
+        """Reports a failed detail fetch unless cached details are already shown."""
+        if self.selected_disk and self.disk_key(self.selected_disk) == key and not self.details_cache.get_entry(key):
+            self.details_panel.show_error(disk.get("name", "Unknown"), message)
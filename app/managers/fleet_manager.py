@@ -0,0 +1,182 @@
+import time
+from PyQt5.QtCore import QObject, pyqtSignal
+from app.ui.fleet_dashboard import FleetDashboard
+from app.utils.api import using_host, fetch_datasets, fetch_smart_data, fetch_alerts
+from app.utils.config import get_fleet_hosts, subscribe
+from app.utils.background_task import RefreshPipeline
+from app.utils.poll_scheduler import PollScheduler
+from app.utils.datasets import DATASET_FIELDS, DATASET_QUERY_EXTRA, is_locked, format_usage
+from app.utils.disks import DISK_FIELDS
+
+FLEET_MAX_CONCURRENCY = 8  # Requests in flight across all hosts
+FLEET_HOST_CONCURRENCY = 1  # Requests in flight per host
+
+# Data source -> (fetch, interval, hidden interval) per host
+FLEET_SOURCES = {
+    "datasets": (
+        lambda: fetch_datasets([["encrypted", "=", True]], DATASET_FIELDS, DATASET_QUERY_EXTRA), 15, 300,
+    ),
+    "disks": (lambda: fetch_smart_data([["expiretime", "=", None]], DISK_FIELDS), 30, 600),
+    "alerts": (fetch_alerts, 15, 300),
+}
+
+
+class _ConfigSignals(QObject):
+    """Carries configuration changes from any thread to the GUI thread."""
+    changed = pyqtSignal()
+
+
+class FleetManager:
+    """
+    Polls every host of a fleet configuration and feeds the aggregated dashboard.
+
+    Each host has its own connection pool (via using_host()) and its own poll
+    scheduler, so a slow or offline host backs off on its own. All hosts share
+    one pipeline whose thread count is the global concurrency limit, and each
+    host may only have FLEET_HOST_CONCURRENCY fetches in flight, so slow hosts
+    hold at most one thread each and the healthy ones keep being polled.
+    The host list follows the configuration.
+    """
+
+    def __init__(self, parent, hosts, max_concurrency=FLEET_MAX_CONCURRENCY):
+        self.parent = parent
+        self.hosts = {}  # host name -> host dict
+        self.dashboard = FleetDashboard(parent)
+        self.pipeline = RefreshPipeline(parent, max_workers=max_concurrency)
+        self.state = {}  # host name -> {"datasets": [...], "disks": [...], "alerts": [...], "error": str, "updated": float}
+        self.schedulers = {}
+        self.running = False
+
+        for host in hosts:
+            self.add_host(host)
+
+        self.config_signals = _ConfigSignals()
+        self.config_signals.changed.connect(self.reload_hosts)
+        subscribe(lambda config: self.config_signals.changed.emit())
+
+    def add_host(self, host):
+        """Starts tracking a host."""
+        name = host["name"]
+        self.hosts[name] = host
+        self.state[name] = {"datasets": [], "disks": [], "alerts": [], "error": None, "updated": None}
+        scheduler = PollScheduler(
+            self.pipeline, self.parent, is_hidden=self.is_hidden, max_in_flight=FLEET_HOST_CONCURRENCY,
+        )
+        for kind, (fetch, interval, hidden_interval) in FLEET_SOURCES.items():
+            scheduler.add_source(
+                f"{name}/{kind}",
+                self.host_fetch(host, fetch),
+                lambda data, host=host, kind=kind: self.apply_data(host, kind, data),
+                lambda message, host=host: self.show_error(host, message),
+                interval=interval, hidden_interval=hidden_interval,
+            )
+        self.schedulers[name] = scheduler
+        self.update_host_row(name)
+        if self.running:
+            scheduler.start()
+
+    def remove_host(self, name):
+        """Stops tracking a host; results still in flight for it are ignored."""
+        self.schedulers.pop(name).stop()
+        del self.hosts[name]
+        del self.state[name]
+        self.dashboard.remove_host(name)
+
+    def reload_hosts(self):
+        """Applies the configuration's host list: new hosts are added, removed or changed ones replaced."""
+        configured = {host["name"]: host for host in get_fleet_hosts()}
+        for name in list(self.hosts):
+            if configured.get(name) != self.hosts[name]:
+                self.remove_host(name)
+        for name, host in configured.items():
+            if name not in self.hosts:
+                self.add_host(host)
+
+    def is_current(self, host):
+        """True if results fetched for this host dict should still be shown."""
+        return self.hosts.get(host["name"]) is host
+
+    def get_widget(self):
+        """Returns the dashboard widget."""
+        return self.dashboard
+
+    def is_hidden(self):
+        """True while the dashboard is not on screen."""
+        return self.parent.isMinimized() or not self.dashboard.isVisible()
+
+    @staticmethod
+    def host_fetch(host, fetch):
+        """Wraps a fetch so its API calls go to the given host; runs off the GUI thread."""
+        def run():
+            with using_host(host):
+                return fetch()
+        return run
+
+    def start(self):
+        """Starts polling all hosts."""
+        self.running = True
+        for scheduler in self.schedulers.values():
+            scheduler.start()
+
+    def stop(self):
+        """Stops polling all hosts."""
+        self.running = False
+        for scheduler in self.schedulers.values():
+            scheduler.stop()
+
+    def reschedule(self):
+        """Re-evaluates polling cadences, e.g. after the dashboard was shown or hidden."""
+        for scheduler in self.schedulers.values():
+            scheduler.reschedule()
+
+    def apply_data(self, host, kind, data):
+        """Stores one host's fetched data and updates the dashboard (GUI thread only)."""
+        if not self.is_current(host):
+            return
+        name = host["name"]
+        state = self.state[name]
+        state[kind] = data or []
+        state["error"] = None
+        state["updated"] = time.time()
+
+        if kind == "datasets":
+            rows = [
+                (d.get("name", "Unknown"),
+                 "Locked" if is_locked(d) else "Unlocked",
+                 format_usage(d))
+                for d in state[kind]
+            ]
+        elif kind == "disks":
+            rows = [
+                (d.get("name", "Unknown"), d.get("model"), d.get("health", "Unknown"), d.get("temperature"))
+                for d in state[kind]
+            ]
+        else:
+            rows = [
+                ((a.get("level") or "").upper(), a.get("formatted"))
+                for a in state[kind] if not a.get("dismissed")
+            ]
+        self.dashboard.set_host_rows(kind, name, rows)
+        self.update_host_row(name)
+
+    def show_error(self, host, message):
+        """Marks a host as failing; its last data stays visible."""
+        if not self.is_current(host):
+            return
+        name = host["name"]
+        self.state[name]["error"] = message
+        self.update_host_row(name)
+
+    def update_host_row(self, name):
+        """Refreshes a host's summary row."""
+        state = self.state[name]
+        locked = sum(1 for d in state["datasets"] if is_locked(d))
+        updated = time.strftime("%H:%M:%S", time.localtime(state["updated"])) if state["updated"] else "never"
+        status = f"Error: {state['error']}" if state["error"] else ("OK" if state["updated"] else "Connecting...")
+        self.dashboard.set_host_rows("hosts", name, [(
+            status,
+            f"{locked}/{len(state['datasets'])}",
+            len(state["disks"]),
+            sum(1 for a in state["alerts"] if not a.get("dismissed")),
+            updated,
+        )])
@@ -1,39 +1,111 @@
-from app.ui.performance_visualisation import PerformanceVisualisation
-from app.utils.api import fetch_system_info, fetch_disk_stats, fetch_network_stats
+import logging
+import time
+import numpy as np
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
+from app.utils.metrics_collector import MetricsCollector, BACKFILL_SECONDS, HISTORY_SECONDS, METRIC_NAMES
+from app.utils.metrics_exporter import METRICS_SNAPSHOT
+from app.utils.metrics_store import MetricsStore
 
 class PerformanceManager:
     def __init__(self, parent=None):
-        self.visualization = PerformanceVisualisation(parent)
+        try:
+            store = MetricsStore()
+        except Exception as e:
+            logging.error(f"Metrics store unavailable, history will not be kept: {e}")
+            store = None
+        self.collector = MetricsCollector(store, METRICS_SNAPSHOT)
+        # The charts (and pyqtgraph) are built by build_visualization() once the window is up;
+        # until then a placeholder is shown and incoming data is queued
+        self.visualization = None
+        self.pending_history = None
+        self.pending_metrics = []
+        self.widget = QWidget(parent)
+        self.widget_layout = QVBoxLayout(self.widget)
+        self.widget_layout.setContentsMargins(0, 0, 0, 0)
+        self.placeholder = QLabel("Loading charts...")
+        self.placeholder.setAlignment(Qt.AlignCenter)
+        self.widget_layout.addWidget(self.placeholder)
+
+    @property
+    def store(self):
+        """The metrics store samples are recorded in, or None."""
+        return self.collector.store
 
     def get_widget(self):
-        """Returns the visualization widget."""
-        return self.visualization
+        """Returns the container the visualization is shown in."""
+        return self.widget
+
+    def build_visualization(self):
+        """Creates the charts in place of the placeholder and replays queued data (GUI thread only)."""
+        if self.visualization is not None:
+            return
+        from app.ui.performance_visualisation import PerformanceVisualisation
+        self.visualization = PerformanceVisualisation(self.widget, self.store)
+        self.widget_layout.replaceWidget(self.placeholder, self.visualization)
+        self.placeholder.deleteLater()
+        self.placeholder = None
+
+        if self.pending_history is not None:
+            self.visualization.load_history(self.pending_history)
+        for timestamp, metrics in self.pending_metrics:
+            self.visualization.update(metrics, timestamp)
+        self.pending_history = None
+        self.pending_metrics = []
+
+    def load_history(self):
+        """
+        Reads the last day of stored samples, with the last hour backfilled from
+        the server's reporting history; safe to run off the GUI thread.
+        """
+        now = time.time()
+        backfill = self.collector.fetch_backfill(now - BACKFILL_SECONDS, now)
+        if self.store is None:
+            return backfill
+
+        for name, (timestamps, values) in backfill.items():
+            self.store.add_many(name, timestamps, values)
+        history = {}
+        for name in METRIC_NAMES:
+            timestamps, values = self.store.query(name, now - HISTORY_SECONDS, now)
+            if name in backfill:
+                # Keep stored rollups before the backfill and the server's finer samples after it
+                keep = timestamps < backfill[name][0][0]
+                timestamps = np.concatenate([timestamps[keep], backfill[name][0]])
+                values = np.concatenate([values[keep], backfill[name][1]])
+            history[name] = (timestamps, values)
+        return history
+
+    def apply_history(self, history):
+        """Seeds the plots with stored history (GUI thread only)."""
+        if self.visualization is None:
+            self.pending_history = history
+        else:
+            self.visualization.load_history(history)
+
+    def close(self):
+        """Writes buffered samples to disk."""
+        self.collector.close()
+        if self.visualization is not None:
+            self.visualization.store = None
+
+    def device_rates(self):
+        """Returns the latest per-disk and per-interface rates in bytes per second."""
+        return self.collector.device_rates()
 
     def update_metrics(self):
         """Fetches and updates performance metrics."""
-        try:
-            # Fetch System Info
-            system_info = fetch_system_info()
-            cpu_load = system_info.get("loadavg", [0])[0] if system_info else 0
-
-            # Fetch Disk Stats
-            disk_stats = fetch_disk_stats()
-            disk_read = sum(disk.get("read_bytes", 0) for disk in disk_stats) / (1024 * 1024) if disk_stats else 0
-            disk_write = sum(disk.get("write_bytes", 0) for disk in disk_stats) / (1024 * 1024) if disk_stats else 0
-
-            # Fetch Network Stats
-            network_stats = fetch_network_stats()
-            network_in = sum(interface.get("received_bytes", 0) for interface in network_stats) / (1024 * 1024) if network_stats else 0
-            network_out = sum(interface.get("sent_bytes", 0) for interface in network_stats) / (1024 * 1024) if network_stats else 0
-
-            # Update Visualization
-            self.visualization.update({
-                "cpu_load": cpu_load,
-                "disk_read": disk_read,
-                "disk_write": disk_write,
-                "network_in": network_in,
-                "network_out": network_out
-            })
+        self.apply_metrics(self.collect_metrics())
 
-        except Exception as e:
-            print(f"Error updating performance metrics: {e}")
+    def apply_metrics(self, metrics):
+        """Pushes collected metrics to the visualization (GUI thread only)."""
+        if metrics is None:
+            return
+        if self.visualization is None:
+            self.pending_metrics.append((time.time(), metrics))
+        else:
+            self.visualization.update(metrics)
+
+    def collect_metrics(self):
+        """Fetches performance metrics; safe to run off the GUI thread."""
+        return self.collector.collect()
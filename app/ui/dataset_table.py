@@ -0,0 +1,135 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, pyqtSignal
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyleOptionButton, QStyle, QApplication
+from app.utils.datasets import is_locked, format_usage
+
+
+class DatasetTableModel(QAbstractTableModel):
+    """
+    Table model for the Datasets tab, keyed by dataset id.
+
+    update_datasets() diffs a fresh dataset list against the current rows and
+    emits only insert/remove/dataChanged for rows that actually changed, so a
+    refresh costs work proportional to the number of changes.
+    """
+    HEADERS = ["Name", "State", "Usage", "Action"]
+    ACTION_COLUMN = 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.ids = []        # Row order
+        self.datasets = {}   # id -> dataset dict
+        self.rows = {}       # id -> tuple of displayed values
+
+    @staticmethod
+    def dataset_id(dataset):
+        """Returns the key identifying a dataset across refreshes."""
+        return dataset.get("id") or dataset.get("name", "Unknown")
+
+    @staticmethod
+    def display_values(dataset):
+        """Returns the displayed (name, state, usage) values for a dataset."""
+        return (
+            dataset.get("name", "Unknown"),
+            "Locked 🔒" if is_locked(dataset) else "Unlocked 🔓",
+            format_usage(dataset),
+        )
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            if index.column() == self.ACTION_COLUMN:
+                return "Un-/Lock"
+            return self.rows[self.ids[index.row()]][index.column()]
+        if role == Qt.TextAlignmentRole and index.column() > 0:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def dataset_at(self, row):
+        """Returns the dataset dict shown in a row."""
+        return self.datasets[self.ids[row]]
+
+    def update_datasets(self, datasets):
+        """Applies a fresh dataset list, touching only rows that changed."""
+        incoming = {}
+        for dataset in datasets:
+            incoming[self.dataset_id(dataset)] = dataset
+
+        # Remove vanished rows, from the bottom so earlier row numbers stay valid
+        for row in reversed(range(len(self.ids))):
+            if self.ids[row] not in incoming:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                dataset_id = self.ids.pop(row)
+                del self.datasets[dataset_id]
+                del self.rows[dataset_id]
+                self.endRemoveRows()
+
+        # Update changed rows in place
+        for row, dataset_id in enumerate(self.ids):
+            self._set_row(row, incoming[dataset_id])
+
+        self._append([dataset for dataset_id, dataset in incoming.items() if dataset_id not in self.rows])
+
+    def patch_datasets(self, datasets):
+        """Updates or adds the given datasets, leaving all other rows untouched."""
+        positions = {dataset_id: row for row, dataset_id in enumerate(self.ids)}
+        new_datasets = []
+        for dataset in datasets:
+            row = positions.get(self.dataset_id(dataset))
+            if row is None:
+                new_datasets.append(dataset)
+            else:
+                self._set_row(row, dataset)
+        self._append(new_datasets)
+
+    def _set_row(self, row, dataset):
+        """Stores a dataset for an existing row and repaints it if its values changed."""
+        dataset_id = self.ids[row]
+        self.datasets[dataset_id] = dataset
+        values = self.display_values(dataset)
+        if values != self.rows[dataset_id]:
+            self.rows[dataset_id] = values
+            self.dataChanged.emit(self.index(row, 0), self.index(row, self.ACTION_COLUMN - 1))
+
+    def _append(self, datasets):
+        """Appends new rows in one block."""
+        if not datasets:
+            return
+        first = len(self.ids)
+        self.beginInsertRows(QModelIndex(), first, first + len(datasets) - 1)
+        for dataset in datasets:
+            dataset_id = self.dataset_id(dataset)
+            self.ids.append(dataset_id)
+            self.datasets[dataset_id] = dataset
+            self.rows[dataset_id] = self.display_values(dataset)
+        self.endInsertRows()
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """Paints a push button in a cell and emits the clicked row, without per-row widgets."""
+    clicked = pyqtSignal(int)
+
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(4, 2, -4, -2)
+        button.text = index.data(Qt.DisplayRole)
+        button.state = QStyle.State_Enabled
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.CE_PushButton, button, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and option.rect.contains(event.pos()):
+            self.clicked.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
@@ -1,7 +1,173 @@
 import os
+import mmap
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QThread
+from PyQt5.QtGui import QFontDatabase
 from PyQt5.QtWidgets import (
-    QDialog, QTabWidget, QVBoxLayout, QTextEdit, QPushButton, QHBoxLayout, QWidget
+    QDialog, QTabWidget, QVBoxLayout, QListView, QPushButton, QHBoxLayout, QWidget, QAbstractItemView
 )
+from app.utils.background_task import Worker
+
+TAIL_BYTES = 256 * 1024  # Indexed up front so the end of the log shows immediately
+INDEX_CHUNK = 64 * 1024 * 1024  # Bytes scanned per step while building the line index
+MAX_LINE_CHARS = 4096  # Longer lines are cut off in the view
+
+
+def find_line_starts(buffer, start, end):
+    """
+    Finds the offsets of lines that start after a newline in buffer[start:end].
+    Args:
+        buffer: A bytes-like object (e.g. an mmap).
+        start (int): First byte to scan.
+        end (int): Byte after the last one to scan.
+    Returns:
+        numpy.ndarray: Offsets (int64) following each newline in the range.
+    """
+    parts = []
+    position = start
+    while position < end:
+        stop = min(position + INDEX_CHUNK, end)
+        chunk = np.frombuffer(buffer, dtype=np.uint8, count=stop - position, offset=position)
+        parts.append(np.flatnonzero(chunk == 10).astype(np.int64) + (position + 1))
+        del chunk  # Release the buffer export so the mmap can be closed
+        position = stop
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+def index_file_head(path, end):
+    """Builds the line-start index for path[0:end] from a private mapping (runs in a worker)."""
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        starts = find_line_starts(buffer, 0, end - 1)
+    return np.concatenate([np.zeros(1, dtype=np.int64), starts])
+
+
+class LogFileModel(QAbstractListModel):
+    """
+    Read-only list model over a memory-mapped log file.
+
+    Only an array of line-start offsets is kept in memory; line text is
+    decoded on demand for the rows the view actually paints.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.path = None
+        self.file = None
+        self.buffer = None
+        self.size = 0
+        self.inode = None
+        self.starts = np.empty(0, dtype=np.int64)
+        self.message = None  # Shown as the only row instead of file content
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return 1 if self.message else len(self.starts)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        if self.message:
+            return self.message
+        if self.buffer is None:
+            return None
+        row = index.row()
+        start = int(self.starts[row])
+        end = int(self.starts[row + 1]) if row + 1 < len(self.starts) else self.size
+        end = min(end, start + MAX_LINE_CHARS * 4)
+        return self.buffer[start:end].rstrip(b"\r\n").decode("utf-8", errors="replace")[:MAX_LINE_CHARS]
+
+    def open(self, path):
+        """
+        Maps a file and indexes its tail.
+        Returns:
+            int: Offset below which lines still need to be indexed (0 if none).
+        """
+        self.beginResetModel()
+        self.close()
+        self.path = path
+        self.file = open(path, "rb")
+        stat = os.fstat(self.file.fileno())
+        self.size, self.inode = stat.st_size, stat.st_ino
+
+        head_end = 0
+        if self.size:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.size > TAIL_BYTES:
+                newline = self.buffer.find(b"\n", self.size - TAIL_BYTES)
+                head_end = newline + 1 if 0 <= newline < self.size - 1 else 0
+            self.starts = np.concatenate([
+                np.array([head_end], dtype=np.int64),
+                find_line_starts(self.buffer, head_end, self.size - 1),
+            ])
+        self.endResetModel()
+        return head_end
+
+    def prepend_head(self, head_starts, head_end):
+        """Inserts the background-built index for the lines before the tail."""
+        if self.buffer is None or not len(self.starts) or int(self.starts[0]) != head_end:
+            return 0  # The file was reloaded in the meantime
+        count = len(head_starts)
+        self.beginInsertRows(QModelIndex(), 0, count - 1)
+        self.starts = np.concatenate([head_starts, self.starts])
+        self.endInsertRows()
+        return count
+
+    def refresh(self):
+        """
+        Picks up data appended since the last load.
+        Returns:
+            bool: False if the file was replaced or truncated and must be reopened.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        if stat.st_ino != self.inode or stat.st_size < self.size:
+            return False
+        if stat.st_size == self.size:
+            return True
+
+        old_size = self.size
+        if self.buffer is not None:
+            self.buffer.close()
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.size = stat.st_size
+
+        new_starts = find_line_starts(self.buffer, max(old_size - 1, 0), self.size - 1)
+        if len(self.starts):
+            # The previous last line may have grown
+            last = self.index(len(self.starts) - 1)
+            self.dataChanged.emit(last, last)
+        else:
+            new_starts = np.concatenate([np.zeros(1, dtype=np.int64), new_starts])
+        if len(new_starts):
+            first = len(self.starts)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_starts) - 1)
+            self.starts = np.concatenate([self.starts, new_starts])
+            self.endInsertRows()
+        return True
+
+    def show_message(self, message):
+        """Replaces the content with a single message row."""
+        self.beginResetModel()
+        self.close()
+        self.message = message
+        self.endResetModel()
+
+    def close(self):
+        """Unmaps and closes the current file."""
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.path = None
+        self.size = 0
+        self.starts = np.empty(0, dtype=np.int64)
+        self.message = None
+
 
 class LogViewerDialog(QDialog):
     def __init__(self, title, log_files, parent=None):
@@ -9,6 +175,7 @@ class LogViewerDialog(QDialog):
         self.setWindowTitle(title)
         self.resize(800, 600)
         self.log_files = log_files  # Dictionary of log types and their file paths
+        self.index_threads = []  # Background index builds still running
 
         # Layout setup
         main_layout = QVBoxLayout(self)
@@ -43,15 +210,20 @@ class LogViewerDialog(QDialog):
         tab = QWidget()
         tab_layout = QVBoxLayout(tab)
 
-        # Log viewer text area
-        log_viewer = QTextEdit(tab)
-        log_viewer.setReadOnly(True)
+        # Virtualized log view: only visible lines are decoded and painted
+        log_model = LogFileModel(tab)
+        log_viewer = QListView(tab)
+        log_viewer.setModel(log_model)
+        log_viewer.setUniformItemSizes(True)
+        log_viewer.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        log_viewer.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
         tab_layout.addWidget(log_viewer)
 
         # Store references for later use
         self.tabs[log_type] = {
             "log_file": log_file,
-            "log_viewer": log_viewer
+            "log_viewer": log_viewer,
+            "log_model": log_model
         }
 
         # Load initial log content
@@ -61,25 +233,77 @@ class LogViewerDialog(QDialog):
         self.tab_widget.addTab(tab, log_type)
 
     def load_log_content(self, log_type):
-        """Loads the content of the log file into the corresponding viewer."""
+        """Maps the log file, shows its tail and indexes the rest in the background."""
         tab_data = self.tabs.get(log_type)
         if not tab_data:
             return
 
         log_file = tab_data["log_file"]
         log_viewer = tab_data["log_viewer"]
+        log_model = tab_data["log_model"]
 
         if os.path.exists(log_file):
             try:
-                with open(log_file, "r", encoding="utf-8", errors="replace") as file:
-                    content = file.read()
-                log_viewer.setPlainText(content)
+                head_end = log_model.open(log_file)
+                log_viewer.scrollToBottom()
+                if head_end:
+                    self.index_head_in_background(log_type, log_file, head_end)
             except Exception as e:
-                log_viewer.setPlainText(f"Error loading log file: {str(e)}")
+                log_model.show_message(f"Error loading log file: {str(e)}")
         else:
-            log_viewer.setPlainText("Log file not found.")
+            log_model.show_message("Log file not found.")
+
+    def index_head_in_background(self, log_type, log_file, head_end):
+        """Builds the line index for the part of the file before the tail in a worker thread."""
+        thread = QThread(self)
+        worker = Worker(lambda: index_file_head(log_file, head_end))
+        worker.moveToThread(thread)
+
+        worker.completed.connect(
+            lambda success, result: self.handle_index_completion(log_type, head_end, success, result)
+        )
+        worker.completed.connect(thread.quit)
+        thread.started.connect(worker.run)
+        thread.finished.connect(lambda: self.index_threads.remove((thread, worker)))
+        thread.finished.connect(thread.deleteLater)
+
+        self.index_threads.append((thread, worker))
+        thread.start()
+
+    def handle_index_completion(self, log_type, head_end, success, result):
+        """Adds the background-built index rows while keeping the visible lines in place."""
+        tab_data = self.tabs[log_type]
+        log_viewer = tab_data["log_viewer"]
+        if not success:
+            tab_data["log_model"].show_message(f"Error indexing log file: {result}")
+            return
+
+        scroll_bar = log_viewer.verticalScrollBar()
+        at_bottom = scroll_bar.value() == scroll_bar.maximum()
+        first_visible = log_viewer.indexAt(log_viewer.rect().topLeft()).row()
+
+        inserted = tab_data["log_model"].prepend_head(result, head_end)
+        if at_bottom:
+            log_viewer.scrollToBottom()
+        elif inserted and first_visible >= 0:
+            log_viewer.scrollTo(tab_data["log_model"].index(first_visible + inserted), QListView.PositionAtTop)
 
     def refresh_all_logs(self):
-        """Refreshes all logs in all tabs."""
-        for log_type in self.tabs.keys():
-            self.load_log_content(log_type)
\ No newline at end of file
+        """Refreshes all logs in all tabs, reading only appended data where possible."""
+        for log_type, tab_data in self.tabs.items():
+            log_model = tab_data["log_model"]
+            log_viewer = tab_data["log_viewer"]
+            scroll_bar = log_viewer.verticalScrollBar()
+            at_bottom = scroll_bar.value() == scroll_bar.maximum()
+
+            if log_model.path and log_model.refresh():
+                if at_bottom:
+                    log_viewer.scrollToBottom()
+            else:
+                self.load_log_content(log_type)
+
+    def done(self, result):
+        """Releases the file mappings when the dialog closes."""
+        for tab_data in self.tabs.values():
+            tab_data["log_model"].close()
+        super().done(result)
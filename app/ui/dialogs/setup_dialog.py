@@ -1,9 +1,8 @@
 #Setup dialog
 
-import json
 import sys
 from PyQt5.QtWidgets import QApplication, QDialog, QVBoxLayout, QFormLayout, QLineEdit, QDialogButtonBox, QLabel, QMessageBox
-from app.utils.config import CONFIG_FILE
+from app.utils.config import save_config
 import requests
 
 class SetupDialog(QDialog):
@@ -66,8 +65,7 @@ class SetupDialog(QDialog):
             "api_key": self.api_key_input.text().strip()
         }
 
-        with open(CONFIG_FILE, "w") as file:
-            json.dump(config, file, indent=4)
+        save_config(config)
 
         self.done(1)  # Close the dialog and signal success
 
@@ -0,0 +1,80 @@
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+)
+
+
+class DiskDetailPanel(QWidget):
+    """Side panel on the Disks tab showing SMART attributes, self-tests and error counters."""
+
+    ATTRIBUTE_HEADERS = ["ID", "Attribute", "Value", "Worst", "Threshold", "Raw"]
+    SELF_TEST_HEADERS = ["Type", "Status", "Hours"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.title_label = QLabel("Select a disk to show its details.")
+        self.title_label.setStyleSheet("font-weight: bold;")
+        self.summary_label = QLabel("")
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.title_label)
+        layout.addWidget(self.summary_label)
+
+        layout.addWidget(QLabel("SMART Attributes"))
+        self.attributes_table = self._create_table(self.ATTRIBUTE_HEADERS)
+        layout.addWidget(self.attributes_table, 3)
+
+        layout.addWidget(QLabel("Self-Test Log"))
+        self.self_tests_table = self._create_table(self.SELF_TEST_HEADERS)
+        layout.addWidget(self.self_tests_table, 1)
+
+    def _create_table(self, headers):
+        """Creates a read-only table with the given column headers."""
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        return table
+
+    def _fill_table(self, table, rows):
+        """Replaces the rows of a table."""
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                table.setItem(row, column, QTableWidgetItem("" if value is None else str(value)))
+
+    def show_loading(self, disk_name):
+        """Shows a placeholder while details are fetched."""
+        self.title_label.setText(f"{disk_name}: loading details...")
+
+    def show_error(self, disk_name, message):
+        """Shows a failed detail fetch."""
+        self.title_label.setText(f"{disk_name}: details unavailable")
+        self.summary_label.setText(message)
+        self._fill_table(self.attributes_table, [])
+        self._fill_table(self.self_tests_table, [])
+
+    def show_details(self, details):
+        """Renders a SMART detail record from ssh_commandsdel.parse_smart_json()."""
+        self.title_label.setText(f"{details.get('name')} - {details.get('model', 'Unknown')}")
+
+        summary = [
+            f"Serial: {details.get('serial') or 'N/A'}",
+            f"Health: {details.get('health', 'N/A')}",
+            f"Temperature: {details.get('temperature', 'N/A')}°C",
+            f"Power-on hours: {details.get('power_on_hours') if details.get('power_on_hours') is not None else 'N/A'}",
+        ]
+        for name, count in details.get("error_counters", {}).items():
+            summary.append(f"{name}: {count}")
+        self.summary_label.setText("    ".join(summary))
+
+        self._fill_table(self.attributes_table, [
+            (a.get("id"), a.get("name"), a.get("value"), a.get("worst"), a.get("thresh"), a.get("raw"))
+            for a in details.get("attributes", [])
+        ])
+        self._fill_table(self.self_tests_table, [
+            (t.get("type"), t.get("status"), t.get("hours")) for t in details.get("self_tests", [])
+        ])
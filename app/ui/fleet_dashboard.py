@@ -0,0 +1,105 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTabWidget, QTableView, QHeaderView, QAbstractItemView
+
+
+class FleetTableModel(QAbstractTableModel):
+    """
+    Table of rows collected from several hosts.
+
+    Rows are kept per host, so one host's refresh replaces only its own rows
+    and never waits for, or disturbs, the others.
+    """
+
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.host_rows = {}  # host name -> that host's (host, *values) rows
+        self.rows = []       # Flattened (host, *values) rows in host order
+
+    def host_start(self, host):
+        """Returns the index of a host's first row in the flattened rows."""
+        return sum(len(self.host_rows[name]) for name in self.host_rows if name < host)
+
+    def set_host_rows(self, host, rows):
+        """Replaces the rows of one host; rows of other hosts, the selection and the scroll position stay."""
+        new_rows = [(host, *row) for row in rows]
+        start = self.host_start(host)
+        old_count = len(self.host_rows.get(host, []))
+        common = min(old_count, len(new_rows))
+
+        self.host_rows[host] = new_rows
+        self.rows[start:start + common] = new_rows[:common]
+        if common:
+            self.dataChanged.emit(self.index(start, 0), self.index(start + common - 1, len(self.headers) - 1))
+        if len(new_rows) > old_count:
+            self.beginInsertRows(QModelIndex(), start + common, start + len(new_rows) - 1)
+            self.rows[start + common:start + common] = new_rows[common:]
+            self.endInsertRows()
+        elif old_count > len(new_rows):
+            self.beginRemoveRows(QModelIndex(), start + common, start + old_count - 1)
+            del self.rows[start + common:start + old_count]
+            self.endRemoveRows()
+
+    def remove_host(self, host):
+        """Removes all rows of a host."""
+        if host in self.host_rows:
+            self.set_host_rows(host, [])
+            del self.host_rows[host]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            value = self.rows[index.row()][index.column()]
+            return "" if value is None else str(value)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+
+class FleetDashboard(QWidget):
+    """Aggregated view of hosts, datasets, disks and alerts across a fleet."""
+
+    TABLES = {
+        "hosts": ("Hosts", ["Host", "Status", "Datasets (locked/total)", "Disks", "Alerts", "Last update"]),
+        "datasets": ("Datasets", ["Host", "Name", "State", "Usage"]),
+        "disks": ("Disks", ["Host", "Name", "Model", "Health", "Temperature"]),
+        "alerts": ("Alerts", ["Host", "Level", "Alert"]),
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.tabs = QTabWidget()
+        layout.addWidget(self.tabs)
+
+        self.models = {}
+        for kind, (title, headers) in self.TABLES.items():
+            model = FleetTableModel(headers, self)
+            view = QTableView()
+            view.setModel(model)
+            view.verticalHeader().setVisible(False)
+            view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+            view.setSelectionBehavior(QAbstractItemView.SelectRows)
+            view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+            self.tabs.addTab(view, title)
+            self.models[kind] = model
+
+    def set_host_rows(self, kind, host, rows):
+        """Replaces one host's rows in a table ("hosts", "datasets", "disks" or "alerts")."""
+        self.models[kind].set_host_rows(host, rows)
+
+    def remove_host(self, host):
+        """Removes a host from every table."""
+        for model in self.models.values():
+            model.remove_host(host)
@@ -2,24 +2,31 @@ import os
 from PyQt5.QtWidgets import (
     QMainWindow, QVBoxLayout, QTabWidget, QWidget, QStatusBar, QMessageBox
 )
-from PyQt5.QtCore import QTimer, QThread
+from PyQt5.QtCore import QThread, QEvent, QTimer
 from app.ui.menu import MenuBuilder
-from app.ui.dialogs.config_dialog import ConfigDialog
-from app.ui.dialogs.log_viewer import LogViewerDialog
-from app.ui.dialogs.rebootpopup import RebootPopup
 from app.managers.dataset_manager import DatasetManager
 from app.managers.disk_manager import DiskManager
 from app.managers.performance_manager import PerformanceManager
-from app.utils.app_logging import configure_logging
+from app.utils.config import get_fleet_hosts
+from app.utils.app_logging import configure_logging, LOG_DIR
 from app.utils.dark_mode import load_dark_mode_state
-from app.utils.background_task import Worker
+from app.utils.background_task import Worker, RefreshPipeline
+from app.utils.job_tracker import JobTracker
+from app.utils.poll_scheduler import PollScheduler
 from app.utils.api import reboot_system, shutdown_system
+from app.utils.metrics_exporter import start_exporter
 
 class TrueNASManager(QMainWindow):
     def __init__(self):
         super().__init__()
         self.worker_thread = None  # Placeholder for the thread
 
+        # Background fetches for the managers; results are applied on the GUI thread
+        self.refresh_pipeline = RefreshPipeline(self)
+
+        # Watches lock/unlock jobs until the middleware reports them finished
+        self.job_tracker = JobTracker(self.refresh_pipeline, self)
+
         # Configure logging
         configure_logging()
 
@@ -46,22 +53,78 @@ class TrueNASManager(QMainWindow):
         # Start periodic updates
         self.init_timers()
 
+        # Optional /metrics endpoint serving what the managers collect
+        self.metrics_exporter = start_exporter()
+
+        # Build the charts right after the window first appears rather than before
+        QTimer.singleShot(0, self.performance_manager.build_visualization)
+
     def init_menu_bar(self):
         """Initializes the menu bar using MenuBuilder."""
         menu_builder = MenuBuilder(self)
         self.setMenuBar(menu_builder.create_menu_bar())
 
     def init_timers(self):
-        """Initializes timers for periodic updates."""
-        # Timer for performance updates
-        self.performance_timer = QTimer()
-        self.performance_timer.timeout.connect(self.performance_manager.update_metrics)
-        self.performance_timer.start(1000)
+        """Registers the periodic data sources with the poll scheduler."""
+        self.scheduler = PollScheduler(
+            self.refresh_pipeline, self, is_hidden=lambda: self.isMinimized() or not self.isVisible()
+        )
+        self.scheduler.add_source(
+            "performance",
+            self.performance_manager.collect_metrics,
+            self.performance_manager.apply_metrics,
+            interval=1, hidden_interval=30,
+        )
+        self.scheduler.add_source(
+            "datasets",
+            self.dataset_manager.fetch_data,
+            self.dataset_manager.apply_data,
+            self.dataset_manager.show_refresh_error,
+            interval=10, hidden_interval=120, boost_interval=3,
+            is_visible=lambda: self.tab_widget.currentWidget() is self.dataset_manager.outer_frame,
+        )
+        self.scheduler.add_source(
+            "disks",
+            self.disk_manager.fetch_disks,
+            self.disk_manager.apply_data,
+            self.disk_manager.show_refresh_error,
+            interval=10, hidden_interval=300, boost_interval=3,
+            is_visible=lambda: self.tab_widget.currentWidget() is self.disk_manager.outer_frame,
+        )
+        self.tab_widget.currentChanged.connect(lambda index: self.reschedule_polling())
 
-        # Timer for dataset and disk updates
-        self.refresh_timer = QTimer()
-        self.refresh_timer.timeout.connect(self.refresh_all_data)
-        self.refresh_timer.start(10000)
+        # Seed the plots with history kept from earlier sessions
+        self.refresh_pipeline.submit(
+            "history",
+            self.performance_manager.load_history,
+            self.performance_manager.apply_history,
+        )
+        self.scheduler.start()
+        if self.fleet_manager:
+            self.fleet_manager.start()
+
+    def reschedule_polling(self):
+        """Re-evaluates polling cadences after a tab or window state change."""
+        self.scheduler.reschedule()
+        if self.fleet_manager:
+            self.fleet_manager.reschedule()
+
+    def changeEvent(self, event):
+        """Adapts the polling cadence when the window is minimized or restored."""
+        if event.type() == QEvent.WindowStateChange and hasattr(self, "scheduler"):
+            self.reschedule_polling()
+        super().changeEvent(event)
+
+    def closeEvent(self, event):
+        """Stops polling and flushes collected metrics before the window closes."""
+        self.scheduler.stop()
+        if self.fleet_manager:
+            self.fleet_manager.stop()
+        self.refresh_pipeline.pool.waitForDone(5000)
+        self.performance_manager.close()
+        if self.metrics_exporter:
+            self.metrics_exporter.stop()
+        super().closeEvent(event)
 
     def refresh_all_data(self):
         """Refreshes all data (datasets and disks)."""
@@ -69,13 +132,37 @@ class TrueNASManager(QMainWindow):
         self.disk_manager.refresh_data()
 
     def view_log(self, log_type):
-        """Opens the log viewer for the specified log type."""
-        log_path = os.path.join(os.getcwd(), f"{log_type}.log")
-        log_dialog = LogViewerDialog(f"{log_type.capitalize()} Log", {"Log": log_path}, self)
+        """Opens the log viewer for the specified log type; server logs are synced over SSH first."""
+        if log_type == "server":
+            from app.utils.ssh_commandsdel import fetch_combined_server_logs
+            self.statusBar.showMessage("Syncing server logs...", 5000)
+            self.refresh_pipeline.submit(
+                "server_logs",
+                fetch_combined_server_logs,
+                lambda log_files: self.show_log_viewer("Server Log", log_files),
+                self.show_server_log_error,
+            )
+            return
+        self.show_log_viewer(f"{log_type.capitalize()} Log", {"Log": os.path.join(LOG_DIR, f"{log_type}.log")})
+
+    def show_log_viewer(self, title, log_files):
+        """Shows local log files ({tab name: path}) in the log viewer."""
+        from app.ui.dialogs.log_viewer import LogViewerDialog
+        log_dialog = LogViewerDialog(title, log_files, self)
         log_dialog.exec_()
 
+    def show_server_log_error(self, message):
+        """Reports a failed server log sync and shows the copies from the last successful one."""
+        from app.utils.ssh_commandsdel import ALERTS_LOG_FILE, MESSAGES_LOG_FILE
+        self.statusBar.showMessage(f"Error syncing server logs: {message}", 5000)
+        log_files = {name: path for name, path in (("Alerts", ALERTS_LOG_FILE), ("Messages", MESSAGES_LOG_FILE))
+                     if os.path.exists(path)}
+        if log_files:
+            self.show_log_viewer("Server Log", log_files)
+
     def open_config_dialog(self):
         """Opens the configuration dialog."""
+        from app.ui.dialogs.config_dialog import ConfigDialog
         config_dialog = ConfigDialog(self)
         if config_dialog.exec_():
             self.statusBar.showMessage("Configuration updated.", 5000)
@@ -139,6 +226,7 @@ class TrueNASManager(QMainWindow):
             QMessageBox.Yes | QMessageBox.No
         )
         if reply == QMessageBox.Yes:
+            from app.ui.dialogs.rebootpopup import RebootPopup
             self.reboot_popup = RebootPopup(self)
             self.reboot_popup.label.setText("Rebooting. Please wait...")
             self.reboot_popup.show()
@@ -155,6 +243,7 @@ class TrueNASManager(QMainWindow):
             QMessageBox.Yes | QMessageBox.No
         )
         if reply == QMessageBox.Yes:
+            from app.ui.dialogs.rebootpopup import RebootPopup
             self.reboot_popup = RebootPopup(self)
             self.reboot_popup.label.setText("Shutting down. Please wait...")
             self.reboot_popup.show()
@@ -207,6 +296,11 @@ class TrueNASManager(QMainWindow):
         self.performance_manager = PerformanceManager(self)
         self.dataset_manager = DatasetManager(self)
         self.disk_manager = DiskManager(self)
+        fleet_hosts = get_fleet_hosts()
+        self.fleet_manager = None
+        if fleet_hosts:
+            from app.managers.fleet_manager import FleetManager
+            self.fleet_manager = FleetManager(self, fleet_hosts)
     
     def init_ui(self):
         """Initializes the user interface."""
@@ -224,4 +318,8 @@ class TrueNASManager(QMainWindow):
 
         # Add DiskManager and DatasetManager tabs
         self.tab_widget.addTab(self.disk_manager.get_widget(), "Disks")
-        self.tab_widget.addTab(self.dataset_manager.get_widget(), "Datasets")
\ No newline at end of file
+        self.tab_widget.addTab(self.dataset_manager.get_widget(), "Datasets")
+
+        # Aggregated tab for the hosts of a fleet configuration
+        if self.fleet_manager:
+            self.tab_widget.addTab(self.fleet_manager.get_widget(), "Fleet")
\ No newline at end of file
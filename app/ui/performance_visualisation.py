@@ -1,61 +1,136 @@
-from PyQt5.QtWidgets import QVBoxLayout, QLabel, QHBoxLayout, QWidget
-from pyqtgraph import PlotWidget, mkPen
+import time
+import numpy as np
+from PyQt5.QtWidgets import QVBoxLayout, QLabel, QHBoxLayout, QWidget, QComboBox
+from pyqtgraph import PlotWidget, DateAxisItem, mkPen
+from app.utils.metrics_collector import HISTORY_SECONDS, METRIC_NAMES
+from app.utils.metrics_store import RESOLUTIONS
+from app.utils.timeseries import RingBuffer, minmax_downsample
+
+# Selectable time windows (label, seconds)
+TIME_WINDOWS = [
+    ("1 minute", 60),
+    ("1 hour", 60 * 60),
+    ("24 hours", 24 * 60 * 60),
+    ("7 days", 7 * 24 * 60 * 60),
+    ("30 days", 30 * 24 * 60 * 60),
+]
+
 
 class PerformanceVisualisation(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, store=None):
         super().__init__(parent)
 
+        # Optional MetricsStore answering windows longer than the in-memory history
+        self.store = store
+        # Series name -> (window, bucket index, timestamps, values) of the last store query
+        self.stored_windows = {}
+
+        # History per series; curves are redrawn from the selected window
+        self.series = {name: RingBuffer(HISTORY_SECONDS) for name in METRIC_NAMES}
+        self.window_seconds = TIME_WINDOWS[0][1]
+
         # Layouts for visualizations
-        self.layout = QHBoxLayout(self)
+        self.main_layout = QVBoxLayout(self)
+        controls_layout = QHBoxLayout()
+        controls_layout.addWidget(QLabel("Time window:"))
+        self.window_selector = QComboBox()
+        for label, seconds in TIME_WINDOWS:
+            self.window_selector.addItem(label, seconds)
+        self.window_selector.currentIndexChanged.connect(self.set_time_window)
+        controls_layout.addWidget(self.window_selector)
+        controls_layout.addStretch()
+        self.main_layout.addLayout(controls_layout)
+
+        self.layout = QHBoxLayout()
+        self.main_layout.addLayout(self.layout)
 
         # CPU Plot
-        self.cpu_plot = PlotWidget()
-        self.cpu_plot.showGrid(x=True, y=True)
-        self.cpu_data = [0] * 60
-        self.cpu_curve = self.cpu_plot.plot(self.cpu_data, pen=mkPen('b', width=2))
+        self.cpu_plot = self.create_plot()
+        self.cpu_curve = self.cpu_plot.plot(pen=mkPen('b', width=2))
         cpu_layout = QVBoxLayout()
         cpu_layout.addWidget(QLabel("CPU Usage"))
         cpu_layout.addWidget(self.cpu_plot)
         self.layout.addLayout(cpu_layout)
 
         # Disk I/O Plot
-        self.disk_plot = PlotWidget()
-        self.disk_plot.showGrid(x=True, y=True)
-        self.disk_read_data = [0] * 60
-        self.disk_write_data = [0] * 60
-        self.disk_read_curve = self.disk_plot.plot(self.disk_read_data, pen=mkPen('g', width=2))
-        self.disk_write_curve = self.disk_plot.plot(self.disk_write_data, pen=mkPen('r', width=2))
+        self.disk_plot = self.create_plot()
+        self.disk_read_curve = self.disk_plot.plot(pen=mkPen('g', width=2))
+        self.disk_write_curve = self.disk_plot.plot(pen=mkPen('r', width=2))
         disk_layout = QVBoxLayout()
-        disk_layout.addWidget(QLabel("Disk I/O (Read/Write)"))
+        disk_layout.addWidget(QLabel("Disk I/O (Read/Write, MB/s)"))
         disk_layout.addWidget(self.disk_plot)
         self.layout.addLayout(disk_layout)
 
         # Network Throughput Plot
-        self.network_plot = PlotWidget()
-        self.network_plot.showGrid(x=True, y=True)
-        self.network_in_data = [0] * 60
-        self.network_out_data = [0] * 60
-        self.network_in_curve = self.network_plot.plot(self.network_in_data, pen=mkPen('c', width=2))
-        self.network_out_curve = self.network_plot.plot(self.network_out_data, pen=mkPen('m', width=2))
+        self.network_plot = self.create_plot()
+        self.network_in_curve = self.network_plot.plot(pen=mkPen('c', width=2))
+        self.network_out_curve = self.network_plot.plot(pen=mkPen('m', width=2))
         network_layout = QVBoxLayout()
-        network_layout.addWidget(QLabel("Network Throughput (In/Out)"))
+        network_layout.addWidget(QLabel("Network Throughput (In/Out, MB/s)"))
         network_layout.addWidget(self.network_plot)
         self.layout.addLayout(network_layout)
 
-    def update(self, metrics):
+        # Series name -> (curve, plot it is drawn in)
+        self.curves = {
+            "cpu_load": (self.cpu_curve, self.cpu_plot),
+            "disk_read": (self.disk_read_curve, self.disk_plot),
+            "disk_write": (self.disk_write_curve, self.disk_plot),
+            "network_in": (self.network_in_curve, self.network_plot),
+            "network_out": (self.network_out_curve, self.network_plot),
+        }
+
+    def create_plot(self):
+        """Creates a plot with a wall-clock time axis."""
+        plot = PlotWidget(axisItems={"bottom": DateAxisItem(orientation="bottom")})
+        plot.showGrid(x=True, y=True)
+        return plot
+
+    def set_time_window(self, index):
+        """Switches the displayed time window."""
+        self.window_seconds = self.window_selector.itemData(index)
+        self.redraw()
+
+    def load_history(self, history):
+        """Prepends stored samples ({name: (timestamps, values)}) to the in-memory series."""
+        self.stored_windows.clear()  # The store may hold backfilled samples now
+        for name, (timestamps, values) in history.items():
+            buffer = self.series.get(name)
+            if buffer is None or not len(timestamps):
+                continue
+            recent_times, recent_values = buffer.window()
+            keep = timestamps < (recent_times[0] if len(recent_times) else float("inf"))
+            buffer.clear()
+            buffer.extend(np.concatenate([timestamps[keep], recent_times]), np.concatenate([values[keep], recent_values]))
+        self.redraw()
+
+    def update(self, metrics, timestamp=None):
         """Updates the visualization with new metrics."""
-        # Update CPU Plot
-        self.cpu_data = self.cpu_data[1:] + [metrics.get("cpu_load", 0)]
-        self.cpu_curve.setData(self.cpu_data)
-
-        # Update Disk I/O Plot
-        self.disk_read_data = self.disk_read_data[1:] + [metrics.get("disk_read", 0)]
-        self.disk_write_data = self.disk_write_data[1:] + [metrics.get("disk_write", 0)]
-        self.disk_read_curve.setData(self.disk_read_data)
-        self.disk_write_curve.setData(self.disk_write_data)
-
-        # Update Network Plot
-        self.network_in_data = self.network_in_data[1:] + [metrics.get("network_in", 0)]
-        self.network_out_data = self.network_out_data[1:] + [metrics.get("network_out", 0)]
-        self.network_in_curve.setData(self.network_in_data)
-        self.network_out_curve.setData(self.network_out_data)
+        timestamp = time.time() if timestamp is None else timestamp
+        for name, buffer in self.series.items():
+            if metrics.get(name) is not None:  # Series whose fetch failed get no point
+                buffer.append(timestamp, metrics[name])
+        self.redraw(timestamp)
+
+    def redraw(self, now=None):
+        """Redraws every curve from the selected window, at most about one point per pixel."""
+        now = time.time() if now is None else now
+        since = now - self.window_seconds
+        for name, (curve, plot) in self.curves.items():
+            if self.store is not None and self.window_seconds > HISTORY_SECONDS:
+                x, y = self.stored_window(name, since, now)
+            else:
+                x, y = self.series[name].window(since)
+            x, y = minmax_downsample(x, y, max(plot.width(), 100))
+            curve.setData(x, y)
+        for plot in (self.cpu_plot, self.disk_plot, self.network_plot):
+            plot.setXRange(since, now, padding=0)
+
+    def stored_window(self, name, since, now):
+        """Returns a long window from the store, queried again only when a new rollup bucket starts."""
+        resolution = self.store.pick_resolution(since, now)
+        key = (self.window_seconds, int(now // RESOLUTIONS[resolution][1]))
+        cached = self.stored_windows.get(name)
+        if cached is None or cached[:2] != key:
+            x, y = self.store.query(name, since, now, resolution)
+            cached = self.stored_windows[name] = key + (x, y)
+        return cached[2], cached[3]
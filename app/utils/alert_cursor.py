@@ -0,0 +1,126 @@
+# Incremental alert tracking
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+ALERT_CURSOR_FILE = "alert_cursor.json"
+
+
+def _stamp(value):
+    """Returns a server timestamp in a comparable, JSON-friendly form without parsing it."""
+    if isinstance(value, dict):  # Middleware encodes datetimes as {"$date": milliseconds}
+        return value.get("$date")
+    return value
+
+
+class AlertCursor:
+    """
+    Remembers which alerts have been seen, by UUID, with the server's own timestamps.
+
+    update() compares a fresh alert.list result against that state and returns
+    only what changed. Unchanged alerts cost a dict lookup and a tuple compare;
+    nothing is parsed. The state lives in memory and is written to disk at most
+    once per flush interval (and at exit), only when it changed.
+
+    Each consumer of alert changes needs its own cursor; a shared one would
+    hand every change to whichever consumer polled first.
+    """
+
+    def __init__(self, path=ALERT_CURSOR_FILE, flush_interval=300):
+        """
+        Initializes the cursor.
+
+        Args:
+            path (str): JSON file the state is kept in between runs.
+            flush_interval (float): Minimum seconds between writes.
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self._seen = None  # uuid -> [datetime, last_occurrence, dismissed]; loaded on first use
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Reads the saved state once."""
+        if self._seen is not None:
+            return
+        self._seen = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as file:
+                    self._seen = json.load(file).get("seen", {})
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable alert cursor {self.path}: {e}")
+
+    def update(self, alerts):
+        """
+        Applies a full alert list and returns the difference to the previous one.
+
+        Args:
+            alerts (list): Alerts as returned by alert.list.
+
+        Returns:
+            dict: {"added": [alerts], "changed": [alerts], "dismissed": [alerts], "removed": [uuids]},
+                or None if alerts is not a list (a failed fetch); the state is then left untouched.
+        """
+        if not isinstance(alerts, list):
+            return None
+        delta = {"added": [], "changed": [], "dismissed": [], "removed": []}
+        with self._lock:
+            self._load()
+            current = set()
+            for alert in alerts:
+                uuid = alert.get("uuid")
+                if uuid is None:
+                    continue
+                current.add(uuid)
+                state = [_stamp(alert.get("datetime")), _stamp(alert.get("last_occurrence")), bool(alert.get("dismissed"))]
+                previous = self._seen.get(uuid)
+                if previous == state:
+                    continue
+
+                if previous is None:
+                    delta["added"].append(alert)
+                elif state[2] and not previous[2]:
+                    delta["dismissed"].append(alert)
+                else:
+                    delta["changed"].append(alert)
+                self._seen[uuid] = state
+                self._dirty = True
+
+            for uuid in [uuid for uuid in self._seen if uuid not in current]:
+                del self._seen[uuid]
+                delta["removed"].append(uuid)
+                self._dirty = True
+
+        if self._dirty and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+        return delta
+
+    def flush(self):
+        """Writes the state to disk if it changed since the last write."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._dirty:
+                return
+            try:
+                temp_path = f"{self.path}.tmp"
+                with open(temp_path, "w") as file:
+                    json.dump({"seen": self._seen}, file)
+                os.replace(temp_path, self.path)
+                self._dirty = False
+            except OSError as e:
+                logging.error(f"Failed to save alert cursor {self.path}: {e}")
+
+
+# One cursor per consumer: the GUI (REST), the SSH commands and the daemon
+ALERT_CURSOR = AlertCursor()
+SSH_ALERT_CURSOR = AlertCursor("alert_cursor_ssh.json")
+DAEMON_ALERT_CURSOR = AlertCursor("alert_cursor_daemon.json")
+for _cursor in (ALERT_CURSOR, SSH_ALERT_CURSOR, DAEMON_ALERT_CURSOR):
+    atexit.register(_cursor.flush)
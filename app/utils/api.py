@@ -1,73 +1,221 @@
+import threading
+import time
 import requests
-from app.utils.config import get_api_key, get_api_url
-from datetime import datetime
-from app.utils.timestamp import save_last_alert_check_time, load_last_alert_check_time
+from contextlib import contextmanager
+from app.utils import config
+from app.utils.cache import TTLCache
+from app.utils.client import get_client
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from app.utils.alert_cursor import ALERT_CURSOR
+
+# Seconds a GET response may be reused, by path prefix (longest match wins).
+# Paths without an entry are not stored, but concurrent identical GETs still
+# share one request. TTLs stay below the 1 s metric cadence so counter rates
+# never see a repeated sample.
+CACHE_TTLS = {
+    "/system/info": 0.5,
+    "/disk/": 0.5,
+    "/alert/list/": 5,
+    "/pool/dataset/": 2,
+    "/system/log/": 5,
+}
+
+# Shared responses; callers must treat the returned data as read-only
+RESPONSE_CACHE = TTLCache(maxsize=256, ttl=0)
+
+def cache_ttl(path):
+    """Returns the response cache TTL for a REST path."""
+    best = None
+    for prefix in CACHE_TTLS:
+        if path.startswith(prefix) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return CACHE_TTLS[best] if best else 0
+
+def invalidate_cache(config_data=None):
+    """Drops all cached responses, e.g. after a mutating call or a configuration change."""
+    RESPONSE_CACHE.invalidate()
+
+config.subscribe(invalidate_cache)
+
+_local = threading.local()  # Fleet host selected by using_host() for the current thread
+
+def _call(http_method, path, rpc_method=None, rpc_params=(), json=None, params=None):
+    """
+    Sends a request over the configured transport.
+
+    GET requests go through the response cache: identical concurrent calls
+    share one request and recent results are reused for the path's TTL.
+    Inside using_host() the request goes to that fleet host instead.
+
+    Args:
+        http_method (str): REST method ("GET" or "POST").
+        path (str): REST path below /api/v2.0.
+        rpc_method (str): Equivalent middleware method for the websocket transport.
+        rpc_params (tuple): Positional parameters for the middleware method.
+        json (dict): REST request body.
+        params (dict): REST query string parameters.
+
+    Returns:
+        The decoded result.
+    """
+    host = getattr(_local, "host", None)
+    if host is None:
+        credentials = ()
+        websocket = rpc_method and config.get_transport() == "websocket"
+    else:
+        credentials = (host["api_url"], host["api_key"])
+        websocket = rpc_method and host.get("transport") == "websocket"
+    transport = "websocket" if websocket else "rest"
+
+    def send():
+        if transport == "websocket":
+            from app.utils.websocket_client import get_middleware_client  # Loaded only for the websocket transport
+            return get_middleware_client(*credentials).call(rpc_method, *rpc_params)
+        if http_method == "GET":
+            return get_client(*credentials).get(path, params=params, json=json)
+        return get_client(*credentials).post(path, json=json)
+
+    if http_method != "GET":
+        return send()
+    key = (
+        credentials[:1], transport, path, rpc_method, repr(rpc_params),
+        repr(sorted(params.items())) if params else None, repr(json),
+    )
+    return RESPONSE_CACHE.get_or_load(key, send, cache_ttl(path))
+
+@contextmanager
+def using_host(host):
+    """
+    Sends the API calls made by this thread inside the block to a fleet host.
+
+    Args:
+        host (dict): Fleet host with "api_url", "api_key" and optional "transport".
+    """
+    previous = getattr(_local, "host", None)
+    _local.host = host
+    try:
+        yield
+    finally:
+        _local.host = previous
+
+def _query(path, rpc_method, filters=None, select=None, extra=None):
+    """
+    Runs a middleware query with optional query-filters and query-options.
+
+    Args:
+        path (str): REST path of the query endpoint.
+        rpc_method (str): Middleware query method, e.g. "pool.dataset.query".
+        filters (list): Query filters, e.g. [["pool", "=", "tank"]].
+        select (list): Fields to return; everything if not given.
+        extra (dict): Method-specific options, e.g. {"retrieve_children": False}.
+
+    Returns:
+        list: The matching records.
+    """
+    filters = filters or []
+    options = {}
+    if select:
+        options["select"] = list(select)
+    if extra:
+        options["extra"] = extra
+    if not filters and not options:
+        return _call("GET", path, rpc_method)
+    return _call(
+        "GET", path, rpc_method, (filters, options),
+        json={"query-filters": filters, "query-options": options},
+    )
+
+def fetch_alert_changes(cursor=ALERT_CURSOR):
+    """
+    Fetches the alert list and returns only what changed since the previous check.
+
+    Args:
+        cursor (AlertCursor): The caller's own record of the alerts it has seen.
+
+    Returns:
+        dict: {"added", "changed", "dismissed": [alerts], "removed": [uuids]}, or None on error.
+            A failed fetch leaves the cursor untouched.
+    """
+    try:
+        changes = cursor.update(_call("GET", "/alert/list/", "alert.list"))
+        if changes is None:
+            print("Error fetching alert changes: no alert list received")
+        return changes
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching alert changes: {e}")
+        return None
 
 def fetch_new_alerts():
-    """Fetches new alerts from the TrueNAS API based on the last check time."""
+    """Fetches alerts raised since the previous check."""
+    changes = fetch_alert_changes()
+    return changes["added"] if changes else []
+
+def fetch_network_stats(interfaces, seconds=60):
+    """
+    Fetch the recent throughput of network interfaces from their reporting graphs.
+
+    The middleware exposes no cumulative interface counters, so the interface
+    graphs (received/sent in kbit/s) of the last `seconds` are requested in
+    one call; their latest point is the current throughput.
+
+    Args:
+        interfaces (list): Interface names, e.g. ["eno1"].
+        seconds (int): How far back to look for the latest point.
+
+    Returns:
+        list: One reporting graph per interface, or None on error.
+    """
+    if not interfaces:
+        return []
+    now = int(time.time())
+    graphs = [{"name": "interface", "identifier": name} for name in interfaces]
+    return fetch_reporting_history(graphs, now - seconds, now)
+
+def fetch_reporting_history(graphs, start, end, aggregate=False):
+    """
+    Fetch several reporting graphs over a time range in a single request.
+
+    Args:
+        graphs (list): Graph selectors, e.g. [{"name": "load"}, {"name": "disk", "identifier": "sda"}].
+        start (int): Range start (epoch seconds).
+        end (int): Range end (epoch seconds).
+        aggregate (bool): Whether the server should also compute min/mean/max aggregations.
+
+    Returns:
+        list: One result per graph with "legend", "data", "start" and "step", or None on error.
+    """
+    query = {"start": int(start), "end": int(end), "aggregate": aggregate}
+    payload = {"graphs": graphs, "reporting_query": query}
     try:
-        api_url = get_api_url()
-        headers = get_headers()
-
-        # Fetch last check time
-        last_check_time = load_last_alert_check_time()
-
-        # Fetch all alerts
-        response = requests.get(f"{api_url}/alert/list/", headers=headers)
-        response.raise_for_status()
-
-        alerts = response.json()
-
-        # Filter alerts based on the last check time
-        new_alerts = []
-        for alert in alerts:
-            alert_time_str = alert.get("datetime")
-            if alert_time_str:
-                alert_time = datetime.fromisoformat(alert_time_str)
-                if last_check_time is None or alert_time > last_check_time:
-                    new_alerts.append(alert)
-
-        # Save the current time as the new last check time
-        save_last_alert_check_time(datetime.now())
-
-        return new_alerts
+        return _call("POST", "/reporting/get_data/", "reporting.get_data", (graphs, query), json=payload)
     except requests.exceptions.RequestException as e:
-        print(f"Error fetching new alerts: {e}")
-        return []
+        print(f"Error fetching reporting history: {e}")
+        return None
 
-def fetch_network_stats():
-    """Fetch network statistics (e.g., throughput) from TrueNAS API."""
-    try:
-        api_url = get_api_url()
-        headers = get_headers()
+def fetch_reporting_graphs(names):
+    """
+    Fetch the reporting graphs with the identifiers (disks, interfaces) they have data for.
 
-        # Fetch network stats using the reporting API
-        payload = {"name": "network"}
-        response = requests.post(f"{api_url}/reporting/get_data/", headers=headers, json=payload)
-        response.raise_for_status()
+    Args:
+        names (list): Graph names, e.g. ["disk", "interface"].
 
-        # Parse and return the network statistics
-        network_stats = response.json()
-        return network_stats
+    Returns:
+        list: Graphs with "name" and "identifiers", or None on error.
+    """
+    try:
+        return _query("/reporting/graphs/", "reporting.graphs", [["name", "in", list(names)]], ["name", "identifiers"])
     except requests.exceptions.RequestException as e:
-        print(f"Error fetching network stats: {e}")
+        print(f"Error fetching reporting graphs: {e}")
         return None
 
 def get_headers():
     """Retrieve headers for API requests."""
-    api_key = get_api_key()
-    return {
-        "Authorization": f"Bearer {api_key}"
-    }
+    return config.get_headers()
 
-def fetch_disk_stats():
+def fetch_disk_stats(select=("name", "read_bytes", "write_bytes")):
     """Fetch disk statistics (e.g., I/O rates) from TrueNAS API."""
     try:
-        api_url = get_api_url()
-        headers = get_headers()
-        response = requests.get(f"{api_url}/disk/", headers=headers)
-        response.raise_for_status()
-        return response.json()
+        return _query("/disk/", "disk.query", [["expiretime", "=", None]], select)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching disk stats: {e}")
         return None
@@ -75,24 +223,16 @@ def fetch_disk_stats():
 def fetch_system_info():
     """Fetch system information (CPU load, memory, etc.) from TrueNAS API."""
     try:
-        api_url = get_api_url()
-        headers = get_headers()
-        response = requests.get(f"{api_url}/system/info", headers=headers)
-        response.raise_for_status()
-        return response.json()
+        return _call("GET", "/system/info", "system.info")
     except requests.exceptions.RequestException as e:
         print(f"Error fetching system info: {e}")
         return None
 
 
-def fetch_smart_data():
+def fetch_smart_data(filters=None, select=None):
     """Fetch SMART data for all disks from TrueNAS API."""
     try:
-        api_url = get_api_url()
-        headers = get_headers()
-        response = requests.get(f"{api_url}/disk/", headers=headers)
-        response.raise_for_status()
-        return response.json()
+        return _query("/disk/", "disk.query", filters, select)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching SMART data: {e}")
         return None
@@ -101,11 +241,7 @@ def fetch_smart_data():
 def fetch_system_logs():
     """Fetch system logs from TrueNAS API."""
     try:
-        api_url = get_api_url()
-        headers = get_headers()
-        response = requests.get(f"{api_url}/system/log/", headers=headers)
-        response.raise_for_status()
-        return response.json()
+        return _call("GET", "/system/log/")
     except requests.exceptions.RequestException as e:
         print(f"Error fetching system logs: {e}")
         return None
@@ -114,92 +250,158 @@ def fetch_system_logs():
 def fetch_alerts():
     """Fetch active alerts from TrueNAS API."""
     try:
-        api_url = get_api_url()
-        headers = get_headers()
-        response = requests.get(f"{api_url}/alert/list/", headers=headers)
-        response.raise_for_status()
-        return response.json()
+        return _call("GET", "/alert/list/", "alert.list")
     except requests.exceptions.RequestException as e:
         print(f"Error fetching alerts: {e}")
         return None
 
 
-def fetch_datasets():
-    """Fetch all datasets and their properties from TrueNAS API."""
+def fetch_datasets(filters=None, select=None, extra=None):
+    """
+    Fetch datasets and their properties from TrueNAS API.
+
+    Args:
+        filters (list): Query filters, e.g. [["encrypted", "=", True]].
+        select (list): Fields to return; all properties if not given.
+        extra (dict): pool.dataset.query options, e.g. {"retrieve_children": False}.
+    """
     try:
-        api_url = get_api_url()
-        headers = get_headers()
-        response = requests.get(f"{api_url}/pool/dataset/", headers=headers)
-        response.raise_for_status()
-        return response.json()
+        return _query("/pool/dataset/", "pool.dataset.query", filters, select, extra)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching datasets: {e}")
         return None
 
 
+def fetch_datasets_by_name(dataset_names, select=None, extra=None):
+    """
+    Fetch only the given datasets, in one query.
+
+    Returns:
+        list: The datasets that were found.
+    """
+    return _query("/pool/dataset/", "pool.dataset.query", [["id", "in", list(dataset_names)]], select, extra)
+
+
+def fetch_jobs(job_ids):
+    """
+    Fetch the state of several middleware jobs in one request.
+
+    Args:
+        job_ids (list): Job ids to look up.
+
+    Returns:
+        list: Job records ("id", "state", "progress", "result", "error", ...), or None on error.
+    """
+    ids = sorted(set(job_ids))
+    try:
+        jobs = _query("/core/get_jobs", "core.get_jobs", [["id", "in", ids]])
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching jobs: {e}")
+        return None
+    jobs = [job for job in jobs or [] if job.get("id") in ids]
+    if any(job.get("state") in ("SUCCESS", "FAILED", "ABORTED") for job in jobs):
+        invalidate_cache()  # Finished jobs changed server state
+    return jobs
+
+
 def lock_dataset(dataset_name):
     """Lock a specific dataset using the TrueNAS API."""
     try:
-        api_url = get_api_url()
-        headers = get_headers()
-        response = requests.post(f"{api_url}/pool/dataset/id/{dataset_name}/lock", headers=headers)
-        response.raise_for_status()
-        return response.json()
+        return _call("POST", f"/pool/dataset/id/{dataset_name}/lock", "pool.dataset.lock", (dataset_name,))
     except requests.exceptions.RequestException as e:
         print(f"Error locking dataset: {e}")
         return None
+    finally:
+        invalidate_cache()
 
 
 def unlock_dataset(dataset_name, password):
     """Unlock a specific dataset using the TrueNAS API."""
     try:
-        api_url = get_api_url()
-        headers = get_headers()
         payload = {"password": password}
-        response = requests.post(f"{api_url}/pool/dataset/id/{dataset_name}/unlock", headers=headers, json=payload)
-        response.raise_for_status()
-        return response.json()
+        options = {"datasets": [{"name": dataset_name, "passphrase": password}]}
+        return _call(
+            "POST", f"/pool/dataset/id/{dataset_name}/unlock",
+            "pool.dataset.unlock", (dataset_name, options), json=payload
+        )
     except requests.exceptions.RequestException as e:
         print(f"Error unlocking dataset: {e}")
         return None
+    finally:
+        invalidate_cache()
+
+
+BULK_MAX_WORKERS = 16  # Concurrent lock/unlock calls per bulk action
+
+def _run_bulk(function, items, max_workers=BULK_MAX_WORKERS):
+    """
+    Runs function(*item) for every item with bounded concurrency.
+
+    Returns:
+        dict: {dataset name: {"ok": bool, "result" or "error": ...}}, keyed by each item's first element.
+    """
+    results = {}
+    if not items:
+        return results
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = {executor.submit(function, *item): item[0] for item in items}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = {"ok": True, "result": future.result()}
+            except Exception as e:
+                results[name] = {"ok": False, "error": str(e)}
+    return results
+
+
+def lock_datasets(dataset_names, max_workers=BULK_MAX_WORKERS):
+    """
+    Lock several datasets concurrently.
+
+    Args:
+        dataset_names (list): Datasets to lock.
+        max_workers (int): Maximum number of requests in flight.
+
+    Returns:
+        dict: Per-dataset outcome, see _run_bulk().
+    """
+    results = _run_bulk(
+        lambda name: _call("POST", f"/pool/dataset/id/{name}/lock", "pool.dataset.lock", (name,)),
+        [(name,) for name in dataset_names],
+        max_workers,
+    )
+    invalidate_cache()
+    return results
+
+
+def unlock_datasets(credentials, max_workers=BULK_MAX_WORKERS):
+    """
+    Unlock several datasets concurrently.
+
+    Args:
+        credentials (list): (dataset name, passphrase) pairs.
+        max_workers (int): Maximum number of requests in flight.
+
+    Returns:
+        dict: Per-dataset outcome, see _run_bulk().
+    """
+    def unlock(name, password):
+        options = {"datasets": [{"name": name, "passphrase": password}]}
+        return _call(
+            "POST", f"/pool/dataset/id/{name}/unlock",
+            "pool.dataset.unlock", (name, options), json={"password": password}
+        )
 
+    results = _run_bulk(unlock, list(credentials), max_workers)
+    invalidate_cache()
+    return results
 
-def reboot_system():
-    """Reboot the TrueNAS server using the API."""
-    try:
-        api_url = get_api_url()
-        headers = get_headers()
-        response = requests.post(f"{api_url}/system/reboot/", headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error rebooting system: {e}")
-        return None
-
-
-def shutdown_system():
-    """Shutdown the TrueNAS server using the API."""
-    try:
-        api_url = get_api_url()
-        headers = get_headers()
-        response = requests.post(f"{api_url}/system/shutdown/", headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error shutting down system: {e}")
-        return None
 
 def fetch_messages_log():
     """Fetch system messages log from TrueNAS API."""
     try:
-        api_url = get_api_url()
-        headers = get_headers()
-
         # Fetch system log messages
-        response = requests.get(f"{api_url}/system/log/", headers=headers)
-        response.raise_for_status()
-
-        logs = response.json()  # Expect logs to be a list of messages
+        logs = _call("GET", "/system/log/")  # Expect logs to be a list of messages
         formatted_logs = "\n".join([log.get("message", "No message") for log in logs])
 
         return formatted_logs
@@ -210,14 +412,8 @@ def fetch_messages_log():
 def fetch_alerts_log():
     """Fetches and formats the alerts log from the TrueNAS API."""
     try:
-        api_url = get_api_url()
-        headers = get_headers()
-
         # Fetch alerts
-        response = requests.get(f"{api_url}/alert/list/", headers=headers)
-        response.raise_for_status()
-
-        alerts = response.json()  # List of alert objects
+        alerts = _call("GET", "/alert/list/", "alert.list")  # List of alert objects
         formatted_alerts = "\n".join(
             [f"{alert.get('datetime')} - {alert.get('level').upper()}: {alert.get('formatted')}" for alert in alerts]
         )
@@ -230,10 +426,8 @@ def fetch_alerts_log():
 def reboot_system():
     """Reboot the TrueNAS server using the API."""
     try:
-        api_url = get_api_url()
-        headers = get_headers()
-        response = requests.post(f"{api_url}/system/reboot/", headers=headers)
-        response.raise_for_status()
+        _call("POST", "/system/reboot/", "system.reboot")
+        invalidate_cache()
         return "reboot"
     except requests.exceptions.RequestException as e:
         raise RuntimeError(f"Error rebooting system: {e}")
@@ -242,11 +436,8 @@ def reboot_system():
 def shutdown_system():
     """Shutdown the TrueNAS server using the API."""
     try:
-        api_url = get_api_url()
-        headers = get_headers()
-        response = requests.post(f"{api_url}/system/shutdown/", headers=headers)
-        response.raise_for_status()
+        _call("POST", "/system/shutdown/", "system.shutdown")
+        invalidate_cache()
         return "shutdown"
     except requests.exceptions.RequestException as e:
         raise RuntimeError(f"Error shutting down system: {e}")
-
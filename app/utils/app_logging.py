@@ -1,18 +1,24 @@
 import logging
 import os
 
-def configure_logging():
+# Application, daemon and mirrored server logs
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../logs")
+
+def configure_logging(filename="app.log", filemode="w"):
     """
     Configures logging for the application.
+
+    Args:
+        filename (str): Log file name inside the logs directory.
+        filemode (str): "w" to start a fresh log, "a" to append to it.
     """
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    LOG_FILE = os.path.join(BASE_DIR, "../../logs/app.log")
+    LOG_FILE = os.path.join(LOG_DIR, filename)
 
     logging.basicConfig(
         filename=LOG_FILE,
         level=logging.INFO,
         format="%(asctime)s - %(levelname)s - %(message)s",
-        filemode="w",
+        filemode=filemode,
         force=True  # Ensure this config applies even if logging is already configured
     )
 
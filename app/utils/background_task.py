@@ -1,4 +1,4 @@
-from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from PyQt5.QtCore import QObject, QRunnable, QThread, QThreadPool, pyqtSignal
 
 
 class Worker(QObject):
@@ -24,3 +24,98 @@ class Worker(QObject):
             self.completed.emit(True, result)
         except Exception as e:
             self.completed.emit(False, str(e))
+
+
+class _TaskSignals(QObject):
+    """Signals emitted by pipeline tasks; lives on the GUI thread."""
+    completed = pyqtSignal(str, int, bool, object)  # key, generation, success, result
+
+
+class _PipelineTask(QRunnable):
+    """Runs one fetch on the thread pool and reports back through _TaskSignals."""
+
+    def __init__(self, key, generation, function, signals):
+        super().__init__()
+        self.key = key
+        self.generation = generation
+        self.function = function
+        self.signals = signals
+
+    def run(self):
+        """Executes the fetch."""
+        try:
+            result = self.function()
+            self.signals.completed.emit(self.key, self.generation, True, result)
+        except Exception as e:
+            self.signals.completed.emit(self.key, self.generation, False, str(e))
+
+
+class RefreshPipeline(QObject):
+    """
+    Runs data fetches on a thread pool and delivers the results on the GUI thread.
+
+    Each data source is identified by a key. A tick for a key whose previous
+    fetch is still in flight is skipped, and a result that arrives after a
+    newer one for the same key has already been applied is dropped.
+    """
+
+    def __init__(self, parent=None, max_workers=4):
+        """
+        Initializes the pipeline.
+
+        Args:
+            parent (QObject): Owner of the pipeline.
+            max_workers (int): Maximum number of concurrent fetches.
+        """
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers)
+        self.signals = _TaskSignals()
+        self.signals.completed.connect(self._on_completed)
+
+        self._issued = {}     # key -> last issued generation
+        self._applied = {}    # key -> last applied generation
+        self._in_flight = {}  # key -> number of running fetches
+        self._callbacks = {}  # (key, generation) -> (on_result, on_error)
+
+    def submit(self, key, function, on_result, on_error=None, force=False):
+        """
+        Schedules a fetch for a data source.
+
+        Args:
+            key (str): Data source identifier.
+            function (callable): Fetch to run in the background; must not touch widgets.
+            on_result (callable): Called on the GUI thread with the fetch result.
+            on_error (callable): Called on the GUI thread with the error message.
+            force (bool): Start even if a fetch for this key is still in flight.
+
+        Returns:
+            bool: True if the fetch was started, False if the tick was skipped.
+        """
+        if self._in_flight.get(key) and not force:
+            return False
+
+        generation = self._issued.get(key, 0) + 1
+        self._issued[key] = generation
+        self._in_flight[key] = self._in_flight.get(key, 0) + 1
+        self._callbacks[(key, generation)] = (on_result, on_error)
+        self.pool.start(_PipelineTask(key, generation, function, self.signals))
+        return True
+
+    def is_busy(self, key):
+        """Returns True if a fetch for the key is in flight."""
+        return bool(self._in_flight.get(key))
+
+    def _on_completed(self, key, generation, success, result):
+        """Delivers a finished fetch unless a newer result was already applied."""
+        self._in_flight[key] -= 1
+        on_result, on_error = self._callbacks.pop((key, generation))
+
+        if generation <= self._applied.get(key, 0):
+            return  # Stale result from an older request
+        self._applied[key] = generation
+
+        if success:
+            on_result(result)
+        elif on_error:
+            on_error(result)
@@ -0,0 +1,133 @@
+# In-memory caches
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class TTLCache:
+    """
+    Thread-safe cache with a per-entry time-to-live and an LRU size bound.
+
+    Entries older than their TTL are treated as missing; when the cache is full
+    the least recently used entry is evicted. get_or_load() additionally lets
+    concurrent callers for the same key share a single load.
+    """
+
+    def __init__(self, maxsize=128, ttl=300):
+        """
+        Initializes the cache.
+
+        Args:
+            maxsize (int): Maximum number of entries.
+            ttl (float): Seconds an entry stays valid.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (stored_at, value, ttl)
+        self._loading = {}  # key -> Future of the load in flight
+        self._generation = 0  # Bumped by invalidate() so in-flight loads are not stored
+        self._lock = threading.Lock()
+
+    def get_entry(self, key):
+        """
+        Looks up an entry.
+
+        Returns:
+            tuple: (value, age_in_seconds), or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value, ttl = entry
+            age = time.monotonic() - stored_at
+            if age > ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value, age
+
+    def get(self, key, default=None):
+        """Returns a cached value, or default if missing or expired."""
+        entry = self.get_entry(key)
+        return entry[0] if entry else default
+
+    def put(self, key, value, ttl=None):
+        """Stores a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._store(key, value, self.ttl if ttl is None else ttl)
+
+    def _store(self, key, value, ttl):
+        """Stores an entry; the caller holds the lock."""
+        self._entries[key] = (time.monotonic(), value, ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get_or_load(self, key, loader, ttl=None):
+        """
+        Returns a cached value, or calls loader() once for all concurrent callers.
+
+        Callers arriving while a load for the key is in flight wait for it and
+        receive the same value (or exception). A load that overlaps an
+        invalidate() is returned to the callers already waiting but not stored,
+        and callers arriving after the invalidate() start a fresh load. With a
+        TTL of 0 nothing is stored and only concurrent calls are shared.
+
+        Args:
+            key: Cache key.
+            loader (callable): Produces the value.
+            ttl (float): Seconds the value stays valid (default: the cache TTL).
+        """
+        ttl = self.ttl if ttl is None else ttl
+        entry = self.get_entry(key)
+        if entry is not None:
+            return entry[0]
+
+        with self._lock:
+            future = self._loading.get(key)
+            if future is not None:
+                owner = False
+            else:
+                owner = True
+                future = self._loading[key] = Future()
+                generation = self._generation
+        if not owner:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._finish_loading(key, future)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if ttl > 0 and generation == self._generation:
+                self._store(key, value, ttl)
+            self._finish_loading(key, future)
+        future.set_result(value)
+        return value
+
+    def _finish_loading(self, key, future):
+        """Forgets a finished load unless invalidate() already replaced it; the caller holds the lock."""
+        if self._loading.get(key) is future:
+            del self._loading[key]
+
+    def invalidate(self, key=None):
+        """Drops one entry, or all entries if no key is given, and detaches their loads in flight."""
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+                self._loading.clear()
+            else:
+                self._entries.pop(key, None)
+                self._loading.pop(key, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
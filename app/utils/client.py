@@ -0,0 +1,159 @@
+# HTTP client for the TrueNAS REST API
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.utils.config import get_api_key, get_api_url, normalize_api_url, subscribe
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# Per-endpoint timeouts, matched by the longest path prefix
+ENDPOINT_TIMEOUTS = {
+    "/system/info": (3.05, 5),
+    "/disk/": (3.05, 10),
+    "/alert/list/": (3.05, 10),
+    "/reporting/get_data": (3.05, 15),
+    "/pool/dataset/": (3.05, 30),
+    "/system/reboot/": (3.05, 30),
+    "/system/shutdown/": (3.05, 30),
+}
+
+
+class TrueNASClient:
+    """
+    Keep-alive HTTP client for the TrueNAS REST API.
+
+    All requests share one requests.Session, so TCP connections (and TLS
+    sessions on https hosts) are pooled and reused between polls.
+    """
+
+    def __init__(self, api_url, api_key, pool_size=10, retries=2, backoff_factor=0.3):
+        """
+        Initializes the client.
+
+        Args:
+            api_url (str): Base API URL, including the /api/v2.0 prefix.
+            api_key (str): TrueNAS API key.
+            pool_size (int): Maximum number of pooled connections per host.
+            retries (int): Retries for failed connections and idempotent requests.
+            backoff_factor (float): Exponential backoff factor between retries.
+        """
+        self.api_url = api_url.rstrip("/")
+        self.api_key = api_key
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        })
+
+        # Connection errors are retried for every method; read errors and
+        # 5xx responses only for GET, so lock/unlock/reboot are never replayed.
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def timeout_for(self, path):
+        """Returns the (connect, read) timeout for an endpoint path."""
+        best = None
+        for prefix in ENDPOINT_TIMEOUTS:
+            if path.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return ENDPOINT_TIMEOUTS[best] if best else DEFAULT_TIMEOUT
+
+    def request(self, method, path, **kwargs):
+        """Sends a request and returns the response, raising on HTTP errors."""
+        kwargs.setdefault("timeout", self.timeout_for(path))
+        response = self.session.request(method, f"{self.api_url}{path}", **kwargs)
+        response.raise_for_status()
+        return response
+
+    def get(self, path, params=None, timeout=None, json=None):
+        """Sends a GET request and returns the decoded JSON body."""
+        kwargs = {"params": params}
+        if json is not None:
+            kwargs["json"] = json
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return self._decode(self.request("GET", path, **kwargs))
+
+    def post(self, path, json=None, timeout=None):
+        """Sends a POST request and returns the decoded JSON body."""
+        kwargs = {"json": json}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return self._decode(self.request("POST", path, **kwargs))
+
+    def close(self):
+        """Closes all pooled connections."""
+        self.session.close()
+
+    @staticmethod
+    def _decode(response):
+        """Decodes a JSON response body; empty bodies decode to None."""
+        if not response.content:
+            return None
+        return response.json()
+
+
+_clients = {}  # (api_url, api_key) -> TrueNASClient
+_client_lock = threading.Lock()
+
+
+def _configured_keys(config):
+    """Returns the (api_url, api_key) pairs of the main host and the fleet hosts in a configuration."""
+    keys = {(normalize_api_url(config.get("host") or ""), config.get("api_key"))}
+    for entry in config.get("hosts") or []:
+        if entry.get("host") and entry.get("api_key"):
+            keys.add((normalize_api_url(entry["host"]), entry["api_key"]))
+    return keys
+
+
+def _reset_client(config):
+    """
+    Closes the clients of hosts or API keys that are no longer configured.
+
+    Clients that are still configured are kept, so a config change that does
+    not touch them (dataset passwords, transport, other fleet hosts) does not
+    close sessions that requests are using.
+    """
+    configured = _configured_keys(config)
+    with _client_lock:
+        stale = [key for key in _clients if key not in configured]
+        closing = [_clients.pop(key) for key in stale]
+    for client in closing:
+        client.close()
+
+
+subscribe(_reset_client)
+
+
+def get_client(api_url=None, api_key=None):
+    """
+    Returns the shared client for a host, creating it on first use.
+
+    Without arguments this is the configured host; fleet hosts pass their own
+    URL and key and get their own connection pool.
+    """
+    if api_url is None:
+        # Cheap when config.json is unchanged; a changed file resets the client
+        api_url = get_api_url()
+        api_key = get_api_key()
+    with _client_lock:
+        client = _clients.get((api_url, api_key))
+        if client is None:
+            client = _clients[(api_url, api_key)] = TrueNASClient(api_url, api_key)
+        return client
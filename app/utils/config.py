@@ -1,7 +1,9 @@
 # Configuration management
 
+import copy
 import json
-from cryptography.fernet import Fernet
+import os
+import threading
 
 # File Paths
 KEY_FILE = "encryption_key.key"
@@ -9,6 +11,7 @@ CONFIG_FILE = "config.json"
 
 # Generate or load an encryption key
 def get_encryption_key():
+    from cryptography.fernet import Fernet
     try:
         with open(KEY_FILE, "rb") as key_file:
             key = key_file.read()
@@ -22,51 +25,195 @@ def get_encryption_key():
             key_file.write(key)
         return key
 
-# Initialize encryption key
-ENCRYPTION_KEY = get_encryption_key()
-FERNET = Fernet(ENCRYPTION_KEY)
+# Key file and cipher are loaded on first use: importing this module must not
+# touch encryption_key.key or import cryptography
+_fernet = None
+_fernet_lock = threading.Lock()
+
+def get_fernet():
+    """Returns the Fernet cipher for stored passwords, loading the key on first use."""
+    global _fernet
+    with _fernet_lock:
+        if _fernet is None:
+            from cryptography.fernet import Fernet
+            _fernet = Fernet(get_encryption_key())
+        return _fernet
+
+class ConfigStore:
+    """
+    Process-wide, in-memory cache of the configuration file.
+
+    The file is parsed once and re-read only when its mtime or size changes
+    (or save_config() writes it). The normalized API URL and auth headers are
+    derived at the same time, and subscribers are notified when the
+    configuration changes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._signature = None
+        self._config = None
+        self._api_url = None
+        self._headers = None
+        self._subscribers = []
+
+    def _stat_signature(self):
+        """Returns the (mtime, size) pair used to detect file changes."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            with self._lock:
+                self._signature = None
+                self._config = None
+            raise FileNotFoundError("Configuration file not found. Setup is required.")
+        return stat.st_mtime_ns, stat.st_size
+
+    def _apply(self, config, signature):
+        """Stores a parsed configuration and rebuilds the derived values."""
+        with self._lock:
+            changed = config != self._config
+            self._config = config
+            self._signature = signature
+            self._api_url = normalize_api_url(config.get("host", ""))
+            api_key = config.get("api_key")
+            self._headers = {"Authorization": f"Bearer {api_key}"} if api_key else None
+            subscribers = list(self._subscribers)
+
+        if changed:
+            for callback in subscribers:
+                callback(copy.deepcopy(config))
+
+    def _current(self):
+        """Returns the cached configuration, re-reading the file if it changed."""
+        signature = self._stat_signature()
+        with self._lock:
+            if signature == self._signature:
+                return self._config
+
+        with open(self.path, "r") as file:
+            config = json.load(file)
+        self._apply(config, signature)
+        return config
+
+    def load(self):
+        """Returns a copy of the configuration that callers may modify."""
+        return copy.deepcopy(self._current())
+
+    def save(self, config):
+        """Writes the configuration and updates the cache immediately."""
+        with open(self.path, "w") as file:
+            json.dump(config, file, indent=4)
+        self._apply(copy.deepcopy(config), self._stat_signature())
+
+    def get(self, key, default=None):
+        """Returns a single top-level configuration value."""
+        return copy.deepcopy(self._current().get(key, default))
+
+    def api_url(self):
+        """Returns the normalized base API URL."""
+        self._current()
+        return self._api_url
+
+    def headers(self):
+        """Returns the auth headers, or None if no API key is configured."""
+        self._current()
+        return dict(self._headers) if self._headers else None
+
+    def subscribe(self, callback):
+        """Registers a callback(config) invoked whenever the configuration changes."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Removes a previously registered callback."""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+
+def normalize_api_url(host):
+    """Builds the base API URL (scheme and /api/v2.0 prefix) from a host value."""
+    api_url = host.strip()
+
+    # Ensure the URL includes a scheme
+    if not api_url.startswith(("http://", "https://")):
+        api_url = f"http://{api_url}"  # Default to http:// if no scheme is provided
+
+    # Append API prefix if missing
+    if not api_url.endswith("/api/v2.0"):
+        api_url = f"{api_url.rstrip('/')}/api/v2.0"
+
+    return api_url
+
+
+CONFIG_STORE = ConfigStore(CONFIG_FILE)
 
 def load_config():
     """Loads the configuration file."""
-    try:
-        with open(CONFIG_FILE, "r") as file:
-            return json.load(file)
-    except FileNotFoundError:
-        raise FileNotFoundError("Configuration file not found. Setup is required.")
+    return CONFIG_STORE.load()
 
 def save_config(config):
     """Saves the configuration file."""
-    with open(CONFIG_FILE, "w") as file:
-        json.dump(config, file, indent=4)
+    CONFIG_STORE.save(config)
+
+def subscribe(callback):
+    """Registers a callback(config) invoked whenever the configuration changes."""
+    CONFIG_STORE.subscribe(callback)
 
 # Encrypt and decrypt passwords
 def encrypt_password(password):
-    return FERNET.encrypt(password.encode()).decode()
+    return get_fernet().encrypt(password.encode()).decode()
 
 def decrypt_password(encrypted_password):
-    return FERNET.decrypt(encrypted_password.encode()).decode()
+    return get_fernet().decrypt(encrypted_password.encode()).decode()
+
+def get_fleet_hosts():
+    """
+    Returns the hosts of a fleet configuration (config["hosts"]).
+
+    Each entry needs "host" and "api_key" and may set "name" and "transport".
+
+    Returns:
+        list: Dicts with "name", "api_url", "api_key" and "transport".
+    """
+    hosts = []
+    for entry in CONFIG_STORE.get("hosts") or []:
+        if entry.get("host") and entry.get("api_key"):
+            hosts.append({
+                "name": entry.get("name") or entry["host"],
+                "api_url": normalize_api_url(entry["host"]),
+                "api_key": entry["api_key"],
+                "transport": entry.get("transport", "rest"),
+            })
+    return hosts
+
+def get_dataset_passwords():
+    """Returns {dataset name: encrypted password} for the datasets stored in the configuration."""
+    return {
+        dataset["name"]: dataset["password"]
+        for dataset in CONFIG_STORE.get("datasets") or []
+        if dataset.get("name") and dataset.get("password")
+    }
 
 def get_api_key():
     """Retrieves the API key from the configuration file."""
-    config = load_config()
-    api_key = config.get("api_key")
+    api_key = CONFIG_STORE.get("api_key")
     if not api_key:
         raise ValueError("API key is missing in the configuration file.")
     return api_key
 
 def get_api_url():
     """Retrieves the base API URL from the configuration file."""
-    config = load_config()
-    api_url = config.get("host", "").strip()
-
-    # Ensure the URL includes a scheme
-    if not api_url.startswith(("http://", "https://")):
-        api_url = f"http://{api_url}"  # Default to http:// if no scheme is provided
-
-    # Append API prefix if missing
-    if not api_url.endswith("/api/v2.0"):
-        api_url = f"{api_url.rstrip('/')}/api/v2.0"
-
-    return api_url
+    return CONFIG_STORE.api_url()
 
+def get_headers():
+    """Retrieves the auth headers for API requests."""
+    headers = CONFIG_STORE.headers()
+    if not headers:
+        raise ValueError("API key is missing in the configuration file.")
+    return headers
 
+def get_transport():
+    """Returns the configured API transport: "rest" (default) or "websocket"."""
+    return CONFIG_STORE.get("transport") or "rest"
@@ -0,0 +1,70 @@
+# Dataset queries and record helpers shared by the GUI, fleet view, daemon and exporter (no Qt imports)
+
+from app.utils.config import load_config
+
+# Fields the Datasets tab renders, plus the row key
+DATASET_FIELDS = ["id", "name", "locked", "keystatus", "used", "available"]
+
+# Flat list without nested children, reading only the ZFS properties shown
+DATASET_QUERY_EXTRA = {"flat": True, "retrieve_children": False, "properties": ["keystatus", "used", "available"]}
+
+
+def dataset_filters():
+    """Returns the query filters for the Datasets tab: encrypted datasets of the configured pool."""
+    filters = [["encrypted", "=", True]]
+    pool = load_config().get("pool")
+    if pool:
+        filters.append(["pool", "=", pool])
+    return filters
+
+
+def property_value(dataset, field):
+    """
+    Returns a dataset property as a plain value.
+
+    pool.dataset.query returns ZFS properties as dicts ({"value", "rawvalue",
+    "parsed", ...}); the SSH path and older records carry plain values.
+
+    Returns:
+        The parsed value, else the raw value, or None if the property is missing.
+    """
+    value = dataset.get(field)
+    if isinstance(value, dict):
+        if value.get("parsed") is not None:
+            return value["parsed"]
+        return value.get("rawvalue", value.get("value"))
+    return value
+
+
+def is_locked(dataset):
+    """
+    Returns True if an encrypted dataset is locked.
+
+    Uses the "locked" flag when the record has it, else the keystatus property.
+    """
+    locked = dataset.get("locked")
+    if isinstance(locked, bool):
+        return locked
+    return property_value(dataset, "keystatus") == "unavailable"
+
+
+def used_percent(dataset):
+    """
+    Returns the share of the dataset's space in use, computed from used and available.
+
+    Returns:
+        float: Percentage, or None if the sizes are missing.
+    """
+    try:
+        used = float(property_value(dataset, "used"))
+        available = float(property_value(dataset, "available"))
+    except (TypeError, ValueError):
+        return None
+    total = used + available
+    return used / total * 100 if total > 0 else None
+
+
+def format_usage(dataset):
+    """Formats used_percent() for display."""
+    percent = used_percent(dataset)
+    return "N/A" if percent is None else f"{percent:.0f}%"
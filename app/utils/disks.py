@@ -0,0 +1,4 @@
+# Disk query fields shared by the GUI, fleet view, daemon and benchmarks (no Qt imports)
+
+# Fields the Disks tab renders and /metrics exports, plus the serial used as cache key
+DISK_FIELDS = ["name", "serial", "model", "health", "temperature"]
@@ -0,0 +1,92 @@
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from app.utils.api import fetch_jobs
+
+FINAL_STATES = ("SUCCESS", "FAILED", "ABORTED")
+
+
+class JobTracker(QObject):
+    """
+    Watches long-running middleware jobs (lock, unlock, ...) until they finish.
+
+    All registered jobs are polled together with one core.get_jobs request per
+    interval on the refresh pipeline; the timer only runs while jobs are pending.
+    """
+    progress = pyqtSignal(int, object, str)          # job id, percent or None, description
+    finished = pyqtSignal(int, str, object, object)  # job id, final state, job record, context
+
+    MAX_MISSING_POLLS = 3  # Polls a job may be absent from the results, or fail, before it is given up
+
+    def __init__(self, pipeline, parent=None, interval=1000):
+        """
+        Initializes the tracker.
+
+        Args:
+            pipeline (RefreshPipeline): Runs the polls off the GUI thread.
+            parent (QObject): Owner of the tracker.
+            interval (int): Poll interval in milliseconds.
+        """
+        super().__init__(parent)
+        self.pipeline = pipeline
+        self.jobs = {}     # job id -> context passed back on completion
+        self.missing = {}  # job id -> consecutive polls without a record
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.poll)
+
+    def register(self, job_id, context=None):
+        """Starts watching a job; context is handed back with the finished signal."""
+        self.jobs[job_id] = context
+        self.missing[job_id] = 0
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def pending(self):
+        """Returns the number of jobs still being watched."""
+        return len(self.jobs)
+
+    def poll(self):
+        """Requests the state of every pending job in one call."""
+        if not self.jobs:
+            self.timer.stop()
+            return
+        job_ids = list(self.jobs)
+        self.pipeline.submit(
+            "jobs",
+            lambda: fetch_jobs(job_ids),
+            lambda jobs: self.apply_jobs(job_ids, jobs),
+            lambda message: self.apply_jobs(job_ids, None),
+        )
+
+    def apply_jobs(self, job_ids, jobs):
+        """
+        Emits progress and completion for polled jobs (GUI thread only).
+
+        A failed poll (jobs is None) counts as a poll without records, so jobs
+        on an unreachable host end as UNKNOWN instead of being polled forever.
+        """
+        records = {job.get("id"): job for job in jobs or []}
+        for job_id in job_ids:
+            if job_id not in self.jobs:
+                continue
+            job = records.get(job_id)
+            if job is None:
+                self.missing[job_id] += 1
+                if self.missing[job_id] >= self.MAX_MISSING_POLLS:
+                    self._finish(job_id, "UNKNOWN", {})
+                continue
+
+            self.missing[job_id] = 0
+            if job.get("state") in FINAL_STATES:
+                self._finish(job_id, job["state"], job)
+            else:
+                progress = job.get("progress") or {}
+                self.progress.emit(job_id, progress.get("percent"), progress.get("description") or "")
+
+        if not self.jobs:
+            self.timer.stop()
+
+    def _finish(self, job_id, state, job):
+        """Stops watching a job and reports its outcome."""
+        context = self.jobs.pop(job_id)
+        self.missing.pop(job_id, None)
+        self.finished.emit(job_id, state, job, context)
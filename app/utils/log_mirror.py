@@ -0,0 +1,150 @@
+# Incremental mirroring of remote log files
+
+import json
+import logging
+import os
+import shlex
+
+# Prints "<inode> <size> <start> <rotated_len>", then the unread tail of the
+# rotated file (if the log was rotated since the last sync), then the new
+# bytes of the current file. Output is capped at the size seen by stat, so
+# data appended while the command runs is picked up by the next sync.
+SYNC_SCRIPT = """\
+f={path}; old={inode}; off={offset}
+st=$(stat -c "%i %s" "$f") || exit 1
+set -- $st
+ino=$1; size=$2; start=$off; rot=0
+if [ "$ino" != "$old" ]; then
+    start=0
+    if [ -n "$old" ] && [ "$(stat -c %i "$f.1" 2>/dev/null)" = "$old" ]; then
+        rot=$(( $(stat -c %s "$f.1") - off ))
+        [ "$rot" -lt 0 ] && rot=0
+    fi
+elif [ "$size" -lt "$off" ]; then
+    start=0
+fi
+echo "$ino $size $start $rot"
+[ "$rot" -gt 0 ] && tail -c +$((off + 1)) "$f.1" | head -c "$rot"
+tail -c +$((start + 1)) "$f" | head -c $((size - start))
+"""
+
+
+class LogMirror:
+    """
+    Keeps a local copy of a remote log file in sync by transferring only new bytes.
+
+    The inode and byte offset of the remote file are remembered between runs.
+    Rotation (new inode) finishes the old file from the rotated copy and
+    starts a fresh local file; truncation (same inode, smaller size) resyncs
+    the local copy from the start.
+    """
+
+    def __init__(self, remote_path, local_path, use_sudo=True):
+        """
+        Initializes the mirror.
+
+        Args:
+            remote_path (str): Path of the log file on the server.
+            local_path (str): Path of the local copy.
+            use_sudo (bool): Read the remote file through sudo.
+        """
+        self.remote_path = remote_path
+        self.local_path = local_path
+        self.state_file = f"{local_path}.state"
+        self.use_sudo = use_sudo
+        self.inode, self.offset = self._load_state()
+
+    def _load_state(self):
+        """Loads the saved inode/offset, discarding it if the local copy does not match."""
+        try:
+            with open(self.state_file, "r") as file:
+                state = json.load(file)
+            if os.path.getsize(self.local_path) == state["offset"]:
+                return state["inode"], state["offset"]
+        except (FileNotFoundError, ValueError, KeyError, OSError):
+            pass
+        return "", 0
+
+    def read_since(self, position=None):
+        """
+        Reads what the local copy gained since an earlier position.
+
+        Args:
+            position (tuple): (inode, offset) returned by a previous call; None reads the whole copy.
+
+        Returns:
+            tuple: (bytes, position to pass next time). After a rotation or resync
+                the new copy is read from its start.
+        """
+        inode, offset = position or (self.inode, 0)
+        if inode != self.inode:
+            offset = 0
+        try:
+            with open(self.local_path, "rb") as file:
+                size = os.fstat(file.fileno()).st_size
+                if offset > size:  # Resynced from the start
+                    offset = 0
+                file.seek(offset)
+                data = file.read(size - offset)
+        except FileNotFoundError:
+            return b"", (self.inode, 0)
+        return data, (self.inode, offset + len(data))
+
+    def _save_state(self):
+        """Persists the inode/offset of the last sync."""
+        with open(self.state_file, "w") as file:
+            json.dump({"inode": self.inode, "offset": self.offset}, file)
+
+    def build_command(self):
+        """Returns the remote command for the next sync."""
+        script = SYNC_SCRIPT.format(
+            path=shlex.quote(self.remote_path),
+            inode=shlex.quote(str(self.inode)),
+            offset=int(self.offset),
+        )
+        command = f"sh -c {shlex.quote(script)}"
+        return f"sudo {command}" if self.use_sudo else command
+
+    def sync(self, execute):
+        """
+        Fetches new log data and appends it to the local copy.
+
+        Args:
+            execute (callable): Runs a remote command and returns its output as bytes.
+
+        Returns:
+            int: Number of log bytes transferred.
+        """
+        output = execute(self.build_command())
+        header, _, data = output.partition(b"\n")
+        try:
+            inode, size, start, rotated_length = header.decode().split()
+            size, start, rotated_length = int(size), int(start), int(rotated_length)
+        except ValueError:
+            raise RuntimeError(f"Unexpected log sync output for {self.remote_path}: {header[:200]!r}")
+
+        rotated, current = data[:rotated_length], data[rotated_length:]
+        os.makedirs(os.path.dirname(os.path.abspath(self.local_path)), exist_ok=True)
+
+        if inode != self.inode and self.inode:
+            # Rotated: finish the old file, keep it as .1 and start a new copy
+            logging.info(f"{self.remote_path} was rotated, starting a new local copy")
+            if os.path.exists(self.local_path):
+                with open(self.local_path, "ab") as file:
+                    file.write(rotated)
+                os.replace(self.local_path, f"{self.local_path}.1")
+            mode = "wb"
+        elif start == 0 and self.offset:
+            logging.info(f"{self.remote_path} was truncated, resyncing local copy")
+            mode = "wb"
+        elif start == 0:
+            mode = "wb"  # First sync
+        else:
+            mode = "ab"
+
+        with open(self.local_path, mode) as file:
+            file.write(current)
+
+        self.inode, self.offset = inode, size
+        self._save_state()
+        return len(rotated) + len(current)
@@ -0,0 +1,231 @@
+# Metric collection shared by the GUI and the headless daemon (no Qt imports)
+
+import logging
+import time
+import numpy as np
+from app.utils.api import (
+    fetch_system_info, fetch_disk_stats, fetch_network_stats, fetch_reporting_history, fetch_reporting_graphs,
+)
+from app.utils.rates import CounterRates
+from app.utils.timeseries import decode_reporting_graph
+
+MIB = 1024 * 1024
+
+BACKFILL_SECONDS = 60 * 60  # History requested from the server at startup
+
+INTERFACE_REFRESH_SECONDS = 10 * 60  # How long the list of reporting interfaces is reused
+
+HISTORY_SECONDS = 24 * 60 * 60  # One day of 1 Hz samples per series kept in memory by the GUI
+
+# Series produced by collect()
+METRIC_NAMES = ("cpu_load", "disk_read", "disk_write", "network_in", "network_out")
+
+# Reporting graph -> {series: (legend name fragments, factor to MB/s or load)}
+# Disk graphs report KiB/s and interface graphs kbit/s.
+REPORTING_SERIES = {
+    "load": {"cpu_load": (("shortterm", "load1"), 1)},
+    "disk": {
+        "disk_read": (("read",), 1024 / MIB),
+        "disk_write": (("write",), 1024 / MIB),
+    },
+    "interface": {
+        "network_in": (("rx", "received", "in"), 1000 / 8 / MIB),
+        "network_out": (("tx", "sent", "out"), 1000 / 8 / MIB),
+    },
+}
+
+
+def _legend_column(columns, fragments):
+    """Returns the first decoded column whose legend name contains one of the fragments, or None."""
+    return next(
+        (values for legend, values in columns.items() if any(f in legend.lower() for f in fragments)),
+        None,
+    )
+
+
+class MetricsCollector:
+    """
+    Collects CPU load and disk/network throughput from the configured host.
+
+    Cumulative disk counters are turned into MB/s by a per-device rate
+    tracker; network throughput is the latest point of each interface's
+    reporting graph. Every sample is appended to the metrics store if one is
+    given, and pushed to a metrics snapshot for the /metrics endpoint if one
+    is given. A series whose fetch failed has no value in that sample.
+    """
+
+    def __init__(self, store=None, snapshot=None):
+        """
+        Initializes the collector.
+
+        Args:
+            store (MetricsStore): Where samples are recorded, or None.
+            snapshot (MetricsSnapshot): Where the latest sample is published, or None.
+        """
+        self.store = store
+        self.snapshot = snapshot
+        # Previous counter readings per disk; only touched by collect()
+        self.disk_rates = CounterRates(("read_bytes", "write_bytes"))
+        self.interfaces = None  # Interfaces with reporting graphs, looked up on first use
+        self.interfaces_checked = 0
+        # Per-device rates in bytes per second from the last collect(); empty if that fetch failed
+        self.latest_rates = {"disks": {}, "interfaces": {}}
+
+    def collect(self):
+        """Fetches one sample of every metric and records it; must not run concurrently with itself."""
+        try:
+            # Fetch System Info
+            system_info = fetch_system_info()
+            if system_info is None:
+                return None  # Host unreachable; lets the scheduler back off
+            cpu_load = system_info.get("loadavg", [0])[0] if system_info else 0
+
+            # Disk counters are cumulative; report their rates in MB/s
+            now = time.time()
+            metrics = {"cpu_load": cpu_load}
+            disk_stats = fetch_disk_stats()
+            if isinstance(disk_stats, list):
+                self.disk_rates.update_from_records(now, disk_stats)
+                self.latest_rates["disks"] = self.disk_rates.per_device()
+            if isinstance(disk_stats, list) and self.latest_rates["disks"]:
+                disk = self.disk_rates.aggregate()
+                metrics["disk_read"] = disk["read_bytes"] / MIB
+                metrics["disk_write"] = disk["write_bytes"] / MIB
+            else:  # Fetch failed, or the first reading that has no rate yet
+                metrics["disk_read"] = metrics["disk_write"] = None
+                self.latest_rates["disks"] = {}
+
+            interface_rates = self.fetch_interface_rates()
+            if interface_rates is not None:
+                metrics["network_in"] = sum(rates["received_bytes"] for rates in interface_rates.values()) / MIB
+                metrics["network_out"] = sum(rates["sent_bytes"] for rates in interface_rates.values()) / MIB
+                self.latest_rates["interfaces"] = interface_rates
+            else:
+                metrics["network_in"] = metrics["network_out"] = None
+                self.latest_rates["interfaces"] = {}
+
+            if self.store is not None:
+                self.store.add(now, metrics)
+            if self.snapshot is not None:
+                self.snapshot.update_metrics(metrics, self.device_rates())
+            return metrics
+
+        except Exception as e:
+            logging.error(f"Error updating performance metrics: {e}")
+            return None
+
+    def interface_names(self):
+        """Returns the interfaces the server keeps reporting graphs for, or None if unknown."""
+        now = time.monotonic()
+        if self.interfaces is None or now - self.interfaces_checked > INTERFACE_REFRESH_SECONDS:
+            graphs = fetch_reporting_graphs(["interface"])
+            if isinstance(graphs, list):
+                self.interfaces = [
+                    name for graph in graphs if isinstance(graph, dict) and graph.get("name") == "interface"
+                    for name in graph.get("identifiers") or [] if name
+                ]
+                self.interfaces_checked = now
+        return self.interfaces
+
+    def fetch_interface_rates(self):
+        """
+        Returns the current throughput per interface from the interface reporting graphs.
+
+        Returns:
+            dict: {interface: {"received_bytes", "sent_bytes"}} in bytes per second,
+                or None if the fetch failed.
+        """
+        interfaces = self.interface_names()
+        if interfaces is None:
+            return None
+        results = fetch_network_stats(interfaces)
+        if not isinstance(results, list):
+            return None
+
+        series = REPORTING_SERIES["interface"]
+        rates = {}
+        for result in results:
+            if not isinstance(result, dict) or result.get("name") != "interface":
+                continue
+            _, columns = decode_reporting_graph(result)
+            latest = {}
+            for name, field in (("network_in", "received_bytes"), ("network_out", "sent_bytes")):
+                fragments, factor = series[name]
+                column = _legend_column(columns, fragments)
+                known = column[~np.isnan(column)] if column is not None else ()
+                if len(known):
+                    latest[field] = float(known[-1]) * factor * MIB  # Latest point, in bytes per second
+            if len(latest) == 2:
+                rates[result.get("identifier") or "unknown"] = latest
+        return rates
+
+    def reporting_identifiers(self):
+        """
+        Returns {graph name: [identifiers]} for the disk and interface graphs.
+
+        Runs before the first collect(), so the rate trackers cannot be relied on;
+        the server is asked which disks and interfaces it has graphs for.
+        """
+        identifiers = {"disk": [], "interface": []}
+        graphs = fetch_reporting_graphs(list(identifiers))
+        if isinstance(graphs, list):
+            for graph in graphs:
+                if isinstance(graph, dict) and graph.get("name") in identifiers:
+                    identifiers[graph["name"]] = [name for name in graph.get("identifiers") or [] if name]
+        if not identifiers["disk"]:
+            disks = fetch_disk_stats(("name",))
+            identifiers["disk"] = [disk.get("name") for disk in disks or [] if disk.get("name")]
+        if not identifiers["interface"]:
+            identifiers["interface"] = list(self.interfaces or [])
+        return identifiers
+
+    def fetch_backfill(self, start, end):
+        """
+        Fetches CPU, disk and interface history in one reporting request.
+
+        Returns:
+            dict: {series: (timestamps, values)} for every series the server had data for.
+                Gaps in the server's data are left out, never stored as zeros.
+        """
+        graphs = [{"name": "load"}]
+        for graph, names in self.reporting_identifiers().items():
+            # The middleware rejects disk/interface graphs without an identifier
+            graphs.extend({"name": graph, "identifier": name} for name in names)
+
+        results = fetch_reporting_history(graphs, start, end)
+        if not isinstance(results, list):
+            return {}
+
+        parts = {}  # series -> [(timestamps, values)] per disk or interface
+        for result in results:
+            series = REPORTING_SERIES.get(result.get("name")) if isinstance(result, dict) else None
+            if not series:
+                continue
+            timestamps, columns = decode_reporting_graph(result)
+            for name, (fragments, factor) in series.items():
+                column = _legend_column(columns, fragments)
+                if column is None:
+                    continue
+                parts.setdefault(name, []).append((timestamps, column * factor))
+
+        history = {}
+        for name, graphs in parts.items():
+            timestamps, values = graphs[0]
+            for other_timestamps, other_values in graphs[1:]:
+                # Sum several disks or interfaces at the timestamps they share
+                timestamps, mine, theirs = np.intersect1d(timestamps, other_timestamps, return_indices=True)
+                values = values[mine] + other_values[theirs]
+            known = ~np.isnan(values)  # A gap in any device leaves the total unknown
+            if known.any():
+                history[name] = (timestamps[known], values[known])
+        return history
+
+    def device_rates(self):
+        """Returns the latest per-disk and per-interface rates in bytes per second."""
+        return dict(self.latest_rates)
+
+    def close(self):
+        """Writes buffered samples to disk."""
+        if self.store is not None:
+            self.store.close()
+            self.store = None
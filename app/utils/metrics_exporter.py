@@ -0,0 +1,219 @@
+# OpenMetrics /metrics endpoint over the latest collected values (no Qt imports)
+
+import http.server
+import logging
+import math
+import threading
+import time
+from app.utils.config import load_config
+from app.utils.datasets import is_locked
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+DEFAULT_BIND = "127.0.0.1"
+
+
+def _label_value(value):
+    """Escapes a label value for the text exposition format."""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _number(value):
+    """Formats a sample value, spelling NaN and infinities the way OpenMetrics does."""
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def _sample(name, value, labels=None):
+    """Formats one sample line."""
+    if labels:
+        label_text = ",".join(f'{key}="{_label_value(label)}"' for key, label in labels.items())
+        return f"{name}{{{label_text}}} {_number(value)}"
+    return f"{name} {_number(value)}"
+
+
+class MetricsSnapshot:
+    """
+    The latest values seen by the collectors, rendered in OpenMetrics text format.
+
+    Collectors push what they fetched anyway; a scrape only reads this snapshot
+    and never calls the NAS. The rendered text is cached until the next update.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = None        # Latest MetricsCollector.collect() result
+        self._device_rates = {}     # {"disks": {...}, "interfaces": {...}} in bytes per second
+        self._disks = None
+        self._datasets = None
+        self._updated = {}          # source -> unix time of the last update
+        self._rendered = None
+
+    def update_metrics(self, metrics, device_rates):
+        """Stores a CPU/disk/network sample and the per-device rates behind it."""
+        with self._lock:
+            self._metrics = dict(metrics)
+            self._device_rates = device_rates
+            self._touch("performance")
+
+    def update_disks(self, disks):
+        """Stores the latest disk records (name, serial, model, health, temperature)."""
+        with self._lock:
+            self._disks = list(disks)
+            self._touch("disks")
+
+    def update_datasets(self, datasets):
+        """Stores the latest dataset records (name and locked or keystatus)."""
+        with self._lock:
+            self._datasets = list(datasets)
+            self._touch("datasets")
+
+    def _touch(self, source):
+        self._updated[source] = time.time()
+        self._rendered = None
+
+    def render(self):
+        """Returns the snapshot as OpenMetrics text (bytes)."""
+        with self._lock:
+            if self._rendered is None:
+                self._rendered = "\n".join(self._lines()).encode() + b"\n"
+            return self._rendered
+
+    def _lines(self):
+        """Builds the exposition lines; called with the lock held."""
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            if not samples:
+                return
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"# HELP {name} {help_text}")
+            lines.extend(samples)
+
+        if self._metrics is not None:
+            family("truenas_cpu_load", "gauge", "One-minute load average.",
+                   [_sample("truenas_cpu_load", self._metrics.get("cpu_load", 0))])
+
+        disk_rates = self._device_rates.get("disks", {})
+        family("truenas_disk_read_bytes_per_second", "gauge", "Disk read throughput.",
+               [_sample("truenas_disk_read_bytes_per_second", rates["read_bytes"], {"disk": name})
+                for name, rates in sorted(disk_rates.items())])
+        family("truenas_disk_write_bytes_per_second", "gauge", "Disk write throughput.",
+               [_sample("truenas_disk_write_bytes_per_second", rates["write_bytes"], {"disk": name})
+                for name, rates in sorted(disk_rates.items())])
+
+        interface_rates = self._device_rates.get("interfaces", {})
+        family("truenas_network_receive_bytes_per_second", "gauge", "Network receive throughput.",
+               [_sample("truenas_network_receive_bytes_per_second", rates["received_bytes"], {"interface": name})
+                for name, rates in sorted(interface_rates.items())])
+        family("truenas_network_transmit_bytes_per_second", "gauge", "Network transmit throughput.",
+               [_sample("truenas_network_transmit_bytes_per_second", rates["sent_bytes"], {"interface": name})
+                for name, rates in sorted(interface_rates.items())])
+
+        if self._disks is not None:
+            disks = sorted(self._disks, key=lambda disk: disk.get("name") or "")
+            family("truenas_disk", "info", "Disk identity and SMART health as reported by the NAS.",
+                   [_sample("truenas_disk_info", 1, {
+                       "disk": disk.get("name", ""), "serial": disk.get("serial") or "",
+                       "model": disk.get("model") or "", "health": disk.get("health") or "",
+                   }) for disk in disks])
+            family("truenas_disk_temperature_celsius", "gauge", "Disk temperature.",
+                   [_sample("truenas_disk_temperature_celsius", disk["temperature"], {"disk": disk.get("name", "")})
+                    for disk in disks if isinstance(disk.get("temperature"), (int, float))])
+            family("truenas_disk_smart_passed", "gauge", "1 if the SMART self-assessment passed, 0 if it failed.",
+                   [_sample("truenas_disk_smart_passed", disk["health"] == "PASSED", {"disk": disk.get("name", "")})
+                    for disk in disks if disk.get("health") in ("PASSED", "FAILED")])
+
+        if self._datasets is not None:
+            family("truenas_dataset_locked", "gauge", "1 if the encrypted dataset is locked.",
+                   [_sample("truenas_dataset_locked", is_locked(dataset), {"dataset": dataset.get("name", "")})
+                    for dataset in sorted(self._datasets, key=lambda dataset: dataset.get("name") or "")])
+
+        family("truenas_exporter_last_update_timestamp_seconds", "gauge", "When each source was last collected.",
+               [_sample("truenas_exporter_last_update_timestamp_seconds", updated, {"source": source})
+                for source, updated in sorted(self._updated.items())])
+
+        lines.append("# EOF")
+        return lines
+
+
+class MetricsExporter:
+    """Serves a MetricsSnapshot at /metrics from a background thread."""
+
+    def __init__(self, snapshot, port, bind=DEFAULT_BIND):
+        """
+        Initializes the exporter.
+
+        Args:
+            snapshot (MetricsSnapshot): Values to serve.
+            port (int): TCP port to listen on.
+            bind (str): Address to listen on; local only by default.
+        """
+        self.snapshot = snapshot
+        self.port = port
+        self.bind = bind
+        self.server = None
+
+    def start(self):
+        """Starts listening; raises OSError if the port cannot be bound."""
+        snapshot = self.snapshot
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = snapshot.render()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # One line per scrape would drown the application log
+
+        self.server = http.server.ThreadingHTTPServer((self.bind, self.port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="metrics-exporter", daemon=True).start()
+        logging.info(f"Serving metrics on http://{self.bind}:{self.server.server_address[1]}/metrics")
+
+    def stop(self):
+        """Stops listening."""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+METRICS_SNAPSHOT = MetricsSnapshot()
+
+
+def start_exporter(port=None):
+    """
+    Starts the /metrics endpoint if enabled.
+
+    Args:
+        port (int): Port to use; defaults to "metrics_port" in the configuration.
+
+    Returns:
+        MetricsExporter: The running exporter, or None if disabled or the port is unavailable.
+    """
+    try:
+        config = load_config()
+    except FileNotFoundError:
+        config = {}
+    port = port or config.get("metrics_port")
+    if not port:
+        return None
+
+    exporter = MetricsExporter(METRICS_SNAPSHOT, int(port), config.get("metrics_bind", DEFAULT_BIND))
+    try:
+        exporter.start()
+    except OSError as e:
+        logging.error(f"Metrics exporter could not listen on port {port}: {e}")
+        return None
+    return exporter
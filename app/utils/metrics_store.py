@@ -0,0 +1,255 @@
+# Persistent local time-series store for collected metrics
+
+import sqlite3
+import threading
+import time
+import numpy as np
+
+METRICS_DB_FILE = "metrics.db"
+
+# Resolution name -> (table, bucket seconds)
+RESOLUTIONS = {
+    "raw": ("samples", 1),
+    "1m": ("rollup_1m", 60),
+    "1h": ("rollup_1h", 3600),
+}
+
+# Seconds each resolution is kept
+DEFAULT_RETENTION = {
+    "raw": 2 * 24 * 3600,
+    "1m": 30 * 24 * 3600,
+    "1h": 400 * 24 * 3600,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS samples (
+    series_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (series_id, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_1m (
+    series_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    sum REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (series_id, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_1h (
+    series_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    sum REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (series_id, ts)
+) WITHOUT ROWID;
+"""
+
+
+class MetricsStore:
+    """
+    Append-only SQLite store for metric samples.
+
+    Samples are buffered in memory and written in batches. Every flush
+    updates the 1-minute and 1-hour rollups for the buckets it touched, and
+    retention is enforced per resolution so the file size stays bounded.
+    """
+
+    def __init__(self, path=METRICS_DB_FILE, batch_size=300, flush_interval=30, retention=None):
+        """
+        Initializes the store.
+
+        Args:
+            path (str): SQLite database file.
+            batch_size (int): Buffered samples that trigger a flush.
+            flush_interval (float): Seconds after which buffered samples are flushed.
+            retention (dict): Seconds to keep per resolution ("raw", "1m", "1h").
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention = dict(DEFAULT_RETENTION, **(retention or {}))
+
+        self._lock = threading.RLock()
+        self._pending = []  # (series_id, ts, value)
+        self._last_flush = time.monotonic()
+        self._last_prune = 0
+        self._series_ids = {}
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        for series_id, name in self._db.execute("SELECT id, name FROM series"):
+            self._series_ids[name] = series_id
+
+    def _series_id(self, name):
+        """Returns the id of a series, registering it on first use."""
+        series_id = self._series_ids.get(name)
+        if series_id is None:
+            with self._db:
+                cursor = self._db.execute("INSERT OR IGNORE INTO series (name) VALUES (?)", (name,))
+                series_id = cursor.lastrowid if cursor.rowcount else self._db.execute(
+                    "SELECT id FROM series WHERE name = ?", (name,)
+                ).fetchone()[0]
+            self._series_ids[name] = series_id
+        return series_id
+
+    def add(self, timestamp, metrics):
+        """
+        Buffers one sample per metric.
+
+        Args:
+            timestamp (float): Sample time (epoch seconds).
+            metrics (dict): Series name -> value.
+        """
+        with self._lock:
+            ts = int(timestamp)
+            for name, value in metrics.items():
+                if value is not None:
+                    self._pending.append((self._series_id(name), ts, float(value)))
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+            if len(self._pending) >= self.batch_size or due:
+                self.flush()
+
+    def add_many(self, name, timestamps, values):
+        """Buffers a whole series of samples (e.g. backfilled history) and flushes."""
+        with self._lock:
+            series_id = self._series_id(name)
+            self._pending.extend(
+                (series_id, int(ts), float(value))
+                for ts, value in zip(timestamps, values)
+                if value is not None and value == value  # Skip NaN gaps
+            )
+            self.flush()
+
+    def flush(self):
+        """Writes buffered samples in one transaction and updates the rollups."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            since = min(ts for _, ts, _ in pending)
+
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO samples (series_id, ts, value) VALUES (?, ?, ?)", pending
+                )
+                self._rollup("rollup_1m", "samples", 60, since, raw=True)
+                self._rollup("rollup_1h", "rollup_1m", 3600, since, raw=False)
+
+            if time.time() - self._last_prune > 3600:
+                self.prune()
+
+    def _rollup(self, table, source, bucket, since, raw):
+        """Recomputes the buckets of a rollup table from `since` onwards."""
+        start = since - since % bucket
+        if raw:
+            aggregates = "MIN(value), MAX(value), SUM(value), COUNT(*)"
+        else:
+            aggregates = "MIN(min), MAX(max), SUM(sum), SUM(count)"
+        self._db.execute(
+            f"INSERT OR REPLACE INTO {table} (series_id, ts, min, max, sum, count) "
+            f"SELECT series_id, ts - ts % {bucket}, {aggregates} FROM {source} "
+            f"WHERE ts >= ? GROUP BY series_id, ts - ts % {bucket}",
+            (start,),
+        )
+
+    def prune(self, now=None):
+        """Deletes data older than the retention of each resolution."""
+        now = time.time() if now is None else now
+        with self._lock, self._db:
+            for resolution, (table, _) in RESOLUTIONS.items():
+                self._db.execute(f"DELETE FROM {table} WHERE ts < ?", (int(now - self.retention[resolution]),))
+            self._last_prune = now
+
+    def pick_resolution(self, start, end):
+        """Chooses the finest resolution that keeps a range query small and within retention."""
+        span = end - start
+        age = time.time() - start
+        if span <= 2 * 3600 and age <= self.retention["raw"]:
+            return "raw"
+        if span <= 3 * 24 * 3600 and age <= self.retention["1m"]:
+            return "1m"
+        return "1h"
+
+    def query(self, name, start, end, resolution="auto"):
+        """
+        Returns the samples of a series in [start, end].
+
+        Args:
+            name (str): Series name.
+            start (float): Range start (epoch seconds).
+            end (float): Range end (epoch seconds).
+            resolution (str): "raw", "1m", "1h" or "auto".
+
+        Returns:
+            tuple: (timestamps, values) NumPy arrays; rollups return bucket averages.
+
+        Buffered samples are merged into the result instead of being flushed,
+        so reads never trigger a write.
+        """
+        if resolution == "auto":
+            resolution = self.pick_resolution(start, end)
+        table, bucket = RESOLUTIONS[resolution]
+        start, end = int(start), int(end)
+
+        with self._lock:
+            series_id = self._series_ids.get(name)
+            if series_id is None:
+                return np.empty(0), np.empty(0)
+            if resolution == "raw":
+                rows = self._db.execute(
+                    "SELECT ts, value FROM samples WHERE series_id = ? AND ts BETWEEN ? AND ?",
+                    (series_id, start, end),
+                ).fetchall()
+            else:
+                rows = self._db.execute(
+                    f"SELECT ts, sum, count FROM {table} WHERE series_id = ? AND ts BETWEEN ? AND ?",
+                    (series_id, start, end),
+                ).fetchall()
+            # Later buffered samples replace earlier ones with the same timestamp, as on flush
+            pending = {ts: value for sid, ts, value in self._pending if sid == series_id}
+            replaced = {}  # ts -> stored raw value a buffered sample will replace
+            if pending and resolution != "raw":
+                replaced = {
+                    ts: value for ts, value in self._db.execute(
+                        "SELECT ts, value FROM samples WHERE series_id = ? AND ts BETWEEN ? AND ?",
+                        (series_id, min(pending), max(pending)),
+                    ) if ts in pending
+                }
+
+        if resolution == "raw":
+            merged = dict(rows)
+            merged.update((ts, value) for ts, value in pending.items() if start <= ts <= end)
+        else:
+            buckets = {ts: [total, count] for ts, total, count in rows}
+            for ts, value in pending.items():
+                bucket_ts = ts - ts % bucket
+                if start <= bucket_ts <= end:
+                    entry = buckets.setdefault(bucket_ts, [0.0, 0])
+                    if ts in replaced:  # Already counted in the rollup; swap in the new value
+                        entry[0] += value - replaced[ts]
+                    else:
+                        entry[0] += value
+                        entry[1] += 1
+            merged = {ts: total / count for ts, (total, count) in buckets.items()}
+
+        if not merged:
+            return np.empty(0), np.empty(0)
+        timestamps = np.array(sorted(merged), dtype=np.float64)
+        return timestamps, np.array([merged[ts] for ts in sorted(merged)], dtype=np.float64)
+
+    def close(self):
+        """Flushes pending samples and closes the database."""
+        with self._lock:
+            self.flush()
+            self._db.close()
@@ -0,0 +1,186 @@
+import random
+import time
+from PyQt5.QtCore import QObject, QTimer
+
+
+class _PollSource:
+    """Cadence and state of one polled data source."""
+
+    def __init__(self, key, fetch, on_result, on_error, interval, hidden_interval, boost_interval, is_visible):
+        self.key = key
+        self.fetch = fetch
+        self.on_result = on_result
+        self.on_error = on_error
+        self.interval = interval
+        self.hidden_interval = hidden_interval
+        self.boost_interval = boost_interval
+        self.is_visible = is_visible
+        self.failures = 0
+        self.jitter = 1.0
+        self.last_done = None  # Monotonic time the last poll finished
+        self.next_due = 0      # Monotonic time of the next poll, None while in flight
+
+
+class PollScheduler(QObject):
+    """
+    Central scheduler for periodic data fetches, driven by a single timer.
+
+    Each source has its own cadence, which stretches while the window is hidden
+    or the source's tab is not shown, backs off exponentially (with jitter) on
+    errors and shortens for a while after user actions. Sources that fall due
+    close together are started in the same tick. Fetches run on the refresh
+    pipeline; a None result counts as an error. With max_in_flight, due sources
+    wait until one of the scheduler's running fetches finishes.
+    """
+
+    def __init__(self, pipeline, parent=None, is_hidden=None, max_backoff=300, boost_seconds=30, max_in_flight=None):
+        """
+        Initializes the scheduler.
+
+        Args:
+            pipeline (RefreshPipeline): Runs fetches off the GUI thread.
+            parent (QObject): Owner of the scheduler.
+            is_hidden (callable): Returns True while the whole application is not visible.
+            max_backoff (float): Upper bound in seconds for the interval after errors.
+            boost_seconds (float): How long the boosted cadence lasts after boost().
+            max_in_flight (int): Fetches of this scheduler allowed to run at once (default: no limit).
+        """
+        super().__init__(parent)
+        self.pipeline = pipeline
+        self.is_hidden = is_hidden or (lambda: False)
+        self.max_backoff = max_backoff
+        self.boost_seconds = boost_seconds
+        self.max_in_flight = max_in_flight
+        self.boost_until = 0
+        self.sources = {}
+        self.running = False
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.tick)
+
+    def add_source(self, key, fetch, on_result, on_error=None, interval=10,
+                   hidden_interval=None, boost_interval=None, is_visible=None):
+        """
+        Registers a data source; it is polled for the first time on the next tick.
+
+        Args:
+            key (str): Pipeline key, shared with manual refreshes of the same data.
+            fetch (callable): Runs in the background and returns the data, or None on error.
+            on_result (callable): Called on the GUI thread with the data.
+            on_error (callable): Called on the GUI thread with an error message.
+            interval (float): Seconds between polls while visible.
+            hidden_interval (float): Seconds between polls while hidden (default: 10x interval).
+            boost_interval (float): Seconds between polls after a user action (default: interval).
+            is_visible (callable): Returns False while the source's view is not shown.
+        """
+        self.sources[key] = _PollSource(
+            key, fetch, on_result, on_error, interval,
+            hidden_interval or interval * 10, boost_interval or interval, is_visible,
+        )
+        self.reschedule()
+
+    def start(self):
+        """Starts polling."""
+        self.running = True
+        self.reschedule()
+
+    def stop(self):
+        """Stops polling; fetches already in flight still complete."""
+        self.running = False
+        self.timer.stop()
+
+    def boost(self, key=None):
+        """Polls faster for a while, e.g. after a user action; with a key, that source is polled now."""
+        now = time.monotonic()
+        self.boost_until = now + self.boost_seconds
+        source = self.sources.get(key)
+        if source is not None and source.next_due is not None:
+            source.last_done = None
+            source.next_due = now
+        self.reschedule()
+
+    def at_capacity(self):
+        """True while max_in_flight fetches of this scheduler are running."""
+        if not self.max_in_flight:
+            return False
+        return sum(1 for source in self.sources.values() if source.next_due is None) >= self.max_in_flight
+
+    def interval_for(self, source, now=None):
+        """Returns the current interval of a source."""
+        now = time.monotonic() if now is None else now
+        if source.failures:
+            return min(source.interval * 2 ** source.failures, self.max_backoff) * source.jitter
+        if self.is_hidden() or (source.is_visible and not source.is_visible()):
+            return source.hidden_interval
+        if now < self.boost_until:
+            return source.boost_interval
+        return source.interval
+
+    def reschedule(self):
+        """Recomputes due times (e.g. after a visibility change) and arms the timer for the earliest one."""
+        if not self.running:
+            return
+        now = time.monotonic()
+        for source in self.sources.values():
+            if source.next_due is None and not self.pipeline.is_busy(source.key):
+                # The fetch finished but its result was superseded by a manual refresh
+                source.last_done = now
+                source.next_due = now
+            if source.next_due is not None and source.last_done is not None:
+                source.next_due = source.last_done + self.interval_for(source, now)
+
+        due = [source.next_due for source in self.sources.values() if source.next_due is not None]
+        if self.at_capacity():
+            self.timer.stop()  # The running fetch reschedules when it finishes
+        elif due:
+            self.timer.start(max(0, int((min(due) - now) * 1000)))
+
+    def tick(self):
+        """Starts every source that is due, or nearly due, in one go."""
+        now = time.monotonic()
+        # Longest-waiting sources first, so a capped scheduler serves them in turn
+        for source in sorted(self.sources.values(), key=lambda source: source.next_due or 0):
+            if source.next_due is None:
+                continue
+            if self.at_capacity():
+                break
+            # Sources due within a quarter of their interval ride along with this tick
+            slack = min(self.interval_for(source, now) / 4, 2)
+            if source.next_due <= now + slack:
+                self._run(source, now)
+        self.reschedule()
+
+    def _run(self, source, now):
+        """Submits one fetch."""
+        started = self.pipeline.submit(
+            source.key,
+            source.fetch,
+            lambda result: self._on_result(source, result),
+            lambda message: self._on_error(source, message),
+        )
+        if started:
+            source.next_due = None
+        else:
+            # A manual refresh of the same data is still running
+            source.last_done = now
+
+    def _on_result(self, source, result):
+        """Applies a result and resets the backoff."""
+        if result is None:
+            self._on_error(source, "no data received")
+            return
+        source.failures = 0
+        source.last_done = time.monotonic()
+        source.next_due = source.last_done
+        source.on_result(result)
+        self.reschedule()
+
+    def _on_error(self, source, message):
+        """Backs the source off exponentially, with jitter so sources do not retry in lockstep."""
+        source.failures += 1
+        source.jitter = random.uniform(0.8, 1.2)
+        source.last_done = time.monotonic()
+        source.next_due = source.last_done
+        if source.on_error:
+            source.on_error(message)
+        self.reschedule()
@@ -0,0 +1,95 @@
+# Per-second rates from cumulative counters
+
+import numpy as np
+
+
+class CounterRates:
+    """
+    Turns cumulative counters (bytes read, bytes sent, ...) into per-second rates.
+
+    The previous value and timestamp are kept per device in NumPy arrays, so
+    each update is a handful of vector operations regardless of how many
+    devices report. A counter that goes backwards is treated as a wraparound
+    when it was close to the counter limit, otherwise as a reset (e.g. after a
+    reboot) that restarted from zero.
+    """
+
+    def __init__(self, fields, wrap=2 ** 64):
+        """
+        Initializes the tracker.
+
+        Args:
+            fields (tuple): Counter names tracked per device, e.g. ("read_bytes", "write_bytes").
+            wrap (int): Counter limit at which values wrap around to zero.
+        """
+        self.fields = tuple(fields)
+        self.wrap = float(wrap)
+        self._index = {}  # Device name -> row
+        self._values = np.full((0, len(self.fields)), np.nan)
+        self._times = np.full(0, np.nan)
+        self.names = []
+        self.rates = np.full((0, len(self.fields)), np.nan)
+
+    def _grow(self, size):
+        """Makes room for newly seen devices."""
+        missing = size - len(self._times)
+        if missing > 0:
+            self._values = np.vstack([self._values, np.full((missing, len(self.fields)), np.nan)])
+            self._times = np.concatenate([self._times, np.full(missing, np.nan)])
+
+    def update(self, timestamp, names, values):
+        """
+        Records new counter readings and computes the rates since the previous ones.
+
+        Args:
+            timestamp (float): Time of the readings (seconds).
+            names (list): Device names, one per row of values.
+            values (array-like): Counter readings, shape (len(names), len(fields)).
+
+        Returns:
+            numpy.ndarray: Per-device rates per second, NaN for devices seen for the first time.
+        """
+        values = np.asarray(values, dtype=np.float64).reshape(len(names), len(self.fields))
+        rows = np.fromiter(
+            (self._index.setdefault(name, len(self._index)) for name in names), dtype=np.intp, count=len(names)
+        )
+        self._grow(len(self._index))
+
+        previous = self._values[rows]
+        elapsed = timestamp - self._times[rows]
+
+        delta = values - previous
+        backwards = delta < 0
+        wrapped = backwards & (previous > self.wrap / 2)
+        delta = np.where(wrapped, values + (self.wrap - previous), delta)
+        delta = np.where(backwards & ~wrapped, values, delta)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rates = delta / elapsed[:, None]
+        rates[~(elapsed > 0)] = np.nan
+
+        self._values[rows] = values
+        self._times[rows] = timestamp
+        self.names = list(names)
+        self.rates = rates
+        return rates
+
+    def update_from_records(self, timestamp, records, name_key="name"):
+        """Updates from a list of API records holding the counters as keys."""
+        records = [record for record in records or [] if isinstance(record, dict)]
+        names = [record.get(name_key) for record in records]
+        values = [[record.get(field) or 0 for field in self.fields] for record in records]
+        return self.update(timestamp, names, values)
+
+    def per_device(self):
+        """Returns the latest rates as {device: {field: rate}}, skipping devices without a rate yet."""
+        return {
+            name: dict(zip(self.fields, row.tolist()))
+            for name, row in zip(self.names, self.rates)
+            if not np.isnan(row).all()
+        }
+
+    def aggregate(self):
+        """Returns the latest rates summed over all devices as {field: rate}."""
+        totals = np.nansum(self.rates, axis=0) if len(self.rates) else np.zeros(len(self.fields))
+        return dict(zip(self.fields, totals.tolist()))
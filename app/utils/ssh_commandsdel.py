@@ -1,15 +1,29 @@
-import paramiko
 import logging
 import json
+import os
+import shlex
 from datetime import datetime
-from app.utils.config import load_config, decrypt_password
-from app.utils.timestamp import load_last_alert_check_time, save_last_alert_check_time
+from app.utils.app_logging import LOG_DIR
+from app.utils.config import load_config
+from app.utils.ssh_pool import SSH_POOL
+from app.utils.log_mirror import LogMirror
+from app.utils.alert_cursor import SSH_ALERT_CURSOR
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-def execute_ssh_command(command):
-    """Executes an SSH command on the TrueNAS server and returns the output."""
-    client = None
+MESSAGES_LOG_FILE = os.path.join(LOG_DIR, "messages.log")
+ALERTS_LOG_FILE = os.path.join(LOG_DIR, "alerts.log")
+
+# Local copy of /var/log/messages, synced incrementally
+MESSAGES_MIRROR = LogMirror("/var/log/messages", MESSAGES_LOG_FILE)
+
+def execute_ssh_command(command, decode=True):
+    """
+    Executes an SSH command on the TrueNAS server and returns the output.
+    Args:
+        command (str): The command to execute.
+        decode (bool): Decode the output as UTF-8; if False it is returned as bytes.
+    """
     try:
         logging.info(f"Executing command: {command}")
         config = load_config()
@@ -20,64 +34,153 @@ def execute_ssh_command(command):
         if not hostname or not encrypted_password:
             raise ValueError("Hostname or password is missing in the configuration.")
 
-        password = decrypt_password(encrypted_password)
-
-        client = paramiko.SSHClient()
-        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        client.connect(hostname=hostname, username=username, password=password)
-
-        stdin, stdout, stderr = client.exec_command(command)
-        output = stdout.read().decode("utf-8", errors="replace")  # Use UTF-8 decoding
-        error = stderr.read().decode("utf-8", errors="replace")  # Handle errors safely
+        # Runs on a pooled, already authenticated transport
+        _, output, error = SSH_POOL.execute(hostname, username, encrypted_password, command, decode=decode)
 
         if error:
             logging.error(f"Error executing command: {error}")
             raise RuntimeError(f"SSH Command Error: {error}")
 
-        logging.info(f"Command output: {output}")
+        if decode:
+            logging.info(f"Command output: {output}")
+        else:
+            logging.info(f"Command output: {len(output)} bytes")
         return output
     except Exception as e:
         logging.error(f"SSH Execution Failed: {str(e)}")
         raise RuntimeError(f"SSH Execution Failed: {str(e)}")
-    finally:
-        if client:
-            client.close()
 
 
 def check_status():
     """Executes the system status command and returns the results."""
     return execute_ssh_command("systemctl status")
 
-def fetch_smart_data():
-    """Fetches SMART data for all drives."""
-    command = "smartctl --scan"
-    scan_output = execute_ssh_command(command)
+# Probes every drive from `smartctl --scan` in parallel on the server, one
+# compact JSON document per drive, and prints them as JSON lines.
+SMART_BATCH_COMMAND = (
+    'tmp=$(mktemp -d); '
+    'smartctl --scan 2>/dev/null | sed "s/#.*//" | { '
+    'while read -r dev opts; do '
+    '[ -n "$dev" ] && smartctl --json=c -a $opts "$dev" > "$tmp/$(echo "$dev" | tr / _).json" 2>/dev/null & '
+    'done; wait; }; '
+    'for f in "$tmp"/*.json; do [ -s "$f" ] && cat "$f" && echo; done; '
+    'rm -rf "$tmp"'
+)
 
+def fetch_smart_data():
+    """Fetches SMART data for all drives in a single remote execution."""
+    output = execute_ssh_command(SMART_BATCH_COMMAND)
+    return parse_smart_batch(output)
+
+def parse_smart_batch(output):
+    """
+    Parses the JSON lines produced by SMART_BATCH_COMMAND.
+    Args:
+        output (str): One `smartctl --json` document per line.
+    Returns:
+        list: Drive records with name, temperature, health and attribute tables.
+    """
     drives = []
-    for line in scan_output.splitlines():
-        if "/dev" in line:
-            drive_name = line.split()[0]
-            smart_info = execute_ssh_command(f"smartctl -a {drive_name}")
-            drives.append({
-                "name": drive_name,
-                "temperature": parse_smart_temperature(smart_info),
-                "health": parse_smart_health(smart_info),
-            })
-    return drives
+    for line in output.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            logging.error(f"Skipping unparsable SMART output: {line[:200]}")
+            continue
+        drives.append(parse_smart_json(data))
+    return sorted(drives, key=lambda drive: drive["name"])
+
+def parse_smart_json(data):
+    """Converts one `smartctl --json -a` document into a drive record."""
+    smart_status = data.get("smart_status", {})
+    if "passed" in smart_status:
+        health = "PASSED" if smart_status["passed"] else "FAILED"
+    else:
+        health = "N/A"
+
+    # ATA drives report an attribute table, NVMe drives a health log
+    attributes = []
+    for attribute in data.get("ata_smart_attributes", {}).get("table", []):
+        attributes.append({
+            "id": attribute.get("id"),
+            "name": attribute.get("name"),
+            "value": attribute.get("value"),
+            "worst": attribute.get("worst"),
+            "thresh": attribute.get("thresh"),
+            "raw": attribute.get("raw", {}).get("string", attribute.get("raw", {}).get("value")),
+        })
+    for name, value in data.get("nvme_smart_health_information_log", {}).items():
+        attributes.append({"id": None, "name": name, "value": None, "worst": None, "thresh": None, "raw": value})
+
+    # Self-test log (ATA or NVMe)
+    self_tests = []
+    for test in data.get("ata_smart_self_test_log", {}).get("standard", {}).get("table", []):
+        self_tests.append({
+            "type": test.get("type", {}).get("string", "Unknown"),
+            "status": test.get("status", {}).get("string", "Unknown"),
+            "hours": test.get("lifetime_hours"),
+        })
+    for test in data.get("nvme_self_test_log", {}).get("table", []):
+        self_tests.append({
+            "type": test.get("self_test_code", {}).get("string", "Unknown"),
+            "status": test.get("self_test_result", {}).get("string", "Unknown"),
+            "hours": test.get("power_on_hours"),
+        })
+
+    # Error counters
+    error_counters = {}
+    if "ata_smart_error_log" in data:
+        error_counters["ATA errors"] = data["ata_smart_error_log"].get("summary", {}).get("count", 0)
+    nvme_log = data.get("nvme_smart_health_information_log", {})
+    if nvme_log:
+        error_counters["Media errors"] = nvme_log.get("media_errors", 0)
+        error_counters["Error log entries"] = nvme_log.get("num_err_log_entries", 0)
+    for operation, counters in data.get("scsi_error_counter_log", {}).items():
+        error_counters[f"Uncorrected {operation} errors"] = counters.get("total_uncorrected_errors", 0)
+
+    return {
+        "name": data.get("device", {}).get("name", "Unknown"),
+        "model": data.get("model_name", "Unknown"),
+        "serial": data.get("serial_number"),
+        "temperature": data.get("temperature", {}).get("current", "N/A"),
+        "health": health,
+        "attributes": attributes,
+        "self_tests": self_tests,
+        "error_counters": error_counters,
+        "power_on_hours": data.get("power_on_time", {}).get("hours"),
+    }
 
 def fetch_smart_details(drive_name):
-    """Fetches detailed SMART data for a specific drive."""
-    command = f"smartctl -a {drive_name}"
-    return execute_ssh_command(command)
-
-def fetch_messages_log():
-    """Fetches only the system messages log."""
+    """Fetches detailed SMART data (attributes, self-test log, error counters) for a specific drive."""
+    command = f"smartctl --json=c -a {shlex.quote(drive_name)} 2>/dev/null"
+    output = execute_ssh_command(command)
     try:
-        # Fetch system messages safely
-        messages_command = "sudo cat /var/log/messages"
-        messages_output = execute_ssh_command(messages_command)
-        safe_messages = messages_output.encode("utf-8", errors="replace").decode("utf-8", errors="replace")
-        return f"===== System Messages =====\n{safe_messages}"
+        return parse_smart_json(json.loads(output))
+    except json.JSONDecodeError:
+        raise RuntimeError(f"Unexpected smartctl output for {drive_name}.")
+
+def sync_messages_log():
+    """Transfers new /var/log/messages data to the local copy and returns its path."""
+    MESSAGES_MIRROR.sync(lambda command: execute_ssh_command(command, decode=False))
+    return MESSAGES_LOG_FILE
+
+def fetch_messages_log(position=None):
+    """
+    Fetches the system messages logged since an earlier call.
+    Args:
+        position (tuple): Position returned by the previous call; None fetches the whole log.
+    Returns:
+        tuple: (text, position to pass next time).
+    """
+    try:
+        # Only new bytes are transferred, and only those are read back from the local copy
+        sync_messages_log()
+        data, position = MESSAGES_MIRROR.read_since(position)
+        safe_messages = data.decode("utf-8", errors="replace")
+        return f"===== System Messages =====\n{safe_messages}", position
     except Exception as e:
         raise RuntimeError(f"Error fetching system messages log: {str(e)}")
 
@@ -111,18 +214,15 @@ def fetch_alerts_log():
     except Exception as e:
         raise RuntimeError(f"Error fetching alerts log: {str(e)}")
 
-import os
-import json
-from datetime import datetime
-
 def fetch_combined_server_logs():
-    """Fetches and combines logs from /var/log/messages and TrueNAS alerts, saving them locally."""
-
+    """
+    Syncs /var/log/messages incrementally and refreshes the TrueNAS alerts log.
+    Returns:
+        dict: Local log file paths by log type, as expected by LogViewerDialog.
+    """
     try:
-        # Step 1: Fetch system messages
-        messages_command = "sudo cat /var/log/messages"
-        messages_output = execute_ssh_command(messages_command)
-        safe_messages = messages_output.encode("utf-8", errors="replace").decode("utf-8", errors="replace")
+        # Step 1: Transfer new system messages to the local copy
+        sync_messages_log()
 
         # Step 2: Fetch alerts from TrueNAS
         alerts_command = "sudo midclt call alert.list"
@@ -144,18 +244,11 @@ def fetch_combined_server_logs():
         except json.JSONDecodeError:
             alerts_log = "Error parsing alerts log."
 
-        # Step 4: Combine logs
-        combined_logs = f"===== System Messages =====\n{safe_messages}\n\n===== Alerts =====\n{alerts_log}"
-        safe_combined_logs = combined_logs.encode("utf-8", errors="replace").decode("utf-8", errors="replace")
+        # Step 4: Save alerts locally (small, so rewritten each time)
+        with open(ALERTS_LOG_FILE, "w", encoding="utf-8", errors="replace") as file:
+            file.write(alerts_log)
 
-        # Step 5: Save to local file
-        BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-        SERVER_LOG_FILE = os.path.join(BASE_DIR, "server.log")
-
-        with open(SERVER_LOG_FILE, "w", encoding="utf-8", errors="replace") as file:
-            file.write(safe_combined_logs)
-
-        return SERVER_LOG_FILE  # Return the file path for display
+        return {"Alerts": ALERTS_LOG_FILE, "Messages": MESSAGES_LOG_FILE}
 
     except Exception as e:
         raise RuntimeError(f"Error fetching combined server logs: {str(e)}")
@@ -163,31 +256,17 @@ def fetch_combined_server_logs():
 
 
 def fetch_new_alerts():
-    """Fetches new alerts from the TrueNAS server."""
+    """Fetches alerts raised on the TrueNAS server since the previous check."""
     try:
-        # Load the last check timestamp
-        last_check_timestamp = load_last_alert_check_time()
-
         # Fetch alerts using the TrueNAS middleware command
         command = "midclt call alert.list"
         output = execute_ssh_command(command)
 
-        # Parse the JSON response
-        alerts = json.loads(output)
-
-        # Filter alerts based on timestamp
-        new_alerts = []
-        for alert in alerts:
-            alert_time = datetime.strptime(alert["datetime"], "%Y-%m-%dT%H:%M:%S")
-            if last_check_timestamp is None or alert_time > last_check_timestamp:
-                new_alerts.append(alert)
-
-        # Update the last check timestamp
-        if new_alerts:
-            latest_alert_time = max(datetime.strptime(alert["datetime"], "%Y-%m-%dT%H:%M:%S") for alert in new_alerts)
-            save_last_alert_check_time(latest_alert_time)
-
-        return new_alerts
+        # Only alerts whose UUID has not been seen before are new
+        changes = SSH_ALERT_CURSOR.update(json.loads(output))
+        if changes is None:
+            raise RuntimeError("alert.list did not return a list")
+        return changes["added"]
     except Exception as e:
         raise RuntimeError(f"Error fetching new alerts: {str(e)}")
 
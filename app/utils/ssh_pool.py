@@ -0,0 +1,180 @@
+# Persistent SSH connection pool
+
+import logging
+import socket
+import threading
+import time
+from app.utils.config import decrypt_password
+
+
+class _PooledConnection:
+    """One authenticated SSH transport shared by all commands for a host."""
+
+    def __init__(self, host, port, username, encrypted_password, max_channels):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.encrypted_password = encrypted_password
+        self.client = None
+        self.last_used = time.monotonic()
+        self.busy = 0  # Channels currently open
+        self.lock = threading.Lock()  # Serializes connect/reconnect
+        self.channels = threading.BoundedSemaphore(max_channels)
+
+    def idle_for(self, now):
+        """Seconds since the last command finished, or 0 while channels are open."""
+        return 0 if self.busy else now - self.last_used
+
+    @property
+    def active(self):
+        """True if the underlying transport is still up."""
+        transport = self.client.get_transport() if self.client else None
+        return transport is not None and transport.is_active()
+
+    def connect(self, connect_timeout, keepalive):
+        """Opens and authenticates a new transport, replacing any previous one."""
+        self.close()
+        import paramiko  # Loaded on first connection; it is slow to import
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        client.connect(
+            hostname=self.host,
+            port=self.port,
+            username=self.username,
+            password=decrypt_password(self.encrypted_password),
+            timeout=connect_timeout,
+            banner_timeout=connect_timeout,
+            auth_timeout=connect_timeout,
+            look_for_keys=False,
+            allow_agent=False,
+        )
+        client.get_transport().set_keepalive(keepalive)
+        self.client = client
+        logging.info(f"SSH connection established to {self.host}")
+
+    def close(self):
+        """Closes the transport."""
+        if self.client:
+            self.client.close()
+            self.client = None
+
+
+class SSHConnectionPool:
+    """
+    Keeps authenticated SSH transports alive per host.
+
+    Each command runs on a fresh channel of the pooled transport, so the key
+    exchange and authentication happen once per host instead of once per
+    command. Several channels can run concurrently; dead transports (idle
+    timeouts, server reboots) are reconnected on the next command.
+    """
+
+    def __init__(self, idle_timeout=300, keepalive=30, connect_timeout=10, max_channels=8):
+        """
+        Initializes the pool.
+
+        Args:
+            idle_timeout (float): Seconds after which an unused transport is closed.
+            keepalive (int): Interval in seconds for transport keepalive packets.
+            connect_timeout (float): Timeout for connecting and authenticating.
+            max_channels (int): Maximum concurrent channels per host (sshd MaxSessions).
+        """
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.connect_timeout = connect_timeout
+        self.max_channels = max_channels
+        self._connections = {}
+        self._lock = threading.Lock()
+
+    def execute(self, host, username, encrypted_password, command, port=22, timeout=None, decode=True):
+        """
+        Runs a command on a pooled transport.
+
+        Args:
+            host (str): Hostname or IP.
+            username (str): SSH user.
+            encrypted_password (str): Fernet-encrypted password from the configuration.
+            command (str): Command to execute.
+            port (int): SSH port.
+            timeout (float): Channel timeout for reading the output.
+            decode (bool): Decode stdout as UTF-8; if False it is returned as bytes.
+
+        Returns:
+            tuple: (exit_status, stdout, stderr); stderr is always decoded.
+        """
+        connection = self._get_connection(host, port, username, encrypted_password)
+        with connection.channels:
+            channel = self._open_channel(connection)
+            try:
+                if timeout is not None:
+                    channel.settimeout(timeout)
+                channel.exec_command(command)
+                stdout = channel.makefile("rb")
+                stderr = channel.makefile_stderr("rb")
+                output = stdout.read()
+                if decode:
+                    output = output.decode("utf-8", errors="replace")
+                error = stderr.read().decode("utf-8", errors="replace")
+                exit_status = channel.recv_exit_status()
+            finally:
+                channel.close()
+                with connection.lock:
+                    connection.busy -= 1
+                    connection.last_used = time.monotonic()
+        return exit_status, output, error
+
+    def close_all(self):
+        """Closes every pooled transport."""
+        with self._lock:
+            connections, self._connections = self._connections, {}
+        for connection in connections.values():
+            with connection.lock:
+                connection.close()
+
+    def _get_connection(self, host, port, username, encrypted_password):
+        """Returns the pooled connection for a host, dropping idle ones."""
+        key = (host, port, username)
+        now = time.monotonic()
+        stale = []
+        with self._lock:
+            for other_key, other in list(self._connections.items()):
+                if other_key != key and other.idle_for(now) > self.idle_timeout:
+                    stale.append(self._connections.pop(other_key))
+
+            connection = self._connections.get(key)
+            if connection is None or connection.encrypted_password != encrypted_password:
+                if connection is not None:
+                    stale.append(connection)
+                connection = _PooledConnection(host, port, username, encrypted_password, self.max_channels)
+                self._connections[key] = connection
+
+        for other in stale:
+            with other.lock:
+                other.close()
+        return connection
+
+    def _open_channel(self, connection):
+        """Opens a session channel, reconnecting once if the transport has gone away."""
+        with connection.lock:
+            # The server may have dropped a transport that sat idle for too long
+            idle = connection.idle_for(time.monotonic()) > self.idle_timeout
+            if idle or not connection.active:
+                connection.connect(self.connect_timeout, self.keepalive)
+            try:
+                channel = connection.client.get_transport().open_session(timeout=self.connect_timeout)
+            except (_ssh_exception(), EOFError, socket.error) as e:
+                # Half-open transport (e.g. after a reboot); nothing was executed yet
+                logging.info(f"SSH transport to {connection.host} lost ({e}), reconnecting")
+                connection.connect(self.connect_timeout, self.keepalive)
+                channel = connection.client.get_transport().open_session(timeout=self.connect_timeout)
+            connection.busy += 1
+            return channel
+
+
+def _ssh_exception():
+    """Returns paramiko's SSHException; paramiko is only imported once a connection exists."""
+    from paramiko import SSHException
+    return SSHException
+
+
+SSH_POOL = SSHConnectionPool()
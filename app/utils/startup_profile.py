@@ -0,0 +1,98 @@
+# Import-time breakdown for --profile-startup
+
+import builtins
+import sys
+import threading
+import time
+from importlib.util import resolve_name
+
+
+class StartupProfile:
+    """
+    Times module imports and startup milestones.
+
+    While started, builtins.__import__ is wrapped so every import statement on
+    the main thread that loads new modules is timed. A module's cumulative time
+    includes the modules it imports in turn; its self time does not.
+    """
+
+    def __init__(self):
+        self.started = None
+        self.modules = {}      # module name -> [cumulative seconds, self seconds]
+        self.milestones = []   # (label, seconds since start)
+        self._stack = []       # Time spent in nested imports, per open import
+        self._thread = None
+        self._original_import = None
+
+    def start(self):
+        """Starts timing imports."""
+        self.started = time.perf_counter()
+        self._thread = threading.get_ident()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def stop(self):
+        """Stops timing imports."""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def milestone(self, label):
+        """Records the time elapsed since start() under a label."""
+        if self.started is not None:
+            self.milestones.append((label, time.perf_counter() - self.started))
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if threading.get_ident() != self._thread:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        loaded = len(sys.modules)
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            if len(sys.modules) != loaded:
+                if level:
+                    try:
+                        name = resolve_name("." * level + name, (globals or {}).get("__package__"))
+                    except (ImportError, ValueError):
+                        pass
+                entry = self.modules.setdefault(name, [0.0, 0.0])
+                entry[0] += elapsed
+                entry[1] += elapsed - nested
+
+    def report(self, top=15):
+        """
+        Formats the milestones, the slowest imports and the import time per package.
+
+        Args:
+            top (int): Number of modules and packages listed.
+
+        Returns:
+            str: The report.
+        """
+        lines = ["Startup profile", "  Milestones (ms since start):"]
+        for label, seconds in self.milestones:
+            lines.append(f"    {seconds * 1000:8.1f}  {label}")
+
+        lines.append("  Slowest imports (cumulative ms, self ms):")
+        slowest = sorted(self.modules.items(), key=lambda item: item[1][0], reverse=True)[:top]
+        for name, (cumulative, own) in slowest:
+            lines.append(f"    {cumulative * 1000:8.1f} {own * 1000:8.1f}  {name}")
+
+        packages = {}
+        for name, (cumulative, own) in self.modules.items():
+            package = name.split(".")[0]
+            packages[package] = packages.get(package, 0.0) + own
+        lines.append("  Import time per top-level package (self ms):")
+        for package, own in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+            lines.append(f"    {own * 1000:8.1f}  {package}")
+        return "\n".join(lines)
+
+
+STARTUP_PROFILE = StartupProfile()
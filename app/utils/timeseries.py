@@ -0,0 +1,133 @@
+# Time-series buffers and downsampling for the performance plots
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-capacity series of (timestamp, value) samples.
+
+    Backed by preallocated NumPy arrays, so appending is O(1) and never
+    allocates; reads return only the requested time window in order.
+    """
+
+    def __init__(self, capacity):
+        """
+        Initializes the buffer.
+
+        Args:
+            capacity (int): Maximum number of samples kept; older ones are overwritten.
+        """
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.head = 0  # Next write position
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, value):
+        """Adds one sample, overwriting the oldest one when full."""
+        self.times[self.head] = timestamp
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def extend(self, timestamps, values):
+        """Adds many samples at once (oldest first)."""
+        timestamps = np.asarray(timestamps, dtype=np.float64)[-self.capacity:]
+        values = np.asarray(values, dtype=np.float64)[-self.capacity:]
+        n = len(timestamps)
+        first = min(n, self.capacity - self.head)
+        self.times[self.head:self.head + first] = timestamps[:first]
+        self.values[self.head:self.head + first] = values[:first]
+        self.times[:n - first] = timestamps[first:]
+        self.values[:n - first] = values[first:]
+        self.head = (self.head + n) % self.capacity
+        self.count = min(self.count + n, self.capacity)
+
+    def clear(self):
+        """Drops all samples."""
+        self.head = 0
+        self.count = 0
+
+    def _segments(self):
+        """Returns the stored data as up to two (start, stop) slices, oldest first."""
+        if self.count < self.capacity:
+            return [(0, self.count)]
+        return [(self.head, self.capacity), (0, self.head)]
+
+    def window(self, since=None):
+        """
+        Returns the samples with timestamp >= since, oldest first.
+
+        Returns:
+            tuple: (timestamps, values) as new NumPy arrays.
+        """
+        times, values = [], []
+        for start, stop in self._segments():
+            segment = self.times[start:stop]
+            if since is not None:
+                start += int(np.searchsorted(segment, since, side="left"))
+            times.append(self.times[start:stop])
+            values.append(self.values[start:stop])
+        return np.concatenate(times), np.concatenate(values)
+
+    def latest(self):
+        """Returns the newest (timestamp, value), or None if empty."""
+        if not self.count:
+            return None
+        index = (self.head - 1) % self.capacity
+        return self.times[index], self.values[index]
+
+
+def minmax_downsample(x, y, max_points):
+    """
+    Reduces a series to about max_points points, keeping each bucket's min and max.
+
+    Spikes survive downsampling, so the drawn curve looks the same as the full
+    series at one point per pixel.
+
+    Args:
+        x (numpy.ndarray): Sample positions, ascending.
+        y (numpy.ndarray): Sample values.
+        max_points (int): Upper bound on returned points.
+
+    Returns:
+        tuple: (x, y) downsampled arrays.
+    """
+    n = len(x)
+    if n <= max_points or max_points < 2:
+        return x, y
+
+    buckets = max_points // 2
+    size = n // buckets
+    start = n - size * buckets  # Drop the oldest remainder so the newest sample is kept
+    blocks = y[start:].reshape(buckets, size)
+    picks = np.sort(np.stack([blocks.argmin(axis=1), blocks.argmax(axis=1)], axis=1), axis=1)
+    indices = (picks + (np.arange(buckets) * size + start)[:, None]).ravel()
+    return x[indices], y[indices]
+
+
+def decode_reporting_graph(result):
+    """
+    Decodes one reporting/get_data graph into NumPy columns.
+
+    Args:
+        result (dict): Graph result with "legend", "data" and either a leading
+            "time" column or "start"/"step".
+
+    Returns:
+        tuple: (timestamps, {legend name: values}); missing points are NaN.
+    """
+    legend = list(result.get("legend") or [])
+    data = np.array(result.get("data") or [], dtype=np.float64)
+    if data.ndim != 2 or not len(data):
+        return np.empty(0), {}
+
+    if legend and legend[0] == "time":
+        timestamps, data, legend = data[:, 0], data[:, 1:], legend[1:]
+    else:
+        timestamps = result.get("start", 0) + result.get("step", 1) * np.arange(len(data), dtype=np.float64)
+    return timestamps, dict(zip(legend, data.T))
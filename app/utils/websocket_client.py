@@ -0,0 +1,216 @@
+# WebSocket JSON-RPC transport for the TrueNAS middleware
+
+import itertools
+import json
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import requests
+import websocket
+from app.utils.config import get_api_key, get_api_url, subscribe
+
+DEFAULT_CALL_TIMEOUT = 30
+
+
+class MiddlewareError(requests.exceptions.RequestException):
+    """
+    Raised when a middleware call fails or the websocket connection drops.
+
+    Subclasses RequestException so callers of app.utils.api handle REST and
+    websocket failures the same way.
+    """
+
+
+def websocket_url(api_url):
+    """Derives the middleware websocket URL from the base REST API URL."""
+    base = api_url.rstrip("/")
+    if base.endswith("/api/v2.0"):
+        base = base[: -len("/api/v2.0")]
+    if base.startswith("https://"):
+        return f"wss://{base[len('https://'):]}/websocket"
+    return f"ws://{base[len('http://'):] if base.startswith('http://') else base}/websocket"
+
+
+class MiddlewareClient:
+    """
+    Client for the TrueNAS middleware websocket (/websocket).
+
+    A single authenticated connection carries any number of concurrent calls;
+    each call is tagged with a message id and a reader thread routes the
+    results back to the waiting callers.
+    """
+
+    def __init__(self, url, api_key, connect_timeout=10):
+        """
+        Initializes the client. The connection is opened on first use.
+
+        Args:
+            url (str): Websocket URL, e.g. ws://host/websocket.
+            api_key (str): TrueNAS API key used for auth.login_with_api_key.
+            connect_timeout (float): Timeout for the handshake and login.
+        """
+        self.url = url
+        self.api_key = api_key
+        self.connect_timeout = connect_timeout
+
+        self._ws = None
+        self._authenticated = False
+        self._reader = None
+        self._ids = itertools.count(1)
+        self._pending = {}  # message id -> Future
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+
+    @property
+    def connected(self):
+        """True while the websocket is open and authenticated."""
+        ws = self._ws
+        return ws is not None and ws.connected and self._authenticated
+
+    def connect(self):
+        """Opens the websocket, performs the middleware handshake and logs in."""
+        with self._connect_lock:
+            if self.connected:
+                return
+            try:
+                ws = websocket.create_connection(self.url, timeout=self.connect_timeout)
+                ws.send(json.dumps({"msg": "connect", "version": "1", "support": ["1"]}))
+                reply = json.loads(ws.recv())
+                if reply.get("msg") != "connected":
+                    ws.close()
+                    raise MiddlewareError(f"Middleware handshake failed: {reply}")
+                ws.settimeout(None)  # The reader thread blocks until messages arrive
+            except (websocket.WebSocketException, OSError, ValueError) as e:
+                raise MiddlewareError(f"Error connecting to {self.url}: {e}")
+
+            self._authenticated = False
+            self._ws = ws
+            self._reader = threading.Thread(target=self._read_loop, args=(ws,), daemon=True)
+            self._reader.start()
+
+            # Concurrent callers wait on the connect lock until login completes
+            login = self._send("auth.login_with_api_key", [self.api_key])
+            try:
+                authenticated = login.result(timeout=self.connect_timeout)
+            except (FutureTimeoutError, MiddlewareError):
+                authenticated = False
+            if not authenticated:
+                self.close()
+                raise MiddlewareError("Middleware login with API key was rejected.")
+            self._authenticated = True
+
+    def call_async(self, method, *params):
+        """
+        Sends a call without waiting for its result.
+
+        Returns:
+            Future: Resolves to the call result or fails with MiddlewareError.
+        """
+        if not self.connected:
+            self.connect()
+        return self._send(method, list(params))
+
+    def call(self, method, *params, timeout=DEFAULT_CALL_TIMEOUT):
+        """Calls a middleware method and returns its result."""
+        future = self.call_async(method, *params)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise MiddlewareError(f"Timed out waiting for {method}.")
+
+    def _send(self, method, params):
+        """Registers a pending future for a new message id and sends the call."""
+        ws = self._ws
+        message_id = str(next(self._ids))
+        future = Future()
+        with self._lock:
+            self._pending[message_id] = future
+
+        message = {"id": message_id, "msg": "method", "method": method, "params": params}
+        try:
+            with self._send_lock:
+                ws.send(json.dumps(message))
+        except (websocket.WebSocketException, OSError, AttributeError) as e:
+            self._fail_pending(ws, e)
+            if not future.done():
+                future.set_exception(MiddlewareError(f"Error sending {method}: {e}"))
+        return future
+
+    def close(self):
+        """Closes the connection and fails any calls still in flight."""
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except (websocket.WebSocketException, OSError):
+                pass
+            self._fail_pending(ws, "connection closed")
+
+    def _read_loop(self, ws):
+        """Routes incoming results to their pending futures until the socket closes."""
+        try:
+            while True:
+                raw = ws.recv()
+                if not raw:
+                    break
+                message = json.loads(raw)
+                if message.get("msg") == "ping":
+                    with self._send_lock:
+                        ws.send(json.dumps({"msg": "pong", "id": message.get("id")}))
+                    continue
+                if message.get("msg") != "result":
+                    continue  # Subscription events are not used by this client
+
+                with self._lock:
+                    future = self._pending.pop(message.get("id"), None)
+                if future is None:
+                    continue
+                error = message.get("error")
+                if error:
+                    reason = error.get("reason") or error.get("error") if isinstance(error, dict) else error
+                    future.set_exception(MiddlewareError(f"Middleware error: {reason}"))
+                else:
+                    future.set_result(message.get("result"))
+        except (websocket.WebSocketException, OSError, ValueError) as e:
+            self._fail_pending(ws, e)
+            return
+        self._fail_pending(ws, "connection closed")
+
+    def _fail_pending(self, ws, reason):
+        """Fails all in-flight calls after the given socket went away."""
+        with self._lock:
+            if self._ws is not ws:
+                return
+            self._ws = None
+            self._authenticated = False
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(MiddlewareError(f"Middleware connection lost: {reason}"))
+
+
+_middleware_clients = {}  # (api_url, api_key) -> MiddlewareClient
+_middleware_lock = threading.Lock()
+
+
+def _reset_middleware_client(config):
+    """Closes the shared connections so the next call uses the new hosts or API keys."""
+    with _middleware_lock:
+        for client in _middleware_clients.values():
+            client.close()
+        _middleware_clients.clear()
+
+
+subscribe(_reset_middleware_client)
+
+
+def get_middleware_client(api_url=None, api_key=None):
+    """Returns the shared middleware client for a host (default: the configured one), creating it on first use."""
+    if api_url is None:
+        api_url = get_api_url()
+        api_key = get_api_key()
+    with _middleware_lock:
+        client = _middleware_clients.get((api_url, api_key))
+        if client is None:
+            client = _middleware_clients[(api_url, api_key)] = MiddlewareClient(websocket_url(api_url), api_key)
+        return client
@@ -0,0 +1 @@
+# Benchmarks for the API layer against a local TrueNAS stand-in
@@ -0,0 +1,261 @@
+# API-layer benchmark: python -m tests.benchmarks.bench_api --help
+#
+# Polls each app.utils.api function from several threads against a local
+# TrueNAS stand-in and reports calls per second, p50/p99 latency and bytes on
+# the wire. Calls go to the stand-in every time unless --cached also asks for
+# a run with the response cache, which is reported and stored separately.
+# Results are compared with a stored baseline; a regression beyond the
+# tolerance makes the run exit with status 1.
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+from app.utils import api
+from app.utils.alert_cursor import ALERT_CURSOR
+from app.utils.datasets import DATASET_FIELDS, DATASET_QUERY_EXTRA
+from app.utils.disks import DISK_FIELDS
+from tests.benchmarks.standin import TrueNASStandIn, DEFAULT_SIZES
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Baseline section per cache mode
+MODES = {"raw": "results", "cached": "cached_results"}
+
+
+def _reporting_history():
+    now = int(time.time())
+    return api.fetch_reporting_history([{"name": "load"}, {"name": "disk", "identifier": "sda"}], now - 3600, now)
+
+
+# Benchmark name -> call
+SCENARIOS = {
+    "fetch_system_info": api.fetch_system_info,
+    "fetch_disk_stats": api.fetch_disk_stats,
+    "fetch_smart_data": lambda: api.fetch_smart_data([["expiretime", "=", None]], DISK_FIELDS),
+    "fetch_datasets": lambda: api.fetch_datasets([["encrypted", "=", True]], DATASET_FIELDS, DATASET_QUERY_EXTRA),
+    "fetch_alerts": api.fetch_alerts,
+    "fetch_alert_changes": api.fetch_alert_changes,
+    "fetch_network_stats": lambda: api.fetch_network_stats([f"eth{i}" for i in range(DEFAULT_SIZES["interfaces"])]),
+    "fetch_reporting_history": _reporting_history,
+}
+
+# Metric -> (direction, relative tolerance factor); bytes are deterministic, so their tolerance is tight
+CHECKS = {
+    "calls_per_second": ("higher", 1.0),
+    "p50_ms": ("lower", 1.0),
+    "p99_ms": ("lower", 1.0),
+    "bytes_per_request": ("lower", 0.2),
+}
+
+# Latency changes below this many milliseconds are treated as timer noise
+LATENCY_NOISE_MS = 0.1
+
+
+def run_scenario(call, host, standin, concurrency, duration):
+    """
+    Calls one API function from several threads for a while.
+
+    Args:
+        call (callable): The API call; None results count as errors.
+        host (dict): Stand-in host for using_host().
+        standin (TrueNASStandIn): Server whose request counters are read.
+        concurrency (int): Polling threads.
+        duration (float): Seconds to poll.
+
+    Returns:
+        dict: calls, calls_per_second, p50_ms, p99_ms, requests, bytes, bytes_per_call,
+            bytes_per_request and errors.
+    """
+    api.invalidate_cache()
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    barrier = threading.Barrier(concurrency + 1)
+    deadline = []
+
+    def poll(index):
+        with api.using_host(host):
+            barrier.wait()
+            while time.perf_counter() < deadline[0]:
+                start = time.perf_counter()
+                result = call()
+                latencies[index].append(time.perf_counter() - start)
+                if result is None:
+                    errors[index] += 1
+
+    threads = [threading.Thread(target=poll, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    before = standin.snapshot()
+    deadline.append(time.perf_counter() + duration)
+    started = time.perf_counter()
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    after = standin.snapshot()
+
+    samples = np.array([latency for thread_latencies in latencies for latency in thread_latencies]) * 1000
+    requests = sum(entry["requests"] - before.get(path, {}).get("requests", 0) for path, entry in after.items())
+    transferred = sum(
+        entry["bytes_in"] + entry["bytes_out"]
+        - before.get(path, {}).get("bytes_in", 0) - before.get(path, {}).get("bytes_out", 0)
+        for path, entry in after.items()
+    )
+    calls = len(samples)
+    return {
+        "calls": calls,
+        "calls_per_second": calls / elapsed,
+        "p50_ms": float(np.percentile(samples, 50)) if calls else 0.0,
+        "p99_ms": float(np.percentile(samples, 99)) if calls else 0.0,
+        "requests": requests,
+        "bytes": transferred,
+        "bytes_per_call": transferred / calls if calls else 0.0,
+        "bytes_per_request": transferred / requests if requests else 0.0,
+        "errors": sum(errors),
+    }
+
+
+def find_regressions(results, baseline, tolerance):
+    """
+    Compares results with a baseline.
+
+    Args:
+        results (dict): Benchmark name -> metrics.
+        baseline (dict): Benchmark name -> metrics of an earlier run.
+        tolerance (float): Allowed relative change, e.g. 0.3 for 30 %.
+
+    Returns:
+        list: Human-readable regression descriptions.
+    """
+    regressions = []
+    for name, metrics in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if metrics["errors"] and not reference.get("errors"):
+            regressions.append(f"{name}: {metrics['errors']} failed calls")
+        for metric, (direction, factor) in CHECKS.items():
+            allowed = tolerance * factor
+            value, previous = metrics[metric], reference.get(metric)
+            if previous is None:
+                continue
+            if direction == "higher" and value < previous * (1 - allowed):
+                regressions.append(f"{name}: {metric} fell from {previous:.1f} to {value:.1f}")
+            elif direction == "lower":
+                limit = previous * (1 + allowed)
+                if metric.endswith("_ms"):
+                    limit = max(limit, previous + LATENCY_NOISE_MS)
+                if value > limit:
+                    regressions.append(f"{name}: {metric} rose from {previous:.1f} to {value:.1f}")
+    return regressions
+
+
+def format_table(results):
+    """Formats the results as a text table."""
+    lines = [f"{'benchmark':<26}{'calls/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'requests':>10}{'KiB':>10}{'B/call':>10}{'errors':>8}"]
+    for name, m in results.items():
+        lines.append(
+            f"{name:<26}{m['calls_per_second']:>10.1f}{m['p50_ms']:>9.2f}{m['p99_ms']:>9.2f}"
+            f"{m['requests']:>10}{m['bytes'] / 1024:>10.1f}{m['bytes_per_call']:>10.0f}{m['errors']:>8}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    """Parses the command line."""
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks.bench_api", description="Benchmarks app.utils.api against a local TrueNAS stand-in.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Polling threads per benchmark (default: 8)")
+    parser.add_argument("--duration", type=float, default=3, help="Seconds per benchmark (default: 3)")
+    parser.add_argument("--latency-ms", type=float, default=5, help="Stand-in response delay (default: 5)")
+    for key, value in DEFAULT_SIZES.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=int, default=value, help=f"Stand-in {key.replace('_', ' ')} (default: {value})")
+    parser.add_argument("--cached", action="store_true", help="Also run each benchmark with the response cache enabled")
+    parser.add_argument("--only", nargs="+", choices=list(SCENARIOS), help="Run only these benchmarks")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline file (default: tests/benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed relative slowdown before failing (default: 0.3)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Runs the benchmarks; returns the process exit status."""
+    args = parse_args(argv)
+    sizes = {key: getattr(args, key) for key in DEFAULT_SIZES}
+    settings = {
+        "concurrency": args.concurrency, "duration": args.duration, "latency_ms": args.latency_ms, "sizes": sizes,
+    }
+    cache_ttls = dict(api.CACHE_TTLS)
+    modes = ["raw", "cached"] if args.cached else ["raw"]
+
+    standin = TrueNASStandIn(latency=args.latency_ms / 1000, sizes=sizes).start()
+    host = {"name": "standin", "api_url": standin.api_url, "api_key": "benchmark", "transport": "rest"}
+
+    results = {mode: {} for mode in modes}
+    with tempfile.TemporaryDirectory() as directory:
+        ALERT_CURSOR.path = os.path.join(directory, "alert_cursor.json")  # Keep the user's cursor untouched
+        try:
+            for mode in modes:
+                # Without TTLs every call reaches the stand-in; concurrent identical GETs are still coalesced
+                api.CACHE_TTLS.clear()
+                if mode == "cached":
+                    api.CACHE_TTLS.update(cache_ttls)
+                for name, call in SCENARIOS.items():
+                    if args.only and name not in args.only:
+                        continue
+                    results[mode][name] = run_scenario(call, host, standin, args.concurrency, args.duration)
+        finally:
+            api.CACHE_TTLS.clear()
+            api.CACHE_TTLS.update(cache_ttls)
+            standin.stop()
+            ALERT_CURSOR.flush()
+    print(format_table(results["raw"]))
+    if "cached" in results:
+        print("\nWith the response cache:")
+        print(format_table(results["cached"]))
+
+    stored = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as file:
+            stored = json.load(file)
+
+    if args.save_baseline or stored is None:
+        keep = stored if stored is not None and stored.get("settings") == settings else {}
+        baseline = {"settings": settings}
+        for mode, section in MODES.items():
+            baseline[section] = dict(keep.get(section, {}), **results.get(mode, {}))
+        with open(args.baseline, "w") as file:
+            json.dump(baseline, file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if stored.get("settings") != settings:
+        print(f"Baseline {args.baseline} was recorded with different settings; rerun with --save-baseline", file=sys.stderr)
+        return 2
+
+    regressions = []
+    for mode, mode_results in results.items():
+        reference = stored.get(MODES[mode], {})
+        missing = [name for name in mode_results if name not in reference]
+        if missing:
+            print(f"No {mode} baseline for {', '.join(missing)}; rerun with --save-baseline to record it", file=sys.stderr)
+        label = "" if mode == "raw" else f" ({mode})"
+        regressions += find_regressions(
+            {name + label: metrics for name, metrics in mode_results.items()},
+            {name + label: metrics for name, metrics in reference.items()},
+            args.tolerance,
+        )
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    if regressions:
+        return 1
+    print("No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+# Local HTTP stand-in for the TrueNAS REST endpoints the API layer polls
+
+import gzip
+import http.server
+import json
+import threading
+import time
+
+API_PREFIX = "/api/v2.0"
+
+# Generated records per endpoint; scale them to model larger systems
+DEFAULT_SIZES = {
+    "disks": 24,
+    "datasets": 200,
+    "alerts": 50,
+    "interfaces": 4,
+    "reporting_points": 360,
+}
+
+
+# Body keys each POST/query endpoint accepts; anything else is rejected like a schema error
+QUERY_KEYS = {"query-filters", "query-options"}
+REPORTING_KEYS = {"graphs", "reporting_query"}
+REPORTING_QUERY_KEYS = {"start", "end", "aggregate", "unit"}
+
+
+class StandInError(Exception):
+    """A request the real server would reject."""
+
+
+def _check_keys(what, body, allowed):
+    """Raises StandInError if body has keys outside allowed."""
+    unknown = sorted(set(body) - allowed)
+    if unknown:
+        raise StandInError(f"{what}: unexpected keys {', '.join(unknown)}")
+
+
+def _dataset(index):
+    """A pool.dataset.query record with the usual property dicts."""
+    name = f"tank/share{index:04d}"
+    used = 1024 ** 3 * (index + 1)
+
+    def prop(value):
+        return {"value": str(value), "rawvalue": str(value), "parsed": value, "source": "LOCAL"}
+
+    return {
+        "id": name, "name": name, "pool": "tank", "type": "FILESYSTEM",
+        "encrypted": index % 2 == 0, "encryption_root": name if index % 2 == 0 else None,
+        "key_loaded": index % 5 != 0, "locked": index % 5 == 0,
+        "keystatus": prop("unavailable" if index % 5 == 0 else "available"),
+        "used": prop(used), "available": prop(used * 3),
+        "compression": prop("LZ4"), "quota": prop(None), "mountpoint": f"/mnt/{name}",
+        "comments": prop(""), "children": [],
+    }
+
+
+def _disk(index):
+    """A disk.query record."""
+    return {
+        "identifier": f"{{serial_lunid}}SN{index:08d}", "name": f"sd{chr(97 + index % 26)}{index // 26 or ''}",
+        "serial": f"SN{index:08d}", "model": "WDC WD80EFAX-68KNBN0", "size": 8001563222016,
+        "type": "HDD", "rotationrate": 5400, "health": "PASSED", "temperature": 30 + index % 10,
+        "expiretime": None, "pool": "tank", "description": "", "togglesmart": True,
+        "read_bytes": 0, "write_bytes": 0,
+    }
+
+
+def _alert(index):
+    """An alert.list record."""
+    return {
+        "uuid": f"00000000-0000-0000-0000-{index:012d}", "source": "VolumeStatus", "klass": "VolumeStatus",
+        "level": "WARNING", "formatted": f"Pool tank state is DEGRADED: device {index} has errors",
+        "text": "Pool %(volume)s state is %(state)s", "args": {"volume": "tank", "state": "DEGRADED"},
+        "datetime": {"$date": 1700000000000 + index}, "last_occurrence": {"$date": 1700000000000 + index},
+        "dismissed": False, "mail": None, "node": "A", "one_shot": False,
+    }
+
+
+def _matches(record, filters):
+    """Applies the "=" and "in" query-filters the API layer sends."""
+    for field, operator, value in filters:
+        if operator == "=" and record.get(field) != value:
+            return False
+        if operator == "in" and record.get(field) not in value:
+            return False
+    return True
+
+
+class TrueNASStandIn:
+    """
+    Serves /system/info, /disk/, /pool/dataset/, /alert/list/, /reporting/graphs/
+    and /reporting/get_data/ from generated data on a local port.
+
+    Query-filters and the select query-option are honoured, so the bytes on the
+    wire reflect what the API layer asks for. Request bodies with keys the real
+    endpoints do not accept are answered with 422. Every response is delayed by the
+    configured latency, and responses are gzip-compressed when the client
+    accepts it, as the TrueNAS web server does.
+    """
+
+    def __init__(self, latency=0.0, sizes=None, compress=True):
+        """
+        Initializes the stand-in.
+
+        Args:
+            latency (float): Seconds each response is delayed.
+            sizes (dict): Record counts overriding DEFAULT_SIZES.
+            compress (bool): Whether to gzip responses for clients that accept it.
+        """
+        self.latency = latency
+        self.sizes = dict(DEFAULT_SIZES, **(sizes or {}))
+        self.compress = compress
+        self.server = None
+        self.lock = threading.Lock()
+        self.stats = {}  # path -> {"requests", "bytes_in", "bytes_out"}
+        self._counter = 0
+
+        self.datasets = [_dataset(i) for i in range(self.sizes["datasets"])]
+        self.disks = [_disk(i) for i in range(self.sizes["disks"])]
+        self.alerts = [_alert(i) for i in range(self.sizes["alerts"])]
+
+    @property
+    def api_url(self):
+        """Base URL to point the API layer at."""
+        return f"http://127.0.0.1:{self.server.server_address[1]}{API_PREFIX}"
+
+    def start(self):
+        """Starts serving on an ephemeral port."""
+        standin = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real server
+            disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+            def handle_request(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                body = json.loads(raw) if raw else None
+                path = self.path.split("?")[0]
+                if path.startswith(API_PREFIX):
+                    path = path[len(API_PREFIX):]
+
+                try:
+                    result = standin.respond(self.command, path, body)
+                except StandInError as e:
+                    result, error = None, str(e)
+                else:
+                    error = None
+                if standin.latency:
+                    time.sleep(standin.latency)
+                if error is not None:
+                    payload, status = json.dumps({"message": error}).encode(), 422
+                elif result is None:
+                    payload, status = b'{"message": "Not found"}', 404
+                else:
+                    payload, status = json.dumps(result).encode(), 200
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if standin.compress and "gzip" in (self.headers.get("Accept-Encoding") or "") and len(payload) > 1024:
+                    payload = gzip.compress(payload, compresslevel=1)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                standin.record(path, len(raw), len(payload))
+
+            do_GET = handle_request
+            do_POST = handle_request
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="truenas-standin", daemon=True).start()
+        return self
+
+    def stop(self):
+        """Stops serving."""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def record(self, path, bytes_in, bytes_out):
+        """Counts one request."""
+        with self.lock:
+            entry = self.stats.setdefault(path, {"requests": 0, "bytes_in": 0, "bytes_out": 0})
+            entry["requests"] += 1
+            entry["bytes_in"] += bytes_in
+            entry["bytes_out"] += bytes_out
+
+    def snapshot(self):
+        """Returns a copy of the per-path request counters."""
+        with self.lock:
+            return {path: dict(entry) for path, entry in self.stats.items()}
+
+    def respond(self, method, path, body):
+        """Builds the result for a request, or None for unknown paths; raises StandInError for bad bodies."""
+        with self.lock:
+            self._counter += 1
+            tick = self._counter
+
+        if path == "/system/info":
+            return {
+                "version": "TrueNAS-SCALE-24.04.2", "hostname": "standin", "uptime_seconds": tick,
+                "physmem": 68719476736, "cores": 16, "loadavg": [1.25, 1.0, 0.75],
+                "model": "Intel(R) Xeon(R) CPU", "system_manufacturer": "Stand-in",
+            }
+
+        if path in ("/disk/", "/pool/dataset/", "/reporting/graphs/"):
+            if path == "/reporting/graphs/":
+                records = [
+                    {"name": "load", "identifiers": None},
+                    {"name": "disk", "identifiers": [disk["name"] for disk in self.disks]},
+                    {"name": "interface", "identifiers": [f"eth{i}" for i in range(self.sizes["interfaces"])]},
+                ]
+            else:
+                records = self.disks if path == "/disk/" else self.datasets
+            if path == "/disk/":
+                # Counters keep growing so rate computations see movement
+                records = [dict(disk, read_bytes=tick * 4096 * (i + 1), write_bytes=tick * 8192 * (i + 1))
+                           for i, disk in enumerate(records)]
+            body = body or {}
+            _check_keys(path, body, QUERY_KEYS)
+            records = [r for r in records if _matches(r, body.get("query-filters") or [])]
+            select = (body.get("query-options") or {}).get("select")
+            if select:
+                records = [{field: r.get(field) for field in select} for r in records]
+            return records
+
+        if path == "/alert/list/":
+            return self.alerts
+
+        if path == "/reporting/get_data/" and method == "POST":
+            body = body or {}
+            _check_keys(path, body, REPORTING_KEYS)
+            if not isinstance(body.get("graphs"), list):
+                raise StandInError(f"{path}: graphs must be a list")
+            query = body.get("reporting_query") or {}
+            _check_keys(f"{path} reporting_query", query, REPORTING_QUERY_KEYS)
+            points = self.sizes["reporting_points"]
+            start, end = query.get("start", 0), query.get("end", points)
+            step = max(1, (end - start) // points)
+            results = []
+            for graph in body["graphs"]:
+                legend = {
+                    "load": ["time", "shortterm", "midterm", "longterm"],
+                    "interface": ["time", "received", "sent"],
+                }.get(graph.get("name"), ["time", "read", "write"])
+                data = [[start + i * step] + [float(i % 97)] * (len(legend) - 1) for i in range(points)]
+                results.append({
+                    "name": graph.get("name"), "identifier": graph.get("identifier"),
+                    "legend": legend, "data": data, "start": start, "end": end, "step": step,
+                })
+            return results
+
+        return None
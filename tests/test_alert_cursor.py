@@ -0,0 +1,47 @@
+# Unit tests for incremental alert tracking
+
+from app.utils.alert_cursor import AlertCursor
+
+
+def _alert(uuid, date=1, dismissed=False):
+    return {"uuid": uuid, "datetime": {"$date": date}, "last_occurrence": {"$date": date}, "dismissed": dismissed}
+
+
+def test_reports_added_changed_dismissed_and_removed(tmp_path):
+    cursor = AlertCursor(str(tmp_path / "cursor.json"))
+    assert [a["uuid"] for a in cursor.update([_alert("a"), _alert("b")])["added"]] == ["a", "b"]
+
+    delta = cursor.update([_alert("a", date=2), _alert("b", dismissed=True)])
+    assert [a["uuid"] for a in delta["changed"]] == ["a"]
+    assert [a["uuid"] for a in delta["dismissed"]] == ["b"]
+
+    assert cursor.update([_alert("a", date=2)])["removed"] == ["b"]
+    assert cursor.update([_alert("a", date=2)]) == {"added": [], "changed": [], "dismissed": [], "removed": []}
+
+
+def test_two_consumers_each_see_every_change(tmp_path):
+    gui = AlertCursor(str(tmp_path / "gui.json"))
+    daemon = AlertCursor(str(tmp_path / "daemon.json"))
+    alerts = [_alert("a")]
+
+    assert len(gui.update(alerts)["added"]) == 1
+    # The GUI having seen the alert must not hide it from the daemon
+    assert len(daemon.update(alerts)["added"]) == 1
+    assert gui.update([])["removed"] == ["a"]
+    assert daemon.update(alerts)["removed"] == []
+
+
+def test_failed_fetch_leaves_state_untouched(tmp_path):
+    cursor = AlertCursor(str(tmp_path / "cursor.json"))
+    cursor.update([_alert("a")])
+    assert cursor.update(None) is None
+    assert cursor.update({"message": "error"}) is None
+    assert cursor.update([_alert("a")])["removed"] == []
+
+
+def test_state_survives_a_restart(tmp_path):
+    path = str(tmp_path / "cursor.json")
+    cursor = AlertCursor(path)
+    cursor.update([_alert("a")])
+    cursor.flush()
+    assert AlertCursor(path).update([_alert("a"), _alert("b")])["added"] == [_alert("b")]
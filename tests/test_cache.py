@@ -0,0 +1,90 @@
+# Unit tests for the TTL cache and its shared loads
+
+import threading
+import time
+from app.utils.cache import TTLCache
+
+
+def test_entries_expire_after_their_ttl():
+    cache = TTLCache(ttl=0.05)
+    cache.put("key", 1)
+    assert cache.get("key") == 1
+    time.sleep(0.1)
+    assert cache.get("key") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def test_concurrent_callers_share_one_load():
+    cache = TTLCache()
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("key", loader))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ["value"] * 5
+    assert cache.get("key") == "value"
+
+
+def test_load_overlapping_invalidate_is_not_stored_and_later_callers_reload():
+    cache = TTLCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_loader():
+        calls.append("slow")
+        started.set()
+        release.wait(5)
+        return "stale"
+
+    first = []
+    thread = threading.Thread(target=lambda: first.append(cache.get_or_load("key", slow_loader)))
+    thread.start()
+    started.wait(5)
+    cache.invalidate("key")
+
+    # Arrives after the invalidation, so it must not wait for the stale load
+    assert cache.get_or_load("key", lambda: calls.append("fresh") or "fresh") == "fresh"
+    release.set()
+    thread.join()
+
+    assert first == ["stale"]
+    assert calls == ["slow", "fresh"]
+    assert cache.get("key") == "fresh"
+
+
+def test_failed_load_is_raised_and_not_stored():
+    cache = TTLCache()
+
+    def failing():
+        raise RuntimeError("down")
+
+    try:
+        cache.get_or_load("key", failing)
+    except RuntimeError as e:
+        assert str(e) == "down"
+    else:
+        raise AssertionError("the loader's exception was swallowed")
+    assert cache.get_or_load("key", lambda: 2) == 2
@@ -0,0 +1,84 @@
+# Unit tests for incremental log mirroring; the "remote" file is local and read through sh
+
+import os
+import subprocess
+from app.utils.log_mirror import LogMirror
+
+
+def _execute(command):
+    return subprocess.run(command, shell=True, capture_output=True, check=True).stdout
+
+
+def _read(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def test_transfers_only_new_bytes(tmp_path):
+    remote, local = tmp_path / "messages", tmp_path / "copy" / "messages.log"
+    remote.write_bytes(b"one\n")
+    mirror = LogMirror(str(remote), str(local), use_sudo=False)
+    assert mirror.sync(_execute) == 4
+
+    with open(remote, "ab") as file:
+        file.write(b"two\n")
+    assert mirror.sync(_execute) == 4
+    assert mirror.sync(_execute) == 0
+    assert _read(local) == b"one\ntwo\n"
+
+
+def test_rotation_finishes_the_old_copy_and_starts_a_new_one(tmp_path):
+    remote, local = tmp_path / "messages", tmp_path / "messages.log"
+    remote.write_bytes(b"one\n")
+    mirror = LogMirror(str(remote), str(local), use_sudo=False)
+    mirror.sync(_execute)
+
+    with open(remote, "ab") as file:
+        file.write(b"two\n")
+    os.rename(remote, f"{remote}.1")
+    remote.write_bytes(b"three\n")
+    mirror.sync(_execute)
+
+    assert _read(f"{local}.1") == b"one\ntwo\n"
+    assert _read(local) == b"three\n"
+
+
+def test_truncation_resyncs_from_the_start(tmp_path):
+    remote, local = tmp_path / "messages", tmp_path / "messages.log"
+    remote.write_bytes(b"a long first line\n")
+    mirror = LogMirror(str(remote), str(local), use_sudo=False)
+    mirror.sync(_execute)
+
+    remote.write_bytes(b"short\n")
+    mirror.sync(_execute)
+    assert _read(local) == b"short\n"
+
+
+def test_state_is_resumed_by_a_new_mirror(tmp_path):
+    remote, local = tmp_path / "messages", tmp_path / "messages.log"
+    remote.write_bytes(b"one\n")
+    LogMirror(str(remote), str(local), use_sudo=False).sync(_execute)
+    with open(remote, "ab") as file:
+        file.write(b"two\n")
+    assert LogMirror(str(remote), str(local), use_sudo=False).sync(_execute) == 4
+
+
+def test_missing_remote_file_fails_the_sync(tmp_path):
+    mirror = LogMirror(str(tmp_path / "missing"), str(tmp_path / "copy.log"), use_sudo=False)
+    result = subprocess.run(mirror.build_command(), shell=True, capture_output=True)
+    assert result.returncode != 0
+    assert result.stdout == b""
+
+
+def test_read_since_returns_only_new_data(tmp_path):
+    remote, local = tmp_path / "messages", tmp_path / "messages.log"
+    remote.write_bytes(b"one\n")
+    mirror = LogMirror(str(remote), str(local), use_sudo=False)
+    mirror.sync(_execute)
+    data, position = mirror.read_since(None)
+    assert data == b"one\n"
+
+    with open(remote, "ab") as file:
+        file.write(b"two\n")
+    mirror.sync(_execute)
+    assert mirror.read_since(position)[0] == b"two\n"
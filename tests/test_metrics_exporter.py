@@ -0,0 +1,50 @@
+# Unit tests for the OpenMetrics exposition
+
+from app.utils.metrics_exporter import MetricsSnapshot, _label_value, _number
+
+
+def test_number_formatting():
+    assert _number(1) == "1.0"
+    assert _number(True) == "1.0"
+    assert _number(float("nan")) == "NaN"
+    assert _number(float("inf")) == "+Inf"
+    assert _number(float("-inf")) == "-Inf"
+
+
+def test_label_values_are_escaped():
+    assert _label_value('a"b\\c\nd') == 'a\\"b\\\\c\\nd'
+
+
+def test_empty_snapshot_only_ends_the_exposition():
+    assert MetricsSnapshot().render() == b"# EOF\n"
+
+
+def test_rendered_families():
+    snapshot = MetricsSnapshot()
+    snapshot.update_metrics({"cpu_load": 1.5}, {"disks": {"sda": {"read_bytes": 10.0, "write_bytes": 20.0}}, "interfaces": {}})
+    snapshot.update_datasets([
+        {"name": "tank/b", "keystatus": {"value": "unavailable"}},
+        {"name": "tank/a", "locked": False},
+    ])
+    lines = snapshot.render().decode().splitlines()
+
+    assert lines[:3] == [
+        "# TYPE truenas_cpu_load gauge",
+        "# HELP truenas_cpu_load One-minute load average.",
+        "truenas_cpu_load 1.5",
+    ]
+    assert 'truenas_disk_read_bytes_per_second{disk="sda"} 10.0' in lines
+    assert 'truenas_disk_write_bytes_per_second{disk="sda"} 20.0' in lines
+    assert not any(line.startswith("truenas_network_") for line in lines)
+    locked = [line for line in lines if line.startswith("truenas_dataset_locked{")]
+    assert locked == ['truenas_dataset_locked{dataset="tank/a"} 0.0', 'truenas_dataset_locked{dataset="tank/b"} 1.0']
+    assert lines[-1] == "# EOF"
+
+
+def test_render_is_cached_until_the_next_update():
+    snapshot = MetricsSnapshot()
+    snapshot.update_metrics({"cpu_load": 1.0}, {})
+    first = snapshot.render()
+    assert snapshot.render() is first
+    snapshot.update_metrics({"cpu_load": 2.0}, {})
+    assert snapshot.render() != first
@@ -0,0 +1,85 @@
+# Unit tests for the metrics store's rollups, retention and buffered reads
+
+import time
+import numpy as np
+import pytest
+from app.utils.metrics_store import MetricsStore
+
+# Start of an hour a few hours ago, so every resolution is within retention
+HOUR = (int(time.time()) // 3600 - 3) * 3600
+
+
+@pytest.fixture
+def store(tmp_path):
+    # Large batches, so nothing is flushed unless a test asks for it
+    store = MetricsStore(str(tmp_path / "metrics.db"), batch_size=10 ** 6, flush_interval=10 ** 6)
+    yield store
+    store.close()
+
+
+def test_rollups_average_their_buckets(store):
+    for second in range(120):
+        store.add(HOUR + second, {"cpu": 1.0 if second < 60 else 3.0})
+    store.flush()
+
+    timestamps, values = store.query("cpu", HOUR, HOUR + 3599, "1m")
+    assert timestamps.tolist() == [HOUR, HOUR + 60]
+    assert values.tolist() == [1.0, 3.0]
+
+    timestamps, values = store.query("cpu", HOUR, HOUR + 3599, "1h")
+    assert timestamps.tolist() == [HOUR]
+    assert values.tolist() == [2.0]
+
+
+def test_buffered_samples_are_read_without_flushing(store):
+    store.add(HOUR, {"cpu": 1.0})
+    store.flush()
+    store.add(HOUR + 1, {"cpu": 3.0})
+
+    assert store.query("cpu", HOUR, HOUR + 59, "raw")[1].tolist() == [1.0, 3.0]
+    assert store.query("cpu", HOUR, HOUR + 59, "1m")[1].tolist() == [2.0]
+    assert store._pending  # Still buffered
+
+
+@pytest.mark.parametrize("resolution", ["raw", "1m", "1h"])
+def test_buffered_sample_replaces_a_flushed_one(store, resolution):
+    store.add(HOUR, {"cpu": 1.0})
+    store.add(HOUR + 1, {"cpu": 1.0})
+    store.flush()
+    store.add(HOUR, {"cpu": 5.0})
+
+    before = store.query("cpu", HOUR, HOUR + 3599, resolution)
+    store.flush()
+    after = store.query("cpu", HOUR, HOUR + 3599, resolution)
+    assert before[0].tolist() == after[0].tolist()
+    assert before[1].tolist() == after[1].tolist()
+    if resolution != "raw":
+        assert after[1].tolist() == [3.0]
+
+
+def test_backfill_skips_gaps(store):
+    store.add_many("cpu", [HOUR, HOUR + 1, HOUR + 2], [1.0, np.nan, 2.0])
+    assert store.query("cpu", HOUR, HOUR + 10, "raw")[0].tolist() == [HOUR, HOUR + 2]
+
+
+def test_none_values_are_not_stored(store):
+    store.add(HOUR, {"cpu": 1.0, "network_in": None})
+    assert store.query("network_in", HOUR, HOUR + 10, "raw")[0].size == 0
+
+
+def test_retention_per_resolution(tmp_path):
+    store = MetricsStore(str(tmp_path / "metrics.db"), retention={"raw": 3600, "1m": 3 * 3600, "1h": 10 * 3600})
+    recent = (int(time.time()) // 3600) * 3600  # Start of the current hour
+    old = recent - 5 * 3600
+    store.add_many("cpu", [old, recent], [1.0, 2.0])  # The flush prunes as well
+    store.prune()
+
+    assert store.query("cpu", old, recent + 60, "raw")[0].tolist() == [recent]
+    assert store.query("cpu", old, recent + 60, "1m")[0].tolist() == [recent]
+    assert store.query("cpu", old, recent + 60, "1h")[0].tolist() == [old, recent]
+    store.close()
+
+
+def test_unknown_series_is_empty(store):
+    timestamps, values = store.query("missing", HOUR, HOUR + 10)
+    assert timestamps.size == 0 and values.size == 0
@@ -0,0 +1,40 @@
+# Unit tests for counter rate tracking
+
+import numpy as np
+from app.utils.rates import CounterRates
+
+
+def test_first_reading_has_no_rate():
+    rates = CounterRates(("read_bytes",))
+    assert np.isnan(rates.update(0, ["sda"], [[100]])).all()
+    assert rates.per_device() == {}
+
+
+def test_rates_per_device_and_aggregate():
+    rates = CounterRates(("read_bytes", "write_bytes"))
+    rates.update(0, ["sda", "sdb"], [[0, 0], [100, 100]])
+    rates.update(2, ["sda", "sdb"], [[200, 400], [300, 100]])
+    assert rates.per_device() == {
+        "sda": {"read_bytes": 100.0, "write_bytes": 200.0},
+        "sdb": {"read_bytes": 100.0, "write_bytes": 0.0},
+    }
+    assert rates.aggregate() == {"read_bytes": 200.0, "write_bytes": 200.0}
+
+
+def test_counter_reset_counts_from_zero():
+    rates = CounterRates(("read_bytes",))
+    rates.update(0, ["sda"], [[1000]])
+    assert rates.update(1, ["sda"], [[50]])[0, 0] == 50
+
+
+def test_counter_wraparound():
+    rates = CounterRates(("read_bytes",), wrap=1000)
+    rates.update(0, ["sda"], [[990]])
+    assert rates.update(1, ["sda"], [[10]])[0, 0] == 20
+
+
+def test_update_from_records_tracks_new_devices():
+    rates = CounterRates(("read_bytes",))
+    rates.update_from_records(0, [{"name": "sda", "read_bytes": 0}])
+    rates.update_from_records(1, [{"name": "sda", "read_bytes": 10}, {"name": "sdb", "read_bytes": 5}])
+    assert rates.per_device() == {"sda": {"read_bytes": 10.0}}